@@ -0,0 +1,112 @@
+"""
+Recall, query latency and memory of shortened (Matryoshka) embeddings.
+
+Stores the same vectors truncated to each dimension in a LocalVectorStore and
+measures vector memory, exact search latency and recall@k against search on
+the full vectors. Without --embeddings-file the vectors are synthetic: clustered,
+with variance decaying over the dimensions the way Matryoshka training packs
+the most information into the leading ones. For numbers that carry over to
+production, pass real text-embedding-3 vectors (a .npy matrix, one row per chunk).
+
+Usage:
+    python benchmarks/embedding_dimension.py --dimensions 1536 1024 512 256
+    python benchmarks/embedding_dimension.py --embeddings-file embeddings.npy --num-queries 500
+"""
+
+import argparse
+import json
+import sys
+import time
+import numpy as np
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from semantic_search.embedding_providers import truncate_embedding  # noqa: E402
+from semantic_search.local_vector_store import LocalVectorStore  # noqa: E402
+
+
+def make_vectors(num_objects: int, num_queries: int, dimension: int, seed: int):
+    """Clustered vectors whose per-dimension scale decays like 1/sqrt(i)."""
+    rng = np.random.default_rng(seed)
+    scale = (1.0 / np.sqrt(np.arange(1, dimension + 1))).astype(np.float32)
+    num_clusters = max(num_objects // 100, 1)
+    centers = rng.standard_normal((num_clusters, dimension)).astype(np.float32)
+
+    def sample(count: int) -> np.ndarray:
+        points = centers[rng.integers(0, num_clusters, count)] + 0.7 * rng.standard_normal((count, dimension)).astype(np.float32)
+        return truncate_embedding(points * scale, dimension)
+
+    return sample(num_objects), sample(num_queries)
+
+
+def measure(vectors: np.ndarray, queries: np.ndarray, truth: np.ndarray, dimension: int, k: int) -> Dict[str, Any]:
+    store = LocalVectorStore(initial_capacity=len(vectors), dimension=dimension)
+    store.add([{"row": row} for row in range(len(vectors))], truncate_embedding(vectors, dimension))
+    shortened = truncate_embedding(queries, dimension)
+
+    latencies, recalls = [], []
+    for query, expected in zip(shortened, truth):
+        start = time.perf_counter()
+        hits = store.query(query, k)
+        latencies.append(time.perf_counter() - start)
+        found = {hit["properties"]["row"] for hit in hits}
+        recalls.append(len(found & set(expected.tolist())) / k)
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "vector_memory_mb": round(store.nbytes / 1024 ** 2, 1),
+        "query_latency_ms": {
+            "p50": round(float(np.percentile(latencies_ms, 50)), 3),
+            "p95": round(float(np.percentile(latencies_ms, 95)), 3),
+            "mean": round(float(latencies_ms.mean()), 3),
+        },
+        f"recall_at_{k}": round(float(np.mean(recalls)), 4),
+    }
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Benchmark shortened embedding dimensions")
+    parser.add_argument("--dimensions", nargs="+", type=int, default=[1536, 1024, 512, 256])
+    parser.add_argument("--embeddings-file", help="Real embeddings (.npy); queries are sampled from its rows")
+    parser.add_argument("--num-objects", type=int, default=50000)
+    parser.add_argument("--num-queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    full_dimension = max(args.dimensions)
+    if args.embeddings_file:
+        vectors = truncate_embedding(np.load(args.embeddings_file), full_dimension)
+        rng = np.random.default_rng(args.seed)
+        # Held-out rows as queries, so a query never finds itself
+        order = rng.permutation(len(vectors))
+        queries, vectors = vectors[order[:args.num_queries]], vectors[order[args.num_queries:]]
+    else:
+        vectors, queries = make_vectors(args.num_objects, args.num_queries, full_dimension, args.seed)
+
+    # Ground truth is exact search on the full-length vectors
+    truth = np.argsort(-(queries @ vectors.T), axis=1)[:, :args.k]
+
+    results = {}
+    for dimension in sorted(args.dimensions, reverse=True):
+        results[str(dimension)] = measure(vectors, queries, truth, dimension, args.k)
+        print(f"{dimension}: {json.dumps(results[str(dimension)])}", file=sys.stderr)
+
+    report = {
+        "source": args.embeddings_file or "synthetic",
+        "num_objects": len(vectors),
+        "num_queries": len(queries),
+        "k": args.k,
+        "dimensions": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Query latency and batch throughput of the embedding providers.
+
+Measures each provider in process, the way EmbeddingManager calls it:
+single-text embeds (query path) and full batches (ingestion path). The
+OpenAI provider is measured against the local stub, so its numbers show
+client and serialization overhead plus the configured stub latency.
+
+Usage:
+    python benchmarks/embedding_providers.py --providers hashing openai
+    python benchmarks/embedding_providers.py --providers local --local-model-path ./models/all-MiniLM-L6-v2
+"""
+
+import argparse
+import json
+import time
+import numpy as np
+from pathlib import Path
+from typing import Any, Dict, List
+
+from stub_openai import StubOpenAIServer
+from semantic_search.embedding_providers import create_embedding_provider
+from semantic_search.sample_data import get_all_sample_data, get_sample_queries
+
+
+def summarize(latencies_s: List[float]) -> Dict[str, float]:
+    latencies = np.array(latencies_s) * 1000
+    return {
+        "p50": round(float(np.percentile(latencies, 50)), 3),
+        "p95": round(float(np.percentile(latencies, 95)), 3),
+        "p99": round(float(np.percentile(latencies, 99)), 3),
+        "mean": round(float(latencies.mean()), 3),
+    }
+
+
+def measure(provider, queries: List[str], documents: List[str], iterations: int) -> Dict[str, Any]:
+    # Warm up lazy initialization (connection pools, model graph)
+    provider.embed(queries[:1])
+
+    query_latencies = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        provider.embed([queries[i % len(queries)]])
+        query_latencies.append(time.perf_counter() - start)
+
+    batch = documents[:provider.batch_size]
+    start = time.perf_counter()
+    provider.embed(batch)
+    batch_time = time.perf_counter() - start
+
+    return {
+        "dimension": provider.dimension,
+        "batch_size": provider.batch_size,
+        "query_latency_ms": summarize(query_latencies),
+        "batch_latency_ms": round(batch_time * 1000, 3),
+        "batch_throughput_texts_per_s": round(len(batch) / batch_time, 1) if batch_time > 0 else None,
+    }
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Benchmark embedding providers")
+    parser.add_argument("--providers", nargs="+", default=["hashing", "openai"], choices=["hashing", "openai", "local"])
+    parser.add_argument("--iterations", type=int, default=200, help="Single-text embeds per provider")
+    parser.add_argument("--stub-latency-ms", type=float, default=0.0, help="Latency of the stub OpenAI API")
+    parser.add_argument("--local-model-path", help="Model directory for the local provider")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    stub = None
+    if "openai" in args.providers:
+        stub = StubOpenAIServer(embedding_latency_ms=args.stub_latency_ms).start()
+
+    queries = get_sample_queries()
+    documents = [article["text"] for article in get_all_sample_data()]
+    documents = (documents * (1000 // len(documents) + 1))[:1000]
+
+    results = {}
+    try:
+        for name in args.providers:
+            kwargs = {}
+            if name == "openai":
+                kwargs = {"api_key": "stub-key", "api_base": stub.api_base}
+            elif name == "local":
+                kwargs = {"model_path": args.local_model_path}
+            provider = create_embedding_provider(name, **kwargs)
+            results[name] = measure(provider, queries, documents, args.iterations)
+            print(f"{name}: {json.dumps(results[name])}")
+    finally:
+        if stub is not None:
+            stub.shutdown()
+
+    report = {"iterations": args.iterations, "stub_latency_ms": args.stub_latency_ms, "providers": results}
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
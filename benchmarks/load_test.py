@@ -0,0 +1,286 @@
+"""
+Offline load test and benchmark for the search server.
+
+Starts the FastAPI app in a subprocess against a local stub OpenAI server
+(deterministic embeddings, configurable latency) and the in-process local
+vector backend, drives /search, /ask-question and /process-text at a
+configurable concurrency, and reports latency percentiles, throughput and
+peak server RSS as JSON so runs can be compared over time.
+
+Usage:
+    python benchmarks/load_test.py --concurrency 16 --requests 500 --output results.json
+    python benchmarks/load_test.py --endpoints search --server-env NEAR_DUPLICATE_THRESHOLD=0.9
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import numpy as np
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from stub_openai import StubOpenAIServer
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+ENDPOINTS = {
+    "search": "/search",
+    "ask-question": "/ask-question",
+    "process-text": "/process-text",
+}
+
+_thread_local = threading.local()
+
+
+def _session() -> requests.Session:
+    """One pooled session per load-generator thread."""
+    if not hasattr(_thread_local, "session"):
+        _thread_local.session = requests.Session()
+    return _thread_local.session
+
+
+class RSSMonitor:
+    """Tracks the peak resident set size of a process."""
+
+    def __init__(self, pid: int, interval: float = 0.1):
+        self.pid = pid
+        self.interval = interval
+        self.peak_kb = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _read_status(self, field: str) -> Optional[int]:
+        try:
+            with open(f"/proc/{self.pid}/status") as f:
+                for line in f:
+                    if line.startswith(field + ":"):
+                        return int(line.split()[1])
+        except OSError:
+            return None
+        return None
+
+    def _sample(self):
+        # VmHWM is the kernel's own high-water mark; VmRSS covers kernels without it
+        value = self._read_status("VmHWM") or self._read_status("VmRSS")
+        if value is None:
+            try:
+                import psutil
+                value = psutil.Process(self.pid).memory_info().rss // 1024
+            except Exception:
+                return
+        self.peak_kb = max(self.peak_kb, value)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._sample()
+            self._stop.wait(self.interval)
+
+    def start(self) -> "RSSMonitor":
+        self._thread.start()
+        return self
+
+    def stop(self) -> Optional[float]:
+        """Stop monitoring and return the peak RSS in MB, if it could be measured."""
+        self._sample()
+        self._stop.set()
+        self._thread.join()
+        return round(self.peak_kb / 1024, 1) if self.peak_kb else None
+
+
+def start_server(port: int, env: Dict[str, str], log_file) -> subprocess.Popen:
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "search_server.main:app",
+            "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+        ],
+        cwd=str(SRC_DIR),
+        env=env,
+        stdout=log_file,
+        stderr=subprocess.STDOUT,
+    )
+
+
+def wait_until_healthy(base_url: str, process: subprocess.Popen, timeout: float = 120.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Search server exited with code {process.returncode}")
+        try:
+            if requests.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.25)
+    raise TimeoutError(f"Search server did not become healthy within {timeout}s")
+
+
+def make_payloads(endpoint: str, count: int, queries: List[str], seed: int) -> List[Dict[str, Any]]:
+    """Build request bodies; process-text documents are random so they are never near-duplicates."""
+    rng = random.Random(seed)
+    if endpoint == "search":
+        return [{"query": queries[i % len(queries)], "num_results": 3} for i in range(count)]
+    if endpoint == "ask-question":
+        return [{"question": queries[i % len(queries)], "num_search_results": 3} for i in range(count)]
+
+    vocabulary = sorted({word.strip("?,.").lower() for query in queries for word in query.split()})
+    return [
+        {"text": " ".join(rng.choice(vocabulary) for _ in range(150)) + f" document {i}."}
+        for i in range(count)
+    ]
+
+
+def run_endpoint(
+    base_url: str,
+    path: str,
+    payloads: List[Dict[str, Any]],
+    concurrency: int,
+    timeout: float
+) -> Dict[str, Any]:
+    """Send all payloads with a fixed number of concurrent clients and summarize latencies."""
+    def send(payload) -> Optional[float]:
+        start = time.perf_counter()
+        try:
+            response = _session().post(f"{base_url}{path}", json=payload, timeout=timeout)
+            ok = response.status_code == 200
+        except requests.RequestException:
+            ok = False
+        elapsed = time.perf_counter() - start
+        return elapsed if ok else None
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(send, payloads))
+    wall_time = time.perf_counter() - wall_start
+
+    latencies = np.array([o for o in outcomes if o is not None]) * 1000
+    summary = {
+        "requests": len(payloads),
+        "errors": sum(o is None for o in outcomes),
+        "wall_time_s": round(wall_time, 3),
+        "throughput_rps": round(len(latencies) / wall_time, 2) if wall_time > 0 else 0.0,
+    }
+    if len(latencies):
+        summary["latency_ms"] = {
+            "p50": round(float(np.percentile(latencies, 50)), 3),
+            "p95": round(float(np.percentile(latencies, 95)), 3),
+            "p99": round(float(np.percentile(latencies, 99)), 3),
+            "mean": round(float(latencies.mean()), 3),
+            "max": round(float(latencies.max()), 3),
+        }
+    return summary
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    stub = StubOpenAIServer(
+        embedding_latency_ms=args.embedding_latency_ms,
+        chat_latency_ms=args.chat_latency_ms,
+        embedding_dimension=args.embedding_dimension,
+    ).start()
+
+    env = dict(os.environ)
+    env.update({
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(SRC_DIR), env.get("PYTHONPATH")])),
+        "PYTHONUNBUFFERED": "1",
+        "OPENAI_API_KEY": "stub-key",
+        "OPENAI_API_BASE": stub.api_base,
+        "VECTOR_BACKEND": args.vector_backend,
+        "LOAD_SAMPLE_DATA": "true",
+        # Server and stub must agree on the vector length
+        "EMBEDDING_DIMENSION": str(args.embedding_dimension),
+        # The stub's hashing embeddings score far below OpenAI's, so the default
+        # certainty cutoff would prune every result; override with --server-env
+        "SEARCH_CERTAINTY": "0",
+        # Measure raw capacity; rejected requests would count as errors. Compare
+        # with --server-env ENABLE_ADMISSION_CONTROL=true
+        "ENABLE_ADMISSION_CONTROL": "false",
+    })
+    for assignment in args.server_env:
+        key, _, value = assignment.partition("=")
+        env[key] = value
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    log_file = open(args.server_log, "w") if args.server_log else subprocess.DEVNULL
+    server = start_server(args.port, env, log_file)
+    monitor = None
+    try:
+        wait_until_healthy(base_url, server)
+        monitor = RSSMonitor(server.pid).start()
+        queries = requests.get(f"{base_url}/sample-queries", timeout=10).json()
+
+        results = {}
+        for i, endpoint in enumerate(args.endpoints):
+            path = ENDPOINTS[endpoint]
+            if args.warmup:
+                warmup = make_payloads(endpoint, args.warmup, queries, seed=args.seed + 1000 + i)
+                run_endpoint(base_url, path, warmup, args.concurrency, args.timeout)
+            payloads = make_payloads(endpoint, args.requests, queries, seed=args.seed + i)
+            results[path] = run_endpoint(base_url, path, payloads, args.concurrency, args.timeout)
+            print(f"{path}: {json.dumps(results[path])}", file=sys.stderr)
+
+        return {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "label": args.label,
+            "config": {
+                "concurrency": args.concurrency,
+                "requests_per_endpoint": args.requests,
+                "warmup": args.warmup,
+                "vector_backend": args.vector_backend,
+                "embedding_latency_ms": args.embedding_latency_ms,
+                "chat_latency_ms": args.chat_latency_ms,
+                "embedding_dimension": args.embedding_dimension,
+                "server_env": args.server_env,
+            },
+            "server": {"peak_rss_mb": monitor.stop() if monitor else None},
+            "stub_openai": {"calls": dict(stub.calls), "inputs": dict(stub.inputs)},
+            "endpoints": results,
+        }
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+        stub.shutdown()
+        if log_file is not subprocess.DEVNULL:
+            log_file.close()
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline load test for the search server")
+    parser.add_argument("--endpoints", nargs="+", choices=sorted(ENDPOINTS), default=["search", "ask-question", "process-text"])
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=10, help="Unmeasured requests per endpoint")
+    parser.add_argument("--embedding-latency-ms", type=float, default=20.0, help="Stub embedding API latency")
+    parser.add_argument("--chat-latency-ms", type=float, default=300.0, help="Stub chat completion latency")
+    parser.add_argument("--embedding-dimension", type=int, default=1536)
+    parser.add_argument("--vector-backend", default="local", help="VECTOR_BACKEND of the server")
+    parser.add_argument("--server-env", nargs="*", default=[], metavar="KEY=VALUE", help="Extra server environment")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--label", default="", help="Free-form label stored with the results")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--server-log", help="Write server output to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None):
+    args = parse_args(argv)
+    report = run_benchmark(args)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
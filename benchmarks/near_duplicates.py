@@ -0,0 +1,137 @@
+"""
+Embedding calls and stored objects avoided by near-duplicate detection.
+
+Runs an upload workload on the sample corpus through SemanticSearchInterface,
+the way the search server does, once with ENABLE_NEAR_DUPLICATE_DETECTION
+and once without:
+
+- upload: every sample article via process_and_index_text (a /process-text without doc_id)
+- reupload_edited: every article again with a small edit and a new doc_id
+- update_edited: the same edit through update_document (a PUT /documents/{doc_id})
+- reupload_exact: the first articles again, unchanged, with a new doc_id
+- delete_originals: the originals of the edited re-uploads are deleted, so the
+  re-uploads' chunks that were skipped in their favour have to be stored
+
+For each phase it reports the provider embedding calls, the chunks embedded and
+the objects stored at the end of the phase. The local vector backend and the
+hashing provider keep it offline.
+
+Usage:
+    python benchmarks/near_duplicates.py
+    python benchmarks/near_duplicates.py --exact-reuploads 10 --output near_duplicates.json
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+os.environ["VECTOR_BACKEND"] = "local"
+os.environ["EMBEDDING_PROVIDER"] = "hashing"
+os.environ["LOCAL_SHARDS"] = "1"
+os.environ["LOCAL_SHARD_ADDRESSES"] = ""
+os.environ["SEED_SNAPSHOT_PATH"] = ""
+
+from semantic_search.near_duplicates import NearDuplicateDetector  # noqa: E402
+from semantic_search.sample_data import get_all_sample_data  # noqa: E402
+from semantic_search.search_interface import SemanticSearchInterface  # noqa: E402
+
+
+def edit(text: str) -> str:
+    """A small edit at the start and the end of a document."""
+    return text.replace(".", "!", 1) + " (updated)"
+
+
+class CountingProvider:
+    """Counts the embedding calls and texts that reach the provider."""
+
+    def __init__(self, provider):
+        self.provider = provider
+        self.calls = 0
+        self.texts = 0
+
+    def __getattr__(self, name):
+        return getattr(self.provider, name)
+
+    def embed(self, texts, *args, **kwargs):
+        self.calls += 1
+        self.texts += len(texts)
+        return self.provider.embed(texts, *args, **kwargs)
+
+
+def run(detection: bool, exact_reuploads: int) -> Dict[str, Dict[str, Any]]:
+    interface = SemanticSearchInterface()
+    interface.duplicate_detector = NearDuplicateDetector(index_file=None) if detection else None
+    provider = CountingProvider(interface.embedding_manager.embedding_provider)
+    interface.embedding_manager.embedding_provider = provider
+    articles = [article["text"] for article in get_all_sample_data()]
+
+    results = {}
+
+    def phase(name: str, uploads: List[Any]):
+        calls, texts, skipped = provider.calls, provider.texts, 0
+        for upload in uploads:
+            stats = upload()
+            skipped += stats.get("near_duplicates_skipped", 0) if isinstance(stats, dict) else 0
+        results[name] = {
+            "embedding_calls": provider.calls - calls,
+            "chunks_embedded": provider.texts - texts,
+            "chunks_skipped": skipped,
+            "stored_objects": sum(1 for _ in interface.iter_database_contents(["doc_id"])),
+        }
+        print(f"{'on' if detection else 'off'} {name}: {json.dumps(results[name])}", file=sys.stderr)
+
+    originals = [f"original-{i}" for i in range(len(articles))]
+    phase("upload", [
+        lambda doc_id=doc_id, text=text: interface.process_and_index_text(text, doc_id=doc_id)
+        for doc_id, text in zip(originals, articles)
+    ])
+    phase("reupload_edited", [
+        lambda text=text: interface.process_and_index_text(edit(text))
+        for text in articles
+    ])
+    phase("update_edited", [
+        lambda doc_id=doc_id, text=text: interface.update_document(doc_id, edit(text))
+        for doc_id, text in zip(originals, articles)
+    ])
+    phase("reupload_exact", [
+        lambda text=text: interface.process_and_index_text(text)
+        for text in articles[:exact_reuploads]
+    ])
+    phase("delete_originals", [
+        lambda doc_id=doc_id: interface.delete_document(doc_id)
+        for doc_id in originals
+    ])
+    return results
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Benchmark near-duplicate detection on the sample corpus")
+    parser.add_argument("--exact-reuploads", type=int, default=5, help="Articles uploaded a second time unchanged")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    results = {
+        "detection_off": run(False, args.exact_reuploads),
+        "detection_on": run(True, args.exact_reuploads),
+    }
+    totals = {
+        name: {
+            "embedding_calls": sum(p["embedding_calls"] for p in phases.values()),
+            "chunks_embedded": sum(p["chunks_embedded"] for p in phases.values()),
+            "peak_stored_objects": max(p["stored_objects"] for p in phases.values()),
+        }
+        for name, phases in results.items()
+    }
+    output = json.dumps({"results": results, "totals": totals}, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Query latency and throughput of the local vector backend by shard count.
+
+Loads the same synthetic clustered vectors into an unsharded LocalVectorStore
+and into ShardedVectorStores with each shard count (shard processes on this
+host), then measures single-client query latency and the throughput of
+concurrent clients. Results are checked against the unsharded store, so the
+scatter-gather merge is verified to return the same top-k. Scaling needs free
+cores: on a machine with fewer cores than shards the extra shards only add
+coordination overhead.
+
+Usage:
+    python benchmarks/sharded_search.py --shards 1 2 4 --num-objects 200000
+    python benchmarks/sharded_search.py --shards 2 4 8 --concurrency 16 --output shards.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from semantic_search.local_vector_store import LocalVectorStore  # noqa: E402
+from semantic_search.sharded_vector_store import ShardedVectorStore  # noqa: E402
+
+
+def make_vectors(num_objects: int, num_queries: int, dimension: int, seed: int):
+    """Clustered unit vectors, so nearest neighbours are meaningful; queries come from the same clusters."""
+    rng = np.random.default_rng(seed)
+    num_clusters = max(num_objects // 100, 1)
+    centers = rng.standard_normal((num_clusters, dimension)).astype(np.float32)
+
+    def sample(count: int) -> np.ndarray:
+        points = centers[rng.integers(0, num_clusters, count)] + 0.5 * rng.standard_normal((count, dimension)).astype(np.float32)
+        return points / np.linalg.norm(points, axis=1, keepdims=True)
+
+    return sample(num_objects), sample(num_queries)
+
+
+def load(store, vectors: np.ndarray, batch_size: int = 10000) -> float:
+    start = time.perf_counter()
+    for offset in range(0, len(vectors), batch_size):
+        batch = vectors[offset:offset + batch_size]
+        store.add([{"row": offset + i} for i in range(len(batch))], batch)
+    return time.perf_counter() - start
+
+
+def measure(store, queries: np.ndarray, k: int, concurrency: int, truth: List[List[int]]) -> Dict[str, Any]:
+    def search(query: np.ndarray) -> List[int]:
+        return [hit["properties"]["row"] for hit in store.query(query, k)]
+
+    search(queries[0])  # warm up connections
+    latencies, matches = [], 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        rows = search(query)
+        latencies.append(time.perf_counter() - start)
+        matches += rows == expected
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(search, queries))
+    wall_time = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "query_latency_ms": {
+            "p50": round(float(np.percentile(latencies_ms, 50)), 3),
+            "p95": round(float(np.percentile(latencies_ms, 95)), 3),
+            "mean": round(float(latencies_ms.mean()), 3),
+        },
+        "throughput_qps": round(len(queries) / wall_time, 1),
+        "matches_unsharded": round(matches / len(queries), 4),
+    }
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Benchmark the sharded local vector backend")
+    parser.add_argument("--shards", nargs="+", type=int, default=[1, 2, 4])
+    parser.add_argument("--num-objects", type=int, default=200000)
+    parser.add_argument("--num-queries", type=int, default=200)
+    parser.add_argument("--dimension", type=int, default=1536)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=8, help="Clients in the throughput run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    vectors, queries = make_vectors(args.num_objects, args.num_queries, args.dimension, args.seed)
+
+    baseline = LocalVectorStore(initial_capacity=len(vectors), dimension=args.dimension)
+    load(baseline, vectors)
+    truth = [[hit["properties"]["row"] for hit in baseline.query(query, args.k)] for query in queries]
+    results = {"unsharded": measure(baseline, queries, args.k, args.concurrency, truth)}
+    print(f"unsharded: {json.dumps(results['unsharded'])}", file=sys.stderr)
+    del baseline
+
+    for num_shards in args.shards:
+        store = ShardedVectorStore.spawn(num_shards, dimension=args.dimension)
+        try:
+            load_time = load(store, vectors)
+            result = measure(store, queries, args.k, args.concurrency, truth)
+            result["load_time_s"] = round(load_time, 2)
+        finally:
+            store.close()
+        results[f"{num_shards}_shards"] = result
+        print(f"{num_shards} shards: {json.dumps(result)}", file=sys.stderr)
+
+    report = {
+        "num_objects": len(vectors),
+        "num_queries": len(queries),
+        "dimension": args.dimension,
+        "k": args.k,
+        "concurrency": args.concurrency,
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Export and import throughput of index snapshots.
+
+Fills the local vector backend with synthetic chunks (random text of realistic
+length with metadata, random vectors), exports it to a snapshot and imports
+it into an empty store, reporting MB/s of snapshot data and objects/s for
+each direction. For comparison it also times the JSON-lines export used by the
+schema migration scripts on the same objects.
+
+Usage:
+    python benchmarks/snapshot.py --num-objects 100000 --dimension 1536
+    python benchmarks/snapshot.py --compression-levels 1 6 9 --output snapshot.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+os.environ["VECTOR_BACKEND"] = "local"
+
+from semantic_search.embedding_manager import EmbeddingManager  # noqa: E402
+from semantic_search.embedding_providers import HashingEmbeddingProvider  # noqa: E402
+
+WORDS = ("vector search index embedding model query latency cluster shard memory "
+         "health diet climate energy ocean history language network storage cache").split()
+
+
+def fill(manager: EmbeddingManager, num_objects: int, dimension: int, seed: int, batch_size: int = 5000):
+    rng = np.random.default_rng(seed)
+    for offset in range(0, num_objects, batch_size):
+        count = min(batch_size, num_objects - offset)
+        objects = [
+            {
+                "text": " ".join(rng.choice(WORDS, 150)),
+                "doc_id": f"doc-{(offset + i) // 10}",
+                "position": (offset + i) % 10,
+                "title": f"Document {(offset + i) // 10}",
+                "field": WORDS[(offset + i) % len(WORDS)],
+                "content_hash": f"{offset + i:032x}",
+            }
+            for i in range(count)
+        ]
+        manager.local_store.add(objects, rng.standard_normal((count, dimension)).astype(np.float32))
+
+
+def snapshot_bytes(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.iterdir())
+
+
+def measure(manager: EmbeddingManager, target: EmbeddingManager, directory: Path, level: int) -> Dict[str, Any]:
+    path = directory / f"snapshot-{level}"
+    start = time.perf_counter()
+    manifest = manager.export_snapshot(path, compresslevel=level)
+    export_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    imported = target.import_snapshot(path)
+    import_time = time.perf_counter() - start
+    assert imported == manifest["count"] == len(target.local_store)
+
+    size_mb = snapshot_bytes(path) / 1024 ** 2
+    shutil.rmtree(path)
+    return {
+        "snapshot_mb": round(size_mb, 1),
+        "table_mb": round(manifest["bytes"]["objects.jsonl.gz"] / 1024 ** 2, 1),
+        "export_s": round(export_time, 2),
+        "export_mb_per_s": round(size_mb / export_time, 1),
+        "export_objects_per_s": round(imported / export_time),
+        "import_s": round(import_time, 2),
+        "import_mb_per_s": round(size_mb / import_time, 1),
+        "import_objects_per_s": round(imported / import_time),
+    }
+
+
+def measure_jsonl(manager: EmbeddingManager, directory: Path) -> Dict[str, Any]:
+    """The JSON-lines format of the schema migration exports, for comparison."""
+    path = directory / "export.jsonl"
+    start = time.perf_counter()
+    with open(path, "w") as f:
+        for batch in manager._iter_object_batches(1000):
+            for obj in batch:
+                f.write(json.dumps({"id": obj["id"], "properties": obj["properties"], "vector": obj["vector"].tolist()}) + "\n")
+    export_time = time.perf_counter() - start
+    size_mb = path.stat().st_size / 1024 ** 2
+    path.unlink()
+    return {"snapshot_mb": round(size_mb, 1), "export_s": round(export_time, 2), "export_mb_per_s": round(size_mb / export_time, 1)}
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Benchmark snapshot export and import")
+    parser.add_argument("--num-objects", type=int, default=100000)
+    parser.add_argument("--dimension", type=int, default=1536)
+    parser.add_argument("--compression-levels", nargs="+", type=int, default=[1, 6, 9])
+    parser.add_argument("--skip-jsonl", action="store_true", help="Do not time the JSON-lines export")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    provider = HashingEmbeddingProvider(dimension=args.dimension)
+    source, target = EmbeddingManager(provider), EmbeddingManager(provider)
+    fill(source, args.num_objects, args.dimension, args.seed)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for level in args.compression_levels:
+            results[f"gzip_{level}"] = measure(source, target, Path(directory), level)
+            print(f"gzip {level}: {json.dumps(results[f'gzip_{level}'])}", file=sys.stderr)
+        if not args.skip_jsonl:
+            results["jsonl"] = measure_jsonl(source, Path(directory))
+            print(f"jsonl: {json.dumps(results['jsonl'])}", file=sys.stderr)
+
+    report = {
+        "num_objects": args.num_objects,
+        "dimension": args.dimension,
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
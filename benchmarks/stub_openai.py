@@ -0,0 +1,170 @@
+"""
+Local stand-in for the OpenAI API used by benchmarks.
+
+Serves the embeddings and chat completions endpoints with deterministic
+responses and configurable latency, so the search server can be driven
+offline without network jitter, rate limits or cost.
+
+Usage:
+    python benchmarks/stub_openai.py --port 8900 --embedding-latency-ms 20
+    export OPENAI_API_BASE=http://127.0.0.1:8900/v1
+"""
+
+import argparse
+import base64
+import json
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+# Same deterministic embeddings as the in-process "hashing" provider
+from semantic_search.embedding_providers import hash_embedding  # noqa: E402
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class StubOpenAIHandler(BaseHTTPRequestHandler):
+    """Handles /v1/embeddings and /v1/chat/completions."""
+
+    server_version = "StubOpenAI/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass  # keep benchmark output clean
+
+    def _send_json(self, payload, status: int = 200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+
+        if self.path.endswith("/embeddings"):
+            self._embeddings(request)
+        elif self.path.endswith("/chat/completions"):
+            self._chat_completion(request)
+        else:
+            self._send_json({"error": {"message": f"Unknown path {self.path}"}}, status=404)
+
+    def _embeddings(self, request):
+        inputs = request.get("input", [])
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        dimension = int(request.get("dimensions") or self.server.embedding_dimension)
+        base64_encoded = request.get("encoding_format") == "base64"
+
+        time.sleep(self.server.embedding_latency)
+        data = []
+        for i, text in enumerate(inputs):
+            vector = hash_embedding(str(text), dimension)
+            embedding = (
+                base64.b64encode(vector.astype("<f4").tobytes()).decode("ascii")
+                if base64_encoded else vector.tolist()
+            )
+            data.append({"object": "embedding", "index": i, "embedding": embedding})
+
+        tokens = sum(len(TOKEN_PATTERN.findall(str(text))) for text in inputs)
+        self.server.record("embeddings", len(inputs))
+        self._send_json({
+            "object": "list",
+            "data": data,
+            "model": request.get("model", "text-embedding-3-small"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        })
+
+    def _chat_completion(self, request):
+        messages = request.get("messages", [])
+        prompt = " ".join(str(m.get("content", "")) for m in messages)
+        prompt_tokens = len(TOKEN_PATTERN.findall(prompt))
+
+        time.sleep(self.server.chat_latency)
+        answer = "Stub answer based on the provided context."
+        completion_tokens = len(TOKEN_PATTERN.findall(answer))
+        self.server.record("chat_completions", 1)
+        self._send_json({
+            "id": f"chatcmpl-stub-{int(time.time() * 1000)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "gpt-3.5-turbo"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": answer},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+
+class StubOpenAIServer(ThreadingHTTPServer):
+    """Threaded stub server that counts the calls it receives."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        port: int = 0,
+        embedding_latency_ms: float = 0.0,
+        chat_latency_ms: float = 0.0,
+        embedding_dimension: int = 1536
+    ):
+        super().__init__(("127.0.0.1", port), StubOpenAIHandler)
+        self.embedding_latency = embedding_latency_ms / 1000
+        self.chat_latency = chat_latency_ms / 1000
+        self.embedding_dimension = embedding_dimension
+        self._lock = threading.Lock()
+        self.calls = {"embeddings": 0, "chat_completions": 0}
+        self.inputs = {"embeddings": 0, "chat_completions": 0}
+
+    @property
+    def api_base(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def record(self, endpoint: str, inputs: int):
+        with self._lock:
+            self.calls[endpoint] += 1
+            self.inputs[endpoint] += inputs
+
+    def start(self) -> "StubOpenAIServer":
+        """Serve in a background thread."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the OpenAI API")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--embedding-latency-ms", type=float, default=0.0)
+    parser.add_argument("--chat-latency-ms", type=float, default=0.0)
+    parser.add_argument("--embedding-dimension", type=int, default=1536)
+    args = parser.parse_args(argv)
+
+    server = StubOpenAIServer(
+        port=args.port,
+        embedding_latency_ms=args.embedding_latency_ms,
+        chat_latency_ms=args.chat_latency_ms,
+        embedding_dimension=args.embedding_dimension,
+    )
+    print(f"Stub OpenAI API listening on {server.api_base}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
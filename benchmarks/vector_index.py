@@ -0,0 +1,197 @@
+"""
+Query latency, recall and memory of Weaviate vector index settings.
+
+For each setting, creates a scratch class with that vectorIndexConfig, imports
+the same synthetic clustered vectors, and measures nearVector query latency and
+recall@k against exact NumPy cosine search. Memory is reported as Weaviate's
+heap growth during the import when its Prometheus endpoint is reachable
+(PROMETHEUS_MONITORING_ENABLED=true, port 2112), plus an estimate of the index
+footprint from the settings. Needs a running Weaviate; nothing touches Articles.
+
+Usage:
+    python benchmarks/vector_index.py --weaviate-url http://localhost:8082 --num-objects 20000
+    python benchmarks/vector_index.py --settings default fast pq --metrics-url http://localhost:2112/metrics
+"""
+
+import argparse
+import json
+import sys
+import time
+import numpy as np
+import requests
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import weaviate  # noqa: E402
+from semantic_search.config import VectorIndexConfig  # noqa: E402
+
+BENCH_CLASS = "VectorIndexBenchmark"
+
+# Named settings; the keys are VectorIndexConfig arguments
+SETTINGS = {
+    "default": {},
+    "fast": {"ef": 64, "ef_construction": 64, "max_connections": 16},
+    "accurate": {"ef": 256, "ef_construction": 256, "max_connections": 64},
+    "pq": {"compression": "pq"},
+    "bq": {"compression": "bq"},  # Weaviate >= 1.24
+}
+
+
+def make_vectors(num_objects: int, num_queries: int, dimension: int, seed: int):
+    """Clustered unit vectors, so nearest neighbours are meaningful; queries come from the same clusters."""
+    rng = np.random.default_rng(seed)
+    num_clusters = max(num_objects // 100, 1)
+    centers = rng.standard_normal((num_clusters, dimension)).astype(np.float32)
+
+    def sample(count: int) -> np.ndarray:
+        points = centers[rng.integers(0, num_clusters, count)] + 0.5 * rng.standard_normal((count, dimension)).astype(np.float32)
+        return points / np.linalg.norm(points, axis=1, keepdims=True)
+
+    return sample(num_objects), sample(num_queries)
+
+
+def heap_inuse_bytes(metrics_url: Optional[str]) -> Optional[float]:
+    if not metrics_url:
+        return None
+    try:
+        for line in requests.get(metrics_url, timeout=5).text.splitlines():
+            if line.startswith("go_memstats_heap_inuse_bytes "):
+                return float(line.split()[1])
+    except requests.RequestException:
+        return None
+    return None
+
+
+def estimated_index_mb(config: VectorIndexConfig, num_objects: int, dimension: int) -> float:
+    """Rough in-memory footprint: vectors (or their compressed codes) plus HNSW links."""
+    if config.compression == "pq":
+        segments = config.pq_segments or dimension // 4
+        vector_bytes = segments  # one byte per segment with 256 centroids
+    elif config.compression == "bq":
+        vector_bytes = dimension / 8
+    else:
+        vector_bytes = 4 * dimension
+    # Layer 0 keeps up to 2 * maxConnections links of 8 bytes per node
+    link_bytes = 2 * config.max_connections * 8
+    return round(num_objects * (vector_bytes + link_bytes) / 1024 ** 2, 1)
+
+
+def wait_for_compression(client, timeout: float = 300.0):
+    """PQ is trained and applied asynchronously after it is enabled."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        shards = client.schema.get_class_shards(BENCH_CLASS)
+        if all(shard.get("status") == "READY" for shard in shards):
+            return
+        time.sleep(1)
+
+
+def run_setting(
+    client,
+    config: VectorIndexConfig,
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int,
+    metrics_url: Optional[str]
+) -> Dict[str, Any]:
+    if client.schema.exists(BENCH_CLASS):
+        client.schema.delete_class(BENCH_CLASS)
+
+    index_config = config.to_weaviate()
+    # Weaviate trains PQ on stored vectors, so it is enabled after the import
+    pq = index_config.pop("pq", None)
+    client.schema.create_class({
+        "class": BENCH_CLASS,
+        "vectorizer": "none",
+        "vectorIndexType": "hnsw",
+        "vectorIndexConfig": index_config,
+        "properties": [{"name": "row", "dataType": ["int"]}],
+    })
+
+    heap_before = heap_inuse_bytes(metrics_url)
+    start = time.perf_counter()
+    with client.batch as batch:
+        batch.batch_size = 200
+        for row, vector in enumerate(vectors):
+            batch.add_data_object({"row": row}, BENCH_CLASS, vector=vector.tolist())
+    import_time = time.perf_counter() - start
+    if pq is not None:
+        client.schema.update_config(BENCH_CLASS, {"vectorIndexConfig": {"pq": pq}})
+        wait_for_compression(client)
+    heap_after = heap_inuse_bytes(metrics_url)
+
+    # Exact neighbours for recall
+    truth = np.argsort(-(queries @ vectors.T), axis=1)[:, :k]
+
+    latencies, recalls = [], []
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        result = (
+            client.query
+            .get(BENCH_CLASS, ["row"])
+            .with_near_vector({"vector": query.tolist()})
+            .with_limit(k)
+            .do()
+        )
+        latencies.append(time.perf_counter() - start)
+        found = {hit["row"] for hit in result["data"]["Get"][BENCH_CLASS]}
+        recalls.append(len(found & set(expected.tolist())) / k)
+
+    client.schema.delete_class(BENCH_CLASS)
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "vector_index_config": config.to_weaviate(),
+        "import_time_s": round(import_time, 2),
+        "query_latency_ms": {
+            "p50": round(float(np.percentile(latencies_ms, 50)), 3),
+            "p95": round(float(np.percentile(latencies_ms, 95)), 3),
+            "p99": round(float(np.percentile(latencies_ms, 99)), 3),
+            "mean": round(float(latencies_ms.mean()), 3),
+        },
+        f"recall_at_{k}": round(float(np.mean(recalls)), 4),
+        "heap_growth_mb": round((heap_after - heap_before) / 1024 ** 2, 1)
+        if heap_before is not None and heap_after is not None else None,
+        "estimated_index_mb": estimated_index_mb(config, len(vectors), vectors.shape[1]),
+    }
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Benchmark Weaviate vector index settings")
+    parser.add_argument("--weaviate-url", default="http://localhost:8082")
+    parser.add_argument("--metrics-url", help="Weaviate Prometheus endpoint, e.g. http://localhost:2112/metrics")
+    parser.add_argument("--settings", nargs="+", default=["default", "fast", "accurate", "pq"], choices=sorted(SETTINGS))
+    parser.add_argument("--num-objects", type=int, default=20000)
+    parser.add_argument("--num-queries", type=int, default=200)
+    parser.add_argument("--dimension", type=int, default=1536)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    client = weaviate.Client(url=args.weaviate_url)
+    vectors, queries = make_vectors(args.num_objects, args.num_queries, args.dimension, args.seed)
+
+    results = {}
+    for name in args.settings:
+        results[name] = run_setting(
+            client, VectorIndexConfig(**SETTINGS[name]), vectors, queries, args.k, args.metrics_url
+        )
+        print(f"{name}: {json.dumps(results[name])}", file=sys.stderr)
+
+    report = {
+        "num_objects": args.num_objects,
+        "num_queries": args.num_queries,
+        "dimension": args.dimension,
+        "k": args.k,
+        "settings": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,10 @@
 import streamlit as st
 import requests
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from typing import List, Dict, Any, Callable, Optional, Tuple
+from urllib3.util.retry import Retry
 import json
 import os
 from dotenv import load_dotenv
@@ -14,25 +18,123 @@ DEFAULT_OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 # Get API URL from environment variable or use the Docker service name as default
 API_URL = os.getenv("API_URL", "http://search_server:8000")
 
-def check_server_health() -> bool:
+# (connect, read) timeouts in seconds; answers are generated while the request waits, so they get longer
+API_CONNECT_TIMEOUT = float(os.getenv("API_CONNECT_TIMEOUT", "3.05"))
+API_READ_TIMEOUT = float(os.getenv("API_READ_TIMEOUT", "30"))
+API_GENERATION_TIMEOUT = float(os.getenv("API_GENERATION_TIMEOUT", "120"))
+REQUEST_TIMEOUT = (API_CONNECT_TIMEOUT, API_READ_TIMEOUT)
+
+# Pooled connections to the API, shared by all sessions of this app process
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", "20"))
+
+# How long read-only responses are reused across reruns and sessions
+HEALTH_TTL_SECONDS = 10
+SAMPLE_QUERIES_TTL_SECONDS = 3600
+CONTENTS_TTL_SECONDS = 60
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """HTTP session with a connection pool, shared across reruns and sessions."""
+    session = requests.Session()
+    # Only idempotent GETs are retried; a retried POST could add a text twice
+    retries = Retry(total=2, backoff_factor=0.2, status_forcelist=(502, 503, 504), allowed_methods=("GET", "HEAD"))
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=API_POOL_SIZE, max_retries=retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def fetch_parallel(*calls: Callable[[], Any]) -> List[Any]:
+    """Run independent calls concurrently; results in call order."""
+    context = get_script_run_ctx()
+
+    def run(call: Callable[[], Any]) -> Any:
+        # Lets cached functions run in the worker thread as they would in the script thread
+        add_script_run_ctx(ctx=context)
+        return call()
+
+    with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+        return list(executor.map(run, calls))
+
+@st.cache_data(ttl=HEALTH_TTL_SECONDS, show_spinner=False)
+def get_server_status() -> str:
+    """Status reported by /health ("healthy" or "degraded"), or "unreachable"."""
     try:
-        response = requests.get(f"{API_URL}/health")
-        return response.status_code == 200
+        response = get_session().get(f"{API_URL}/health", timeout=REQUEST_TIMEOUT)
+        if response.status_code == 200:
+            return response.json().get("status", "healthy")
+        return "unreachable"
     except:
-        return False
+        return "unreachable"
+
+# Documents fetched per "Load more" click in the Database Contents tab
+CONTENTS_PAGE_SIZE = 20
 
-def get_database_contents() -> List[str]:
+@st.cache_data(ttl=CONTENTS_TTL_SECONDS, show_spinner=False)
+def get_database_page(after: Optional[str] = None, limit: int = CONTENTS_PAGE_SIZE) -> Tuple[List[str], Optional[str]]:
+    """Fetch one page of stored texts; returns them with the cursor of the next page (None at the end)."""
     try:
-        response = requests.get(f"{API_URL}/database-contents")
+        params: Dict[str, Any] = {"limit": limit}
+        if after:
+            params["after"] = after
+        response = get_session().get(f"{API_URL}/database-contents", params=params, timeout=REQUEST_TIMEOUT)
         if response.status_code == 200:
-            return response.json()
-        return []
+            return response.json(), response.headers.get("X-Next-Cursor")
+        return [], None
     except:
-        return []
+        return [], None
+
+def invalidate_contents():
+    """Forget cached pages and the loaded listing after the database changed."""
+    get_database_page.clear()
+    st.session_state.pop("contents", None)
+    st.session_state.pop("contents_cursor", None)
+
+def refresh_contents():
+    """Reload the Database Contents tab from its first page."""
+    get_database_page.clear()
+    texts, cursor = get_database_page()
+    st.session_state.contents = texts
+    st.session_state.contents_cursor = cursor
 
+def load_more_contents():
+    """Append the next page to the Database Contents tab."""
+    if not st.session_state.get("contents_cursor"):
+        return
+    texts, cursor = get_database_page(st.session_state.contents_cursor)
+    st.session_state.contents.extend(texts)
+    st.session_state.contents_cursor = cursor
+
+def stream_remaining_contents(container):
+    """
+    Load every document after the current cursor from the NDJSON listing,
+    rendering each one in the container as it arrives.
+    """
+    params = {"format": "ndjson", "properties": "text"}
+    if st.session_state.get("contents_cursor"):
+        params["after"] = st.session_state.contents_cursor
+    contents = st.session_state.setdefault("contents", [])
+    try:
+        with get_session().get(f"{API_URL}/database-contents", params=params, timeout=REQUEST_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                obj = json.loads(line)
+                if "error" in obj:
+                    container.error(f"Listing incomplete: {obj['error']}")
+                    return
+                contents.append(obj.get("text", ""))
+                st.session_state.contents_cursor = obj["id"]
+                with container.expander(f"Document {len(contents)}", expanded=False):
+                    st.markdown(obj.get("text", ""))
+        st.session_state.contents_cursor = None
+    except requests.exceptions.RequestException as e:
+        container.error(f"Error loading contents: {str(e)}")
+
+@st.cache_data(ttl=SAMPLE_QUERIES_TTL_SECONDS, show_spinner=False)
 def get_sample_queries() -> List[str]:
     try:
-        response = requests.get(f"{API_URL}/sample-queries")
+        response = get_session().get(f"{API_URL}/sample-queries", timeout=REQUEST_TIMEOUT)
         if response.status_code == 200:
             return response.json()
         return []
@@ -42,11 +144,13 @@ def get_sample_queries() -> List[str]:
 def process_text(text: str) -> None:
     """Add text to the database."""
     try:
-        response = requests.post(
+        response = get_session().post(
             f"{API_URL}/process-text",
-            json={"text": text}
+            json={"text": text},
+            timeout=REQUEST_TIMEOUT
         )
         if response.status_code == 200:
+            invalidate_contents()
             st.success("Text successfully added to database!")
         else:
             st.error("Failed to add text to database.")
@@ -56,22 +160,24 @@ def process_text(text: str) -> None:
 def clear_database() -> None:
     """Clear all contents from the database."""
     try:
-        response = requests.post(f"{API_URL}/clear-database")
+        response = get_session().post(f"{API_URL}/clear-database", timeout=REQUEST_TIMEOUT)
         if response.status_code == 200:
+            invalidate_contents()
             st.success("Database cleared successfully!")
         else:
             st.error("Failed to clear database.")
     except Exception as e:
         st.error(f"Error: {str(e)}")
 
-def search(query: str, num_results: int) -> Dict[str, Any]:
-    response = requests.post(
+def search(query: str, num_results: int, debug: bool = False) -> Dict[str, Any]:
+    response = get_session().post(
         f"{API_URL}/search",
-        json={"query": query, "num_results": num_results}
+        json={"query": query, "num_results": num_results, "debug": debug},
+        timeout=REQUEST_TIMEOUT
     )
     return response.json()
 
-def ask_question(question: str, num_search_results: int, num_generations: int, api_key: str = None, model: str = "gpt-4-turbo-preview") -> Dict[str, Any]:
+def ask_question(question: str, num_search_results: int, num_generations: int, api_key: Optional[str] = None, model: str = "gpt-4-turbo-preview", debug: bool = False) -> Optional[Dict[str, Any]]:
     """Send a question to the API and get the answer."""
     try:
         # Use provided API key or default from environment
@@ -82,13 +188,15 @@ def ask_question(question: str, num_search_results: int, num_generations: int, a
             
         # The backend API doesn't accept model or api_key parameters
         # Only send the parameters that the backend expects
-        response = requests.post(
+        response = get_session().post(
             f"{API_URL}/ask-question",
             json={
                 "question": question,
                 "num_search_results": num_search_results,
-                "num_generations": num_generations
-            }
+                "num_generations": num_generations,
+                "debug": debug
+            },
+            timeout=(API_CONNECT_TIMEOUT, API_GENERATION_TIMEOUT)
         )
         response.raise_for_status()
         return response.json()
@@ -96,6 +204,17 @@ def ask_question(question: str, num_search_results: int, num_generations: int, a
         st.error(f"Error asking question: {str(e)}")
         return None
 
+def display_timings(response: Dict[str, Any]):
+    """Display the per-stage server timing breakdown of a debug response."""
+    timings = (response or {}).get("debug", {}).get("timings_ms")
+    if not timings:
+        return
+
+    with st.expander(f"Timing breakdown ({timings.get('total', 0):.1f} ms total)", expanded=False):
+        stages = {name: duration for name, duration in timings.items() if name != "total"}
+        st.bar_chart(stages)
+        st.table([{"Stage": name, "Duration (ms)": f"{duration:.3f}"} for name, duration in timings.items()])
+
 def display_search_results(results: Dict[str, Any]):
     if not results.get("results"):
         st.warning("No results found.")
@@ -142,10 +261,20 @@ def main():
     
     st.title("Semantic Search with LLMs")
     
+    # Independent read-only calls, fetched together (and cached, so most reruns make none)
+    server_status, example_questions = fetch_parallel(get_server_status, get_sample_queries)
+
     # Sidebar for API key and model selection
     with st.sidebar:
         st.header("Settings")
         
+        if server_status == "healthy":
+            st.success("API server is healthy")
+        elif server_status == "degraded":
+            st.warning("API server is degraded")
+        else:
+            st.error(f"API server unreachable at {API_URL}")
+
         # API Key input
         api_key = st.text_input(
             "OpenAI API Key",
@@ -171,6 +300,12 @@ def main():
         st.markdown(f"Using model: **{selected_model}**")
         st.markdown("Embedding model: **text-embedding-3-small**")
 
+        st.markdown("---")
+        show_timings = st.checkbox(
+            "Show timing breakdown",
+            help="Request a per-stage server timing breakdown with every search and question."
+        )
+
     # Create tabs
     tab_search, tab_qa, tab_db_manage, tab_db_contents = st.tabs([
         "🔍 Semantic Search",
@@ -192,8 +327,9 @@ def main():
         
         if st.button("Search"):
             if search_query:
-                results = search(search_query, num_results)
+                results = search(search_query, num_results, debug=show_timings)
                 display_search_results(results)
+                display_timings(results)
             else:
                 st.warning("Please enter a search query.")
 
@@ -202,7 +338,6 @@ def main():
         st.header("Question Answering")
         
         # Example questions
-        example_questions = get_sample_queries()
         selected_example = st.selectbox(
             "Choose an example question or write your own:",
             ["Write your own question..."] + example_questions
@@ -230,8 +365,9 @@ def main():
         
         if st.button("Ask Question"):
             if question:
-                response = ask_question(question, num_search_results, num_generations, api_key, selected_model)
+                response = ask_question(question, num_search_results, num_generations, api_key, selected_model, debug=show_timings)
                 display_qa_results(response)
+                display_timings(response)
             else:
                 st.warning("Please enter a question.")
 
@@ -263,12 +399,21 @@ def main():
     with tab_db_contents:
         st.header("Database Contents")
         
-        if st.button("Refresh Contents"):
-            contents = get_database_contents()
+        # Pages are fetched on request and kept across reruns
+        st.button("Refresh Contents", on_click=refresh_contents)
+        contents = st.session_state.get("contents")
+        if contents is not None:
             if contents:
                 for i, text in enumerate(contents, 1):
                     with st.expander(f"Document {i}", expanded=False):
                         st.markdown(text)
+                if st.session_state.get("contents_cursor"):
+                    # Streamed documents render below the loaded ones as they arrive
+                    streamed = st.container()
+                    col_more, col_all = st.columns(2)
+                    col_more.button("Load more", on_click=load_more_contents)
+                    if col_all.button("Load all"):
+                        stream_remaining_contents(streamed)
             else:
                 st.info("The database is empty. Add some documents in the Database Management tab.")
 
@@ -0,0 +1,184 @@
+"""
+Convert the vectors stored in the Articles class to EMBEDDING_DIMENSION.
+
+By default the stored vectors are shortened: each vector keeps its leading
+EMBEDDING_DIMENSION values and is re-normalized, which is how Matryoshka-trained
+models (text-embedding-3) are meant to be shortened, so no embeddings are
+recomputed. With --reembed every chunk is embedded again with the configured
+provider instead; this is needed to lengthen vectors or when the stored
+vectors come from a model without Matryoshka training (text-embedding-ada-002).
+
+Either way the class is rebuilt from an export file, so an interrupted run can
+be resumed with --from-export.
+
+Usage:
+    EMBEDDING_DIMENSION=512 python src/scripts/migrate_embedding_dimension.py --dry-run
+    EMBEDDING_DIMENSION=512 python src/scripts/migrate_embedding_dimension.py
+    EMBEDDING_DIMENSION=1536 python src/scripts/migrate_embedding_dimension.py --reembed
+    python src/scripts/migrate_embedding_dimension.py --from-export cache/articles_export.jsonl
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+import weaviate
+
+from src.semantic_search.config import CACHE_DIR, WEAVIATE_URL, VectorIndexConfig
+from src.semantic_search.embedding_manager import EmbeddingManager
+from src.semantic_search.embedding_providers import (
+    create_embedding_provider,
+    truncate_embedding,
+)
+from src.semantic_search.schema_migration import (
+    count_objects,
+    export_objects,
+    rebuild_class,
+)
+
+
+def stored_dimension(client) -> int:
+    """Length of the vectors in the Articles class (0 if it is empty)."""
+    result = client.data_object.get(class_name="Articles", with_vector=True, limit=1)
+    objects = (result or {}).get("objects") or []
+    return len(objects[0].get("vector") or []) if objects else 0
+
+
+def reembed_export(source: Path, target: Path, provider) -> int:
+    """
+    Copy an export file, replacing every vector with a fresh embedding of the chunk text.
+
+    Args:
+        source: Export file written by export_objects
+        target: File to write; replaced atomically once complete
+        provider: Embedding provider producing the new vectors
+
+    Returns:
+        Number of re-embedded objects
+    """
+    tmp_path = target.with_suffix(target.suffix + ".tmp")
+    written = 0
+
+    def flush(batch, out):
+        vectors = provider.embed([obj["properties"]["text"] for obj in batch])
+        for obj, vector in zip(batch, vectors):
+            obj["vector"] = list(vector)
+            out.write(json.dumps(obj) + "\n")
+        return len(batch)
+
+    with open(source) as f, open(tmp_path, "w") as out:
+        batch = []
+        for line in f:
+            if not line.strip():
+                continue
+            batch.append(json.loads(line))
+            if len(batch) >= provider.batch_size:
+                written += flush(batch, out)
+                batch = []
+                print(f"Re-embedded {written} chunks")
+        if batch:
+            written += flush(batch, out)
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(tmp_path, target)
+    return written
+
+
+def main():
+    """Migrate the Articles class to the configured embedding dimension."""
+    parser = argparse.ArgumentParser(
+        description="Convert stored vectors to EMBEDDING_DIMENSION"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only report the current and target dimension",
+    )
+    parser.add_argument(
+        "--reembed",
+        action="store_true",
+        help="Embed every chunk again instead of shortening the stored vectors",
+    )
+    parser.add_argument(
+        "--export-file",
+        type=Path,
+        default=CACHE_DIR / "articles_export.jsonl",
+        help="Where objects are exported during the rebuild",
+    )
+    parser.add_argument(
+        "--from-export",
+        type=Path,
+        help="Resume from an export file that already holds the converted vectors",
+    )
+    args = parser.parse_args()
+
+    print("\nMigrating embedding dimension...")
+    print("=" * 50)
+
+    try:
+        client = weaviate.Client(url=WEAVIATE_URL)
+        provider = create_embedding_provider()
+        target = provider.dimension
+        definition = EmbeddingManager.articles_class_definition(VectorIndexConfig())
+
+        if args.from_export:
+            report = rebuild_class(
+                client, definition, args.from_export, from_export=True
+            )
+            print(json.dumps(report, indent=2))
+            print("\nMigration completed successfully!")
+            return
+
+        current = stored_dimension(client) if client.schema.exists("Articles") else 0
+        print(
+            f"Stored dimension: {current or 'n/a (empty)'}, target dimension: {target}"
+        )
+        if current == 0 or (current == target and not args.reembed):
+            print("\nNothing to migrate.")
+            return
+        if current < target and not args.reembed:
+            raise ValueError(
+                f"Vectors cannot be lengthened from {current} to {target}; use --reembed"
+            )
+
+        action = "re-embed" if args.reembed else "shorten"
+        print(f"Will {action} {count_objects(client)} objects")
+        if args.dry_run:
+            print("\nDry run, nothing changed.")
+            return
+
+        if args.reembed:
+            raw_file = args.export_file.with_suffix(".raw.jsonl")
+            exported = export_objects(client, raw_file)
+            print(f"Exported {exported} objects to {raw_file}")
+            reembed_export(raw_file, args.export_file, provider)
+            report = rebuild_class(
+                client, definition, args.export_file, from_export=True
+            )
+            raw_file.unlink()
+        else:
+
+            def shorten(obj):
+                obj["vector"] = truncate_embedding(obj["vector"], target).tolist()
+                return obj
+
+            report = rebuild_class(
+                client, definition, args.export_file, transform=shorten
+            )
+
+        print(json.dumps(report, indent=2))
+        print("\nMigration completed successfully!")
+
+    except Exception as e:
+        print(f"\nError migrating embedding dimension: {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Apply the vector index settings from the environment (HNSW_*, VECTOR_DISTANCE,
+VECTOR_COMPRESSION, PQ_*) to the existing Articles class.
+
+Settings Weaviate can change in place (ef, enabling PQ) are updated directly.
+Changing efConstruction, maxConnections, the distance metric or BQ rebuilds
+the class: all objects are exported with their vectors, the class is dropped
+and re-created with the new settings, and the objects are imported again with
+their original ids. No embeddings are recomputed.
+
+Usage:
+    HNSW_EF_CONSTRUCTION=256 HNSW_MAX_CONNECTIONS=32 python src/scripts/migrate_vector_index.py --dry-run
+    VECTOR_COMPRESSION=pq python src/scripts/migrate_vector_index.py
+    python src/scripts/migrate_vector_index.py --from-export cache/articles_export.jsonl
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+import weaviate
+
+from src.semantic_search.config import CACHE_DIR, WEAVIATE_URL, VectorIndexConfig
+from src.semantic_search.embedding_manager import EmbeddingManager
+from src.semantic_search.schema_migration import apply_vector_index_config
+
+
+def main():
+    """Migrate the Articles class to the configured vector index settings."""
+    parser = argparse.ArgumentParser(
+        description="Apply vector index settings to the Articles class"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Only report the changes"
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Rebuild even if the changes can be applied in place",
+    )
+    parser.add_argument(
+        "--export-file",
+        type=Path,
+        default=CACHE_DIR / "articles_export.jsonl",
+        help="Where objects are exported during a rebuild",
+    )
+    parser.add_argument(
+        "--from-export", type=Path, help="Resume a rebuild from an existing export file"
+    )
+    args = parser.parse_args()
+
+    print("\nMigrating vector index settings...")
+    print("=" * 50)
+
+    try:
+        client = weaviate.Client(url=WEAVIATE_URL)
+        definition = EmbeddingManager.articles_class_definition(VectorIndexConfig())
+        print(
+            f"Target vectorIndexConfig: {json.dumps(definition['vectorIndexConfig'])}"
+        )
+
+        report = apply_vector_index_config(
+            client,
+            definition,
+            export_file=args.from_export or args.export_file,
+            rebuild=args.rebuild,
+            dry_run=args.dry_run,
+            from_export=args.from_export is not None,
+        )
+        print(json.dumps(report, indent=2))
+        print(
+            "\nDry run, nothing changed."
+            if args.dry_run
+            else "\nMigration completed successfully!"
+        )
+
+    except Exception as e:
+        print(f"\nError migrating vector index: {str(e)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
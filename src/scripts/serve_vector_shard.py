@@ -0,0 +1,64 @@
+"""
+Serve one shard of the local vector backend, so the collection can be
+partitioned across hosts. Point the search server at the shards with
+LOCAL_SHARD_ADDRESSES=host1:50000,host2:50000 and the same LOCAL_SHARD_AUTHKEY.
+
+Usage:
+    LOCAL_SHARD_AUTHKEY=secret python src/scripts/serve_vector_shard.py --port 50000
+    LOCAL_SHARD_AUTHKEY=secret python src/scripts/serve_vector_shard.py --host 0.0.0.0 --port 50001 --dimension 512
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+from src.semantic_search.config import (
+    EMBEDDING_DIMENSION,
+    FILTERABLE_PROPERTIES,
+    LOCAL_SHARD_AUTHKEY,
+)
+from src.semantic_search.sharded_vector_store import serve_shard
+
+
+def main():
+    """Serve a vector shard until interrupted."""
+    parser = argparse.ArgumentParser(
+        description="Serve a shard of the local vector backend"
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=50000)
+    parser.add_argument(
+        "--dimension",
+        type=int,
+        default=EMBEDDING_DIMENSION,
+        help="Vector length of the collection",
+    )
+    parser.add_argument(
+        "--indexed-properties",
+        default=",".join(FILTERABLE_PROPERTIES + ["content_hash"]),
+        help="Comma-separated properties with an inverted index for filters",
+    )
+    args = parser.parse_args()
+
+    if not LOCAL_SHARD_AUTHKEY:
+        parser.error("Set LOCAL_SHARD_AUTHKEY; clients must present the same key")
+
+    try:
+        serve_shard(
+            (args.host, args.port),
+            LOCAL_SHARD_AUTHKEY.encode("utf-8"),
+            indexed_properties=[
+                name for name in args.indexed_properties.split(",") if name
+            ],
+            dimension=args.dimension,
+        )
+    except KeyboardInterrupt:
+        print("Shard server stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Export the Articles collection to a snapshot, or restore one, without any
+embedding calls. A snapshot is a directory with the vectors as a .npy matrix,
+a gzip-compressed table of ids, texts and metadata, and a manifest.
+
+Works on the configured backend (VECTOR_BACKEND); for the in-process local
+backend use the server's /admin/snapshots endpoints or SEED_SNAPSHOT_PATH instead.
+
+Usage:
+    python src/scripts/snapshot.py export cache/snapshots/2024-05-01
+    python src/scripts/snapshot.py import cache/snapshots/2024-05-01
+    python src/scripts/snapshot.py import cache/snapshots/2024-05-01 --append
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+from src.semantic_search.embedding_manager import EmbeddingManager
+
+
+def main():
+    """Export or import a snapshot of the Articles collection."""
+    parser = argparse.ArgumentParser(
+        description="Export or import a snapshot of the Articles collection"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser(
+        "export", help="Write all objects with their vectors to a snapshot"
+    )
+    export_parser.add_argument("path", type=Path, help="Snapshot directory to write")
+    import_parser = subparsers.add_parser("import", help="Load a snapshot")
+    import_parser.add_argument("path", type=Path, help="Snapshot directory to read")
+    import_parser.add_argument(
+        "--append",
+        action="store_true",
+        help="Keep the existing objects instead of clearing the class",
+    )
+    args = parser.parse_args()
+
+    manager = EmbeddingManager()
+    if args.command == "export":
+        manifest = manager.export_snapshot(args.path)
+        print(json.dumps(manifest, indent=2))
+    else:
+        imported = manager.import_snapshot(args.path, replace=not args.append)
+        print(f"Imported {imported} objects")
+
+
+if __name__ == "__main__":
+    main()
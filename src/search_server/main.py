@@ -1,10 +1,42 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response, Header, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from starlette.routing import Match
+from typing import List, Optional, Dict, Any, Union
+import hashlib
+import hmac
+import itertools
+import json
 import os
+import re
+import time
+import anyio
+from contextlib import nullcontext
+from pathlib import Path
+from fastapi.encoders import jsonable_encoder
 from semantic_search.search_interface import SemanticSearchInterface
-from semantic_search.config import SearchConfig
+from semantic_search.config import (
+    SearchConfig,
+    ADMIN_TOKEN,
+    METADATA_PROPERTIES,
+    ENABLE_ADMISSION_CONTROL,
+    ADMISSION_RESERVED_THREADS,
+    DEFAULT_REQUEST_BUDGET_MS,
+    SEARCH_RESULT_CACHE_TTL_SECONDS,
+    SNAPSHOT_DIR,
+)
 from semantic_search.sample_data import get_all_sample_data
+from semantic_search.timing import RequestTimings, stage
+from semantic_search.deadline import Deadline
+from semantic_search.profiler import SamplingProfiler, ProfilerBusyError
+from semantic_search.admission import AdmissionRejected, create_admission_pools
+from semantic_search.circuit_breaker import CIRCUIT_BREAKERS
+from semantic_search.metrics import (
+    REGISTRY,
+    PROMETHEUS_CONTENT_TYPE,
+    HTTP_REQUEST_LATENCY,
+    HTTP_REQUESTS_IN_FLIGHT,
+)
 
 app = FastAPI(
     title="Search Server API",
@@ -15,25 +47,231 @@ app = FastAPI(
 # Initialize the search interface with sample data loading enabled by default
 load_sample_data = os.getenv("LOAD_SAMPLE_DATA", "true").lower() == "true"
 search_interface = SemanticSearchInterface(load_sample_data=load_sample_data)
+profiler = SamplingProfiler()
+
+# Admission pool of each endpoint; endpoints not listed (probes, metrics, admin) are never limited
+ENDPOINT_POOLS = {
+    "/ask-question": "generation",
+    "/search": "retrieval",
+    "/database-contents": "retrieval",
+    "/process-text": "ingestion",
+    "/documents/{doc_id}": "ingestion",
+    "/clear-database": "ingestion",
+}
+admission_pools = create_admission_pools() if ENABLE_ADMISSION_CONTROL else {}
+
+@app.on_event("startup")
+def reserve_worker_threads():
+    """Size the worker threadpool so the admission pools can never take every thread."""
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    admitted = sum(pool.max_concurrency for pool in admission_pools.values())
+    limiter.total_tokens = max(limiter.total_tokens, admitted + ADMISSION_RESERVED_THREADS)
+
+def _endpoint_label(request: Request) -> str:
+    """
+    Route template of the request, so path parameters do not explode metric cardinality.
+    Matched once per request and kept in request.state, whichever middleware asks first.
+    """
+    endpoint: Optional[str] = getattr(request.state, "endpoint", None)
+    if endpoint is None:
+        endpoint = "unmatched"
+        for route in app.router.routes:
+            match, _ = route.matches(request.scope)
+            if match == Match.FULL:
+                endpoint = str(getattr(route, "path", "unmatched"))
+                break
+        request.state.endpoint = endpoint
+    return endpoint
+
+class _ReleaseAfterSend:
+    """
+    Response wrapper that runs a callback once the response has been sent in full,
+    or sending it failed. call_next returns as soon as the headers are ready, so
+    streamed bodies (NDJSON) are still being produced at that point.
+    """
+
+    def __init__(self, response: Response, callback):
+        self.response = response
+        self.callback = callback
+
+    def __getattr__(self, name: str):
+        return getattr(self.response, name)
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.response(scope, receive, send)
+        finally:
+            self.callback()
+
+@app.middleware("http")
+async def admission_control(request: Request, call_next):
+    """
+    Limit concurrent requests per endpoint pool before they take a worker thread;
+    requests over capacity are rejected at once with Retry-After. A request holds
+    its slot until its response body has been sent.
+    """
+    pool = admission_pools.get(ENDPOINT_POOLS.get(_endpoint_label(request)))
+    if pool is None:
+        return await call_next(request)
+    try:
+        await pool.acquire()
+    except AdmissionRejected as e:
+        return JSONResponse(
+            status_code=e.status_code,
+            content={"detail": f"Server is busy ({e.pool} requests), retry later."},
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    except BaseException:
+        pool.release(time.perf_counter() - start)
+        raise
+    return _ReleaseAfterSend(response, lambda: pool.release(time.perf_counter() - start))
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Record latency and in-flight requests per endpoint."""
+    endpoint = _endpoint_label(request)
+    status = "500"
+    # Latency budgets count from here, so time spent queued for admission is included
+    start = request.state.received_at = time.perf_counter()
+    HTTP_REQUESTS_IN_FLIGHT.labels(endpoint).inc()
+    try:
+        response = await call_next(request)
+        status = str(response.status_code)
+        return response
+    finally:
+        HTTP_REQUESTS_IN_FLIGHT.labels(endpoint).dec()
+        HTTP_REQUEST_LATENCY.labels(request.method, endpoint, status).observe(time.perf_counter() - start)
+
+def _timed_json_response(payload: Dict[str, Any], timings: RequestTimings, debug: bool) -> Response:
+    """
+    Serialize a response payload and attach its per-stage timings as a
+    Server-Timing header and, when requested, as a `debug` field.
+    """
+    with stage("serialization"):
+        body = json.dumps(jsonable_encoder(payload))
+    if debug:
+        # Splice the debug field into the already serialized object, so the
+        # serialization timing it reports covers the whole payload
+        debug_info = json.dumps({"timings_ms": timings.as_dict()})
+        body = f'{body[:-1]}, "debug": {debug_info}}}' if len(payload) else f'{{"debug": {debug_info}}}'
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"Server-Timing": timings.server_timing_header()}
+    )
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evaluate an If-None-Match header (weak comparison, as RFC 9110 requires for GET)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any((tag[2:] if tag.startswith("W/") else tag) == etag for tag in candidates)
+
+def _etag(content: str) -> str:
+    return '"' + hashlib.sha256(content.encode("utf-8")).hexdigest()[:32] + '"'
+
+def _cache_headers(etag: str, max_age: int) -> Dict[str, str]:
+    return {
+        "ETag": etag,
+        "Cache-Control": f"max-age={max_age}, must-revalidate" if max_age else "no-cache",
+    }
+
+def _not_modified(request: Request, etag: str, max_age: int = 0) -> Optional[Response]:
+    """304 Not Modified when the client already holds the representation with this ETag."""
+    if not _etag_matches(request.headers.get("if-none-match"), etag):
+        return None
+    return Response(status_code=304, headers=_cache_headers(etag, max_age))
+
+def _conditional_json_response(
+    payload: Any,
+    request: Request,
+    max_age: int = 0,
+    headers: Optional[Dict[str, str]] = None,
+    etag: Optional[str] = None
+) -> Response:
+    """
+    Serialize a GET payload with an ETag derived from its content (or the given one),
+    answering 304 Not Modified when the client already holds the same representation.
+    """
+    body = json.dumps(jsonable_encoder(payload))
+    etag = etag or _etag(body)
+    not_modified = _not_modified(request, etag, max_age)
+    if not_modified is not None:
+        return not_modified
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={**(headers or {}), **_cache_headers(etag, max_age)}
+    )
 
 class SearchRequest(BaseModel):
     query: str
     num_results: int = 3
+    # Property -> required value, or list of allowed values (title, field, url, doc_id)
+    filters: Optional[Dict[str, Union[str, List[str]]]] = None
+    # Latency budget; overrides the X-Request-Budget-Ms header
+    budget_ms: Optional[float] = None
+    debug: bool = False
 
 class QuestionRequest(BaseModel):
     question: str
     num_search_results: int = 3
     num_generations: int = 1
+    budget_ms: Optional[float] = None
+    debug: bool = False
+
+def _request_deadline(budget_ms: Optional[float], http_request: Request, stages: List[str]) -> Optional[Deadline]:
+    """
+    Deadline for a request from its budget (body field, X-Request-Budget-Ms header,
+    or DEFAULT_REQUEST_BUDGET_MS), counted from the request's arrival.
+    """
+    if budget_ms is None:
+        header = http_request.headers.get("x-request-budget-ms")
+        try:
+            budget_ms = float(header) if header else DEFAULT_REQUEST_BUDGET_MS
+        except ValueError:
+            raise HTTPException(status_code=400, detail="X-Request-Budget-Ms must be a number of milliseconds")
+    if budget_ms <= 0:
+        return None
+    return Deadline(budget_ms / 1000, stages, start=getattr(http_request.state, "received_at", None))
 
 class TextRequest(BaseModel):
     text: str
+    doc_id: Optional[str] = None
+    title: Optional[str] = None
+    field: Optional[str] = None
+    url: Optional[str] = None
+
+class DocumentRequest(BaseModel):
+    text: str
+    title: Optional[str] = None
+    field: Optional[str] = None
+    url: Optional[str] = None
+
+def _document_metadata(request: Union[TextRequest, DocumentRequest]) -> Optional[Dict[str, str]]:
+    """Metadata fields set on an indexing request, or None if there are none."""
+    metadata = {
+        name: getattr(request, name)
+        for name in METADATA_PROPERTIES
+        if getattr(request, name, None)
+    }
+    return metadata or None
 
 @app.post("/process-text")
 def process_text(request: TextRequest):
-    """Process and index new text."""
+    """Process and index new text. Re-submitting with an existing doc_id updates that document."""
     try:
-        search_interface.process_and_index_text(request.text)
-        return {"message": "Text processed successfully"}
+        metadata = _document_metadata(request)
+        if request.doc_id:
+            stats = search_interface.update_document(request.doc_id, request.text, metadata)
+        else:
+            stats = search_interface.process_and_index_text(request.text, metadata=metadata)
+        return {"message": "Text processed successfully", **stats}
     except Exception as e:
         error_msg = str(e)
         print(f"Error processing text: {error_msg}")
@@ -44,16 +282,48 @@ def process_text(request: TextRequest):
         else:
             raise HTTPException(status_code=500, detail=f"Internal server error: {error_msg}")
 
+@app.put("/documents/{doc_id}")
+def update_document(doc_id: str, request: DocumentRequest):
+    """Re-index a document, embedding only the chunks that changed."""
+    try:
+        stats = search_interface.update_document(doc_id, request.text, _document_metadata(request))
+        return {"message": "Document updated successfully", **stats}
+    except Exception as e:
+        error_msg = str(e)
+        print(f"Error updating document: {error_msg}")
+        if "API key" in error_msg or "authentication" in error_msg.lower():
+            raise HTTPException(status_code=401, detail="Authentication error with OpenAI API. Please check your API key.")
+        elif "rate limit" in error_msg.lower() or "quota" in error_msg.lower():
+            raise HTTPException(status_code=429, detail="Rate limit exceeded with OpenAI API.")
+        else:
+            raise HTTPException(status_code=500, detail=f"Internal server error: {error_msg}")
+
+@app.delete("/documents/{doc_id}")
+def delete_document(doc_id: str):
+    """Delete all chunks of a document."""
+    try:
+        deleted = search_interface.delete_document(doc_id)
+        return {"message": "Document deleted successfully", "doc_id": doc_id, "deleted": deleted}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/search")
-def search(request: SearchRequest) -> Dict[str, Any]:
-    """Perform semantic search."""
+def search(request: SearchRequest, http_request: Request) -> Response:
+    """Perform semantic search. With a latency budget, an exhausted budget returns a degraded (empty) result."""
+    deadline = _request_deadline(request.budget_ms, http_request, ["embed_query", "vector_search"])
     try:
-        response = search_interface.search(request.query, request.num_results)
-        # Return results in the format expected by the demo app
-        return {
-            "results": response["results"],
-            "distances": response.get("distances", [])
-        }
+        with RequestTimings() as timings, deadline or nullcontext():
+            response = search_interface.search(request.query, request.num_results, filters=request.filters)
+            # Return results in the format expected by the demo app
+            payload = {
+                "results": response["results"],
+                "distances": response.get("distances", [])
+            }
+            if response.get("degraded"):
+                payload.update(degraded=True, degraded_stages=response["degraded_stages"])
+            return _timed_json_response(payload, timings, request.debug)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         error_msg = str(e)
         print(f"Error in search endpoint: {error_msg}")
@@ -65,15 +335,21 @@ def search(request: SearchRequest) -> Dict[str, Any]:
             raise HTTPException(status_code=500, detail=f"Search error: {error_msg}")
 
 @app.post("/ask-question")
-def ask_question(request: QuestionRequest) -> Dict[str, Any]:
-    """Ask a question and get an answer."""
+def ask_question(request: QuestionRequest, http_request: Request) -> Response:
+    """
+    Ask a question and get an answer. With a latency budget, stages that run out
+    are skipped and the response (documents, possibly no answer) is marked degraded.
+    """
+    deadline = _request_deadline(request.budget_ms, http_request, ["embed_query", "vector_search", "generation"])
     try:
-        response = search_interface.ask_question(
-            request.question,
-            request.num_search_results,
-            request.num_generations
-        )
-        return response  # The response is already in the correct format
+        with RequestTimings() as timings, deadline or nullcontext():
+            response = search_interface.ask_question(
+                request.question,
+                request.num_search_results,
+                request.num_generations
+            )
+            # The response is already in the correct format
+            return _timed_json_response(response, timings, request.debug)
     except Exception as e:
         error_msg = str(e)
         print(f"Error in ask-question endpoint: {error_msg}")
@@ -100,39 +376,207 @@ def health_check():
     status = "healthy"
     message = "Service is running"
     
-    # Don't throw exceptions that could affect the status code
-    try:
-        # Lightweight schema check
-        search_interface.embedding_manager.client.schema.get()
+    # Cached dependency state, so probes do not query Weaviate each time
+    dependencies = search_interface.embedding_manager.dependency_status()
+    if dependencies["ready"]:
         message += " and connected to database"
-    except Exception as e:
+    else:
         status = "degraded"
         message += " but database connection has issues"
-        print(f"Health check warning: {str(e)}")
+        print(f"Health check warning: {dependencies.get('error')}")
     
+    # Dependencies whose circuit is not closed are being bypassed by the fallbacks
+    circuits = {name: breaker.snapshot() for name, breaker in CIRCUIT_BREAKERS.items()}
+    open_circuits = sorted(name for name, circuit in circuits.items() if circuit["state"] != "closed")
+    if open_circuits:
+        status = "degraded"
+        message += f"; serving fallbacks for {', '.join(open_circuits)}"
+
     # Always return 200 OK to pass Docker's healthcheck
-    return {"status": status, "message": message}
+    return {"status": status, "message": message, "circuits": circuits}
+
+@app.get("/livez")
+@app.head("/livez")
+async def liveness():
+    """Liveness probe: the process is serving requests. Never checks dependencies."""
+    return {"status": "alive"}
+
+@app.get("/readyz")
+@app.head("/readyz")
+def readiness(response: Response):
+    """
+    Readiness probe: 503 while the vector backend is unusable, so the replica
+    is taken out of load balancing. Uses the cached dependency state.
+    """
+    dependencies = search_interface.embedding_manager.dependency_status()
+    if not dependencies["ready"]:
+        response.status_code = 503
+    return {"status": "ready" if dependencies["ready"] else "not ready", "vector_store": dependencies}
+
+def _require_admin(token: Optional[str]):
+    """Reject the request unless it carries the configured admin token."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled. Set ADMIN_TOKEN to enable them.")
+    if not token or not hmac.compare_digest(token, ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token.")
+
+@app.post("/admin/profile")
+def profile(
+    seconds: float = 10.0,
+    interval_ms: float = 10.0,
+    include_idle: bool = False,
+    top: int = 30,
+    format: str = "json",
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    Sample the server's Python stacks for N seconds of live traffic.
+    Returns hotspots sorted by self time, or collapsed stacks for flame graph
+    tools (flamegraph.pl, speedscope) with format=collapsed.
+    """
+    _require_admin(x_admin_token)
+    if format not in ("json", "collapsed"):
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'collapsed'")
+    try:
+        report = profiler.profile(seconds, interval_ms=interval_ms, include_idle=include_idle, top=top)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    if format == "collapsed":
+        return Response(content=report["collapsed"] + "\n", media_type="text/plain")
+    return report
+
+# Snapshot names are plain directory names inside SNAPSHOT_DIR
+SNAPSHOT_NAME_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
 
-@app.get("/database-contents")
-def get_database_contents() -> List[str]:
-    """Get all contents from the database."""
+def _snapshot_path(name: str) -> Path:
+    if not SNAPSHOT_NAME_PATTERN.match(name):
+        raise HTTPException(status_code=400, detail="Snapshot names may only contain letters, digits, '_', '.' and '-'")
+    return SNAPSHOT_DIR / name
+
+@app.post("/admin/snapshots/{name}")
+def export_snapshot(name: str, x_admin_token: Optional[str] = Header(None)):
+    """Write every stored chunk with its vector and metadata to the named snapshot in SNAPSHOT_DIR."""
+    _require_admin(x_admin_token)
+    path = _snapshot_path(name)
     try:
-        return search_interface.get_database_contents()
+        return search_interface.export_snapshot(str(path))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Snapshot export failed: {str(e)}")
+
+@app.post("/admin/snapshots/{name}/restore")
+def import_snapshot(name: str, replace: bool = True, x_admin_token: Optional[str] = Header(None)):
+    """Load the named snapshot, replacing the database contents unless replace=false. No embedding calls are made."""
+    _require_admin(x_admin_token)
+    path = _snapshot_path(name)
+    if not path.exists():
+        raise HTTPException(status_code=404, detail=f"Snapshot {name} not found")
+    try:
+        imported = search_interface.import_snapshot(str(path), replace=replace)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Snapshot import failed: {str(e)}")
+    return {"message": f"Imported {imported} chunks", "imported": imported}
+
+@app.get("/metrics")
+def metrics():
+    """Expose metrics in the Prometheus text format."""
+    return Response(content=REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# Distinguishes this server process in generation-based ETags
+SERVER_INSTANCE = os.urandom(8).hex()
+CONTENTS_MAX_PAGE = 1000  # Largest page of the JSON form; stream NDJSON for more
+
+@app.get("/database-contents", response_model=List[str])
+def get_database_contents(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1),
+    after: Optional[str] = None,
+    properties: Optional[str] = None,
+    format: str = "json"
+) -> Response:
+    """
+    Browse the stored chunks in cursor order (by chunk id).
+
+    format=json (default): a JSON list of the texts of up to `limit` chunks (100 by
+    default, at most 1000) after the chunk id `after`. When more may follow, the
+    X-Next-Cursor header holds the `after` value of the next page. Supports
+    conditional GET via ETag/If-None-Match.
+
+    format=ndjson (or Accept: application/x-ndjson): streams one JSON object per
+    chunk, with its id and the comma-separated `properties` (default all), from
+    `after` to the end of the collection, or for `limit` chunks. The server holds
+    one page at a time, however large the collection.
+    """
+    wants_ndjson = format == "ndjson" or NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+    if format not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'ndjson'")
+
+    if not wants_ndjson:
+        if properties is not None:
+            raise HTTPException(status_code=400, detail="properties requires format=ndjson")
+        limit = min(limit or 100, CONTENTS_MAX_PAGE)
+        # A page only changes with the index, so revalidation needs no backend read. The
+        # generation counts this process's writes; SERVER_INSTANCE keeps a restarted
+        # server from matching ETags issued before the restart, and the TTL window bounds
+        # staleness from writes of other replicas, as for cached search results.
+        window = int(time.time() // SEARCH_RESULT_CACHE_TTL_SECONDS) if SEARCH_RESULT_CACHE_TTL_SECONDS > 0 else 0
+        etag = _etag(f"{SERVER_INSTANCE}:{search_interface.index_generation}:{window}:{after}:{limit}")
+        not_modified = _not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+        try:
+            page = search_interface.get_database_page(after, limit, ["text"])
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        headers = {"X-Next-Cursor": page[-1]["id"]} if len(page) == limit else {}
+        return _conditional_json_response(
+            [obj.get("text", "") for obj in page], request, headers=headers, etag=etag
+        )
+
+    names = [name.strip() for name in properties.split(",") if name.strip()] if properties else None
+    objects = search_interface.iter_database_contents(names, after)
+    if limit is not None:
+        objects = itertools.islice(objects, limit)
+    try:
+        # The first page is read before the response starts, so bad requests still get a status code
+        first = next(objects, None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/sample-queries")
-def get_sample_queries() -> List[str]:
-    """Get sample queries for testing."""
-    return [
-        "What are the benefits of cloud computing?",
-        "How does 5G technology improve network performance?",
-        "What are the main cybersecurity threats today?",
-        "How does blockchain technology work?",
-        "What are the key principles of quantum physics?",
-        "How does climate change affect our environment?",
-        "What is the structure of DNA?",
-        "What are the latest developments in space exploration?",
-        "How has digital marketing evolved?",
-        "What are the advantages of remote work?"
-    ] 
\ No newline at end of file
+    def stream():
+        if first is None:
+            return
+        yield json.dumps(first) + "\n"
+        try:
+            for obj in objects:
+                yield json.dumps(obj) + "\n"
+        except Exception as e:
+            # Too late for an error status; the last line tells the client the listing is incomplete
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    return StreamingResponse(stream(), media_type=NDJSON_MEDIA_TYPE)
+
+SAMPLE_QUERIES = [
+    "What are the benefits of cloud computing?",
+    "How does 5G technology improve network performance?",
+    "What are the main cybersecurity threats today?",
+    "How does blockchain technology work?",
+    "What are the key principles of quantum physics?",
+    "How does climate change affect our environment?",
+    "What is the structure of DNA?",
+    "What are the latest developments in space exploration?",
+    "How has digital marketing evolved?",
+    "What are the advantages of remote work?"
+]
+
+@app.get("/sample-queries", response_model=List[str])
+def get_sample_queries(request: Request) -> Response:
+    """Get sample queries for testing. Supports conditional GET via ETag/If-None-Match."""
+    return _conditional_json_response(SAMPLE_QUERIES, request, max_age=3600)
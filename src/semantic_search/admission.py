@@ -0,0 +1,133 @@
+import asyncio
+import math
+import time
+from typing import Dict, Optional
+
+from .config import ADMISSION_POOLS, ADMISSION_QUEUE_TIMEOUT_SECONDS
+from .metrics import (
+    ADMISSION_ACTIVE,
+    ADMISSION_QUEUE_DEPTH,
+    ADMISSION_QUEUE_WAIT,
+    ADMISSION_REJECTIONS,
+)
+
+
+class AdmissionRejected(Exception):
+    """A request was refused because its pool is saturated."""
+
+    def __init__(self, pool: str, status_code: int, retry_after: int, reason: str):
+        super().__init__(f"{pool} pool is saturated ({reason})")
+        self.pool = pool
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class AdmissionPool:
+    """
+    Concurrency limit with a bounded wait queue for one class of endpoints.
+
+    Runs on the server's event loop, before a request is handed to the worker
+    threadpool, so rejected and queued requests hold no thread. Requests beyond
+    max_concurrency wait in FIFO order; when max_queue requests are already
+    waiting, new ones are rejected at once (429), and a request that waits
+    longer than the queue timeout is rejected as well (503). Not thread-safe:
+    all calls must come from the same event loop.
+    """
+
+    # Weight of the latest request in the service time average used for Retry-After
+    SERVICE_TIME_SMOOTHING = 0.2
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        max_queue: int,
+        queue_timeout: float = ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            name: Pool label used in metrics and errors
+            max_concurrency: Requests allowed to run at once (0 disables the limit)
+            max_queue: Requests allowed to wait for a slot
+            queue_timeout: Longest a queued request waits before it is rejected
+        """
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        self._service_time = 1.0
+        # Created on first use, inside the running loop (asyncio objects bind to a loop on Python 3.9)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free: the queue ahead drained at the pool's throughput."""
+        if self.max_concurrency <= 0:
+            return 1
+        estimate = self._service_time * (self.waiting + 1) / self.max_concurrency
+        return min(max(int(math.ceil(estimate)), 1), 60)
+
+    def _reject(self, status_code: int, reason: str):
+        ADMISSION_REJECTIONS.labels(self.name, reason).inc()
+        raise AdmissionRejected(self.name, status_code, self.retry_after(), reason)
+
+    async def acquire(self):
+        """
+        Wait for a slot.
+
+        Raises:
+            AdmissionRejected: The queue is full (429) or the wait timed out (503)
+        """
+        if self.max_concurrency <= 0:
+            return
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        start = time.perf_counter()
+        if not self._semaphore.locked():
+            # A free slot is taken without suspending, so the slot count stays exact
+            await self._semaphore.acquire()
+        else:
+            if self.waiting >= self.max_queue:
+                self._reject(429, "queue_full")
+            self.waiting += 1
+            ADMISSION_QUEUE_DEPTH.labels(self.name).inc()
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._reject(503, "queue_timeout")
+            finally:
+                self.waiting -= 1
+                ADMISSION_QUEUE_DEPTH.labels(self.name).dec()
+        ADMISSION_QUEUE_WAIT.labels(self.name).observe(time.perf_counter() - start)
+        self.active += 1
+        ADMISSION_ACTIVE.labels(self.name).inc()
+
+    def release(self, service_time: float):
+        """
+        Free the slot taken by acquire.
+
+        Args:
+            service_time: Seconds the request held the slot, for Retry-After estimates
+        """
+        if self.max_concurrency <= 0:
+            return
+        if self._semaphore is None:
+            raise RuntimeError(f"{self.name} pool released without acquire")
+        self.active -= 1
+        ADMISSION_ACTIVE.labels(self.name).dec()
+        self._service_time += self.SERVICE_TIME_SMOOTHING * (
+            service_time - self._service_time
+        )
+        self._semaphore.release()
+
+
+def create_admission_pools() -> Dict[str, AdmissionPool]:
+    """Admission pools with the limits from ADMISSION_POOLS in the config."""
+    return {
+        name: AdmissionPool(name, **limits) for name, limits in ADMISSION_POOLS.items()
+    }
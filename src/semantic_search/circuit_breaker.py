@@ -0,0 +1,170 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from .config import CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS
+from .metrics import CIRCUIT_REJECTIONS, CIRCUIT_STATE, CIRCUIT_TRANSITIONS
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Values of the circuit state gauge
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """A call was refused without trying because the dependency's circuit is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"Circuit for {name} is open; next probe in {retry_in:.1f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Stops calling a dependency that keeps failing, so requests fall back
+    immediately instead of each waiting for its own connection timeout.
+
+    Closed: calls go through; failure_threshold consecutive failures open the
+    circuit. Open: calls fail fast with CircuitOpenError for reset_timeout
+    seconds. Half-open: one probe call is let through; its success closes the
+    circuit, its failure opens it again for another reset_timeout.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = CIRCUIT_RESET_SECONDS,
+    ):
+        """
+        Initialize a closed circuit.
+
+        Args:
+            name: Dependency name, used in metrics and errors
+            failure_threshold: Consecutive failures that open the circuit (0 disables the breaker)
+            reset_timeout: Seconds the circuit stays open before a probe is allowed
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._last_error: Optional[str] = None
+        CIRCUIT_STATE.labels(name).set(STATE_VALUES[CLOSED])
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def _transition(self, state: str):
+        # Caller holds the lock
+        if state == self._state:
+            return
+        self._state = state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        CIRCUIT_STATE.labels(self.name).set(STATE_VALUES[state])
+        CIRCUIT_TRANSITIONS.labels(self.name, state).inc()
+        print(f"Circuit for {self.name} is now {state}")
+
+    def _before_call(self) -> bool:
+        """Admit a call or raise CircuitOpenError; returns whether the call is the half-open probe."""
+        with self._lock:
+            if self._state == OPEN:
+                waited = time.monotonic() - self._opened_at
+                if waited < self.reset_timeout:
+                    CIRCUIT_REJECTIONS.labels(self.name).inc()
+                    raise CircuitOpenError(self.name, self.reset_timeout - waited)
+                self._transition(HALF_OPEN)
+            if self._state == HALF_OPEN:
+                if self._probe_in_flight:
+                    CIRCUIT_REJECTIONS.labels(self.name).inc()
+                    raise CircuitOpenError(self.name, 0.0)
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def _after_call(self, probe: bool, error: Optional[BaseException]):
+        with self._lock:
+            if probe:
+                self._probe_in_flight = False
+            if error is None:
+                self._failures = 0
+                self._transition(CLOSED)
+                return
+            self._failures += 1
+            self._last_error = str(error)
+            if probe or self._failures >= self.failure_threshold:
+                self._transition(OPEN)
+                # A failed probe restarts the open period
+                self._opened_at = time.monotonic()
+
+    def call(
+        self,
+        fn: Callable[[], Any],
+        is_failure: Optional[Callable[[BaseException], bool]] = None,
+    ) -> Any:
+        """
+        Call the dependency through the breaker.
+
+        Args:
+            fn: The call
+            is_failure: Decides whether an exception counts against the dependency
+                (default: every exception); e.g. invalid requests should not open the circuit
+
+        Returns:
+            Whatever fn returns
+
+        Raises:
+            CircuitOpenError: The circuit is open, fn was not called
+            Whatever fn raised
+        """
+        if self.failure_threshold <= 0:
+            return fn()
+        probe = self._before_call()
+        try:
+            result = fn()
+        except BaseException as e:
+            if is_failure is None or is_failure(e):
+                self._after_call(probe, e)
+            elif probe:
+                # Not the dependency's fault, so it tells nothing about its health
+                with self._lock:
+                    self._probe_in_flight = False
+            raise
+        self._after_call(probe, None)
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        """State for health endpoints."""
+        with self._lock:
+            snapshot = {"state": self._state, "consecutive_failures": self._failures}
+            if self._state == OPEN:
+                snapshot["retry_in_seconds"] = round(
+                    max(self.reset_timeout - (time.monotonic() - self._opened_at), 0.0),
+                    1,
+                )
+            if self._last_error is not None and self._state != CLOSED:
+                snapshot["last_error"] = self._last_error
+            return snapshot
+
+
+# One breaker per dependency, shared by every caller in the process
+CIRCUIT_BREAKERS: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def circuit_breaker(name: str) -> CircuitBreaker:
+    """Get the breaker of a dependency, creating it on first use."""
+    with _registry_lock:
+        breaker = CIRCUIT_BREAKERS.get(name)
+        if breaker is None:
+            breaker = CIRCUIT_BREAKERS[name] = CircuitBreaker(name)
+        return breaker
@@ -1,6 +1,6 @@
 import os
 from dotenv import load_dotenv, find_dotenv
-from typing import List
+from typing import Any, Dict, List
 from pathlib import Path
 
 # Load environment variables
@@ -27,18 +27,127 @@ def read_secret(secret_name, env_name, default=None):
 
 # OpenAI Configuration
 OPENAI_API_KEY = read_secret("openai_api_key", "OPENAI_API_KEY")
+OPENAI_API_BASE = os.environ.get("OPENAI_API_BASE", "")  # Override to use an OpenAI-compatible server
 OPENAI_MODEL = "gpt-3.5-turbo"  # Default model for generation
 OPENAI_EMBEDDING_MODEL = "text-embedding-3-small"  # Model for embeddings
 OPENAI_TEMPERATURE = 0.5
 OPENAI_MAX_TOKENS = 70
 
+# Embedding provider: "openai", "hashing" (deterministic, in process) or "local" (CPU model from disk)
+EMBEDDING_PROVIDER = os.environ.get("EMBEDDING_PROVIDER", "openai").lower()
+# Vector length stored in the index. text-embedding-3 models are trained so that
+# shortened (Matryoshka) embeddings keep most of their quality: 512 instead of
+# 1536 cuts vector memory and search time about 3x. Changing it for existing
+# data needs src/scripts/migrate_embedding_dimension.py.
+EMBEDDING_DIMENSION = int(os.environ.get("EMBEDDING_DIMENSION", "1536"))
+LOCAL_EMBEDDING_MODEL_PATH = os.environ.get("LOCAL_EMBEDDING_MODEL_PATH", "")
+LOCAL_EMBEDDING_BATCH_SIZE = int(os.environ.get("LOCAL_EMBEDDING_BATCH_SIZE", "32"))
+
+# Query embedding micro-batching: concurrent query embeddings arriving within the
+# window are sent as one request. Larger windows trade latency for fewer calls; 0 disables.
+QUERY_EMBEDDING_BATCH_WINDOW_MS = float(os.environ.get("QUERY_EMBEDDING_BATCH_WINDOW_MS", "2"))
+QUERY_EMBEDDING_MAX_BATCH_SIZE = int(os.environ.get("QUERY_EMBEDDING_MAX_BATCH_SIZE", "64"))
+
+# Concurrent identical searches and questions share one in-flight computation
+ENABLE_SINGLE_FLIGHT = os.environ.get("ENABLE_SINGLE_FLIGHT", "true").lower() == "true"
+
+# Search result cache, invalidated by every index write (0 entries disables it).
+# The TTL bounds staleness when other replicas write to the same Weaviate instance.
+SEARCH_RESULT_CACHE_SIZE = int(os.environ.get("SEARCH_RESULT_CACHE_SIZE", "1024"))
+SEARCH_RESULT_CACHE_TTL_SECONDS = float(os.environ.get("SEARCH_RESULT_CACHE_TTL_SECONDS", "300"))
+
 # Weaviate Configuration
 WEAVIATE_URL = os.environ.get("WEAVIATE_URL", "http://localhost:8082")
 WEAVIATE_API_KEY = read_secret("weaviate_api_key", "WEAVIATE_API_KEY", "")
 
+# Weaviate vector index (HNSW). efConstruction, maxConnections, distance and BQ are fixed
+# when the class is created; changing them needs src/scripts/migrate_vector_index.py.
+VECTOR_DISTANCE = os.environ.get("VECTOR_DISTANCE", "cosine")
+HNSW_EF = int(os.environ.get("HNSW_EF", "-1"))  # -1: dynamic ef derived from the query limit
+HNSW_EF_CONSTRUCTION = int(os.environ.get("HNSW_EF_CONSTRUCTION", "128"))
+HNSW_MAX_CONNECTIONS = int(os.environ.get("HNSW_MAX_CONNECTIONS", "64"))
+# Vector compression: "none", "pq" (product quantization) or "bq" (binary quantization, Weaviate >= 1.24)
+VECTOR_COMPRESSION = os.environ.get("VECTOR_COMPRESSION", "none").lower()
+PQ_SEGMENTS = int(os.environ.get("PQ_SEGMENTS", "0"))  # 0: Weaviate's default for the dimension
+PQ_CENTROIDS = int(os.environ.get("PQ_CENTROIDS", "256"))
+PQ_TRAINING_LIMIT = int(os.environ.get("PQ_TRAINING_LIMIT", "100000"))
+
+# Vector backend: "weaviate", or "local" for an in-process NumPy store (offline development, benchmarks)
+VECTOR_BACKEND = os.environ.get("VECTOR_BACKEND", "weaviate").lower()
+# Sharding of the local backend: LOCAL_SHARDS > 1 partitions the collection across that many
+# shard processes on this host; LOCAL_SHARD_ADDRESSES (host:port,...) uses shard servers started
+# with src/scripts/serve_vector_shard.py instead, on this or other hosts, sharing LOCAL_SHARD_AUTHKEY
+LOCAL_SHARDS = int(os.environ.get("LOCAL_SHARDS", "1"))
+LOCAL_SHARD_ADDRESSES = [a.strip() for a in os.environ.get("LOCAL_SHARD_ADDRESSES", "").split(",") if a.strip()]
+LOCAL_SHARD_AUTHKEY = read_secret("local_shard_authkey", "LOCAL_SHARD_AUTHKEY", "")
+
+# Cached Weaviate schema state: writes and readiness probes re-validate the schema at most
+# this often (and after errors), so probes from every replica stop adding load to Weaviate
+SCHEMA_REFRESH_SECONDS = float(os.environ.get("SCHEMA_REFRESH_SECONDS", "60"))
+SCHEMA_RETRY_SECONDS = 5  # Readiness re-checks a failed schema validation after this long
+
+# Admission control: each endpoint pool runs at most CONCURRENCY requests and queues up to
+# QUEUE more; beyond that requests are rejected with 429, and queued requests that wait
+# longer than the timeout get 503. Generation, retrieval and ingestion are limited
+# separately so slow chat completions cannot starve searches and health probes.
+ENABLE_ADMISSION_CONTROL = os.environ.get("ENABLE_ADMISSION_CONTROL", "true").lower() == "true"
+ADMISSION_POOLS = {
+    pool: {
+        "max_concurrency": int(os.environ.get(f"ADMISSION_{pool.upper()}_CONCURRENCY", concurrency)),
+        "max_queue": int(os.environ.get(f"ADMISSION_{pool.upper()}_QUEUE", queue)),
+    }
+    for pool, concurrency, queue in [
+        ("generation", "4", "16"),
+        ("retrieval", "16", "64"),
+        ("ingestion", "2", "8"),
+    ]
+}
+ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.environ.get("ADMISSION_QUEUE_TIMEOUT_SECONDS", "5"))
+ADMISSION_RESERVED_THREADS = 8  # Worker threads kept free for unlimited endpoints (probes, metrics)
+
+# Admin endpoints (disabled unless a token is configured)
+ADMIN_TOKEN = read_secret("admin_token", "ADMIN_TOKEN", "")
+
+# On-demand profiling
+PROFILE_MAX_SECONDS = 60  # Longest profile a single request may run
+PROFILE_MIN_INTERVAL_MS = 5  # Shortest sampling interval, bounds profiler overhead
+
+# Outbound model calls share one API key and rate limit. At most this many run at once;
+# free slots go to query embeddings first, then answer generation, then bulk ingestion,
+# each class capped by its quota so ingestion cannot crowd out interactive traffic.
+MODEL_MAX_CONCURRENT_CALLS = int(os.environ.get("MODEL_MAX_CONCURRENT_CALLS", "16"))
+MODEL_CALL_QUOTAS = {
+    call_class: int(os.environ.get(f"MODEL_{call_class.upper()}_MAX_CONCURRENT", quota))
+    for call_class, quota in [("query", "16"), ("generation", "12"), ("bulk", "4")]
+}
+
+# Latency budgets: clients may send one per request (budget_ms or X-Request-Budget-Ms);
+# this default applies otherwise (0 = no deadline). The budget is split across the
+# stages by these shares of the time remaining for a stage and the ones after it.
+DEFAULT_REQUEST_BUDGET_MS = float(os.environ.get("DEFAULT_REQUEST_BUDGET_MS", "0"))
+DEADLINE_STAGE_SHARES = {"embed_query": 0.15, "vector_search": 0.15, "generation": 0.7}
+# The Weaviate v3 client has no per-call timeout, so vector queries of requests with a
+# deadline run on this many worker threads and are abandoned when their stage runs out
+WEAVIATE_QUERY_THREADS = int(os.environ.get("WEAVIATE_QUERY_THREADS", "16"))
+
+# Circuit breakers (one per dependency: weaviate, openai): this many consecutive failures
+# open the circuit, after which calls fail fast into the fallbacks for CIRCUIT_RESET_SECONDS
+# before a single probe call is let through (0 failures disables the breakers)
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.environ.get("CIRCUIT_RESET_SECONDS", "30"))
+
 # Search Configuration
 SEARCH_LIMIT = 5
-SEARCH_CERTAINTY = 0.7
+# Minimum Weaviate certainty (1 - cosine distance / 2) of a search result; 0 disables the cutoff.
+# Calibrated for OpenAI embeddings; other providers score on a different scale.
+SEARCH_CERTAINTY = float(os.environ.get("SEARCH_CERTAINTY", "0.7"))
+# Stop results at the N-th jump in distance (Weaviate autocut); 0 disables
+SEARCH_AUTOCUT = int(os.environ.get("SEARCH_AUTOCUT", "1"))
+# Optional rerank: over-fetch candidates with their vectors, rescore exactly and
+# diversify with Maximal Marginal Relevance (MMR_LAMBDA 1.0 = relevance only)
+ENABLE_RERANK = os.environ.get("ENABLE_RERANK", "false").lower() == "true"
+RERANK_OVERFETCH_FACTOR = int(os.environ.get("RERANK_OVERFETCH_FACTOR", "4"))
+MMR_LAMBDA = float(os.environ.get("MMR_LAMBDA", "0.7"))
 
 # Search Configuration
 DEFAULT_LANGUAGE = "en"
@@ -53,10 +162,32 @@ AVAILABLE_LANGUAGES = ["en", "de", "fr", "es", "it", "ja", "ar", "zh", "ko", "hi
 CHUNK_SEPARATOR = "\n\n"
 DEFAULT_CHUNK_SIZE = 1000  # characters per chunk
 DEFAULT_CHUNK_OVERLAP = 200  # characters overlap between chunks
+MAX_DOCUMENT_CHUNKS = 10000  # Weaviate's default QUERY_MAXIMUM_RESULTS
+
+# Document metadata stored with every chunk, and the properties /search can filter on
+METADATA_PROPERTIES = ["title", "field", "url"]
+FILTERABLE_PROPERTIES = ["doc_id"] + METADATA_PROPERTIES
+# Every stored property of a chunk, the ones /database-contents can project
+ARTICLE_PROPERTIES = ["text", "doc_id", "chunk_index", "content_hash"] + METADATA_PROPERTIES
+CONTENTS_PAGE_SIZE = 500  # Objects fetched per page while /database-contents streams the collection
+
+# Near-duplicate detection (MinHash + LSH over chunk shingles)
+ENABLE_NEAR_DUPLICATE_DETECTION = os.environ.get("ENABLE_NEAR_DUPLICATE_DETECTION", "true").lower() == "true"
+NEAR_DUPLICATE_THRESHOLD = float(os.environ.get("NEAR_DUPLICATE_THRESHOLD", "0.8"))  # estimated Jaccard similarity
+NEAR_DUPLICATE_NUM_PERM = 128  # MinHash permutations per signature
+NEAR_DUPLICATE_BANDS = 16  # LSH bands (rows per band = NUM_PERM / BANDS)
+NEAR_DUPLICATE_SHINGLE_SIZE = 5  # characters per shingle
 
 # File Paths
-INDEX_FILE = CACHE_DIR / "search_index.ann"
 TEXT_FILE = CACHE_DIR / "sample_text.txt"
+NEAR_DUPLICATE_INDEX_FILE = CACHE_DIR / "near_duplicate_index.npz"
+SNAPSHOT_DIR = Path(os.environ.get("SNAPSHOT_DIR", str(CACHE_DIR / "snapshots")))  # Snapshots written and read by the admin endpoints
+
+# Index snapshots (vectors.npy plus a gzip-compressed text and metadata table, see snapshot.py)
+SNAPSHOT_BATCH_SIZE = 1000  # Objects per block, read from the backend and written at once
+SNAPSHOT_COMPRESSION_LEVEL = int(os.environ.get("SNAPSHOT_COMPRESSION_LEVEL", "1"))  # gzip level of the table; higher levels export slower
+# Snapshot restored at startup instead of an empty index, e.g. to seed new replicas of the local backend
+SEED_SNAPSHOT_PATH = os.environ.get("SEED_SNAPSHOT_PATH", "")
 
 class SearchConfig:
     """Configuration class for search parameters."""
@@ -80,4 +211,74 @@ class SearchConfig:
             
         self.language = language
         self.properties = properties
-        self.num_results = num_results 
\ No newline at end of file
+        self.num_results = num_results
+
+
+class VectorIndexConfig:
+    """Vector index settings of the Weaviate class (HNSW parameters and compression)."""
+
+    DISTANCES = ["cosine", "dot", "l2-squared", "manhattan", "hamming"]
+    COMPRESSIONS = ["none", "pq", "bq"]
+    # Settings Weaviate only accepts when the class is created
+    IMMUTABLE_KEYS = ["distance", "efConstruction", "maxConnections", "bq"]
+
+    def __init__(
+        self,
+        distance: str = VECTOR_DISTANCE,
+        ef: int = HNSW_EF,
+        ef_construction: int = HNSW_EF_CONSTRUCTION,
+        max_connections: int = HNSW_MAX_CONNECTIONS,
+        compression: str = VECTOR_COMPRESSION,
+        pq_segments: int = PQ_SEGMENTS,
+        pq_centroids: int = PQ_CENTROIDS,
+        pq_training_limit: int = PQ_TRAINING_LIMIT
+    ):
+        """
+        Initialize vector index configuration.
+
+        Args:
+            distance: Distance metric of the index
+            ef: Size of the dynamic candidate list at query time (-1 for dynamic ef);
+                higher values raise recall and latency
+            ef_construction: Candidate list size while building the graph; higher values
+                build a better graph more slowly
+            max_connections: Graph edges per node; more edges raise recall and memory
+            compression: "none", "pq" or "bq"
+            pq_segments: Product quantization segments (0 for Weaviate's default)
+            pq_centroids: Centroids per segment
+            pq_training_limit: Vectors used to train the PQ codebook
+        """
+        if distance not in self.DISTANCES:
+            raise ValueError(f"Distance {distance} not supported. Available distances: {self.DISTANCES}")
+        if compression not in self.COMPRESSIONS:
+            raise ValueError(f"Compression {compression} not supported. Available compressions: {self.COMPRESSIONS}")
+
+        self.distance = distance
+        self.ef = ef
+        self.ef_construction = ef_construction
+        self.max_connections = max_connections
+        self.compression = compression
+        self.pq_segments = pq_segments
+        self.pq_centroids = pq_centroids
+        self.pq_training_limit = pq_training_limit
+
+    def to_weaviate(self) -> Dict[str, Any]:
+        """Build the vectorIndexConfig of a Weaviate class definition."""
+        config = {
+            "distance": self.distance,
+            "ef": self.ef,
+            "efConstruction": self.ef_construction,
+            "maxConnections": self.max_connections,
+        }
+        if self.compression == "pq":
+            pq = {
+                "enabled": True,
+                "centroids": self.pq_centroids,
+                "trainingLimit": self.pq_training_limit,
+            }
+            if self.pq_segments > 0:
+                pq["segments"] = self.pq_segments
+            config["pq"] = pq
+        elif self.compression == "bq":
+            config["bq"] = {"enabled": True}
+        return config
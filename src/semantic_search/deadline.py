@@ -0,0 +1,127 @@
+import threading
+import time
+from contextvars import ContextVar, Token
+from typing import Dict, List, Optional, Sequence
+
+from .config import DEADLINE_STAGE_SHARES
+from .metrics import FALLBACKS
+
+_current_deadline: ContextVar[Optional["Deadline"]] = ContextVar(
+    "request_deadline", default=None
+)
+
+
+class DeadlineExceeded(TimeoutError):
+    """A pipeline stage ran out of the request's latency budget."""
+
+    def __init__(self, stage_name: str):
+        super().__init__(f"Latency budget exhausted during {stage_name}")
+        self.stage_name = stage_name
+
+
+class Deadline:
+    """
+    Latency budget of one request, split across the pipeline stages it runs.
+
+    Each stage may use its share (DEADLINE_STAGE_SHARES) of the time still
+    remaining among itself and the stages after it, so time a fast stage does
+    not use passes on to the later ones. Stages that run out are recorded, and
+    the response built from the partial results is marked as degraded.
+    """
+
+    def __init__(
+        self,
+        budget_seconds: float,
+        stages: Sequence[str],
+        start: Optional[float] = None,
+    ):
+        """
+        Start the budget.
+
+        Args:
+            budget_seconds: Total time the request may take
+            stages: Names of the stages the request runs, in order
+            start: perf_counter() time the budget started at (now by default), e.g. when the request arrived
+        """
+        self.budget = budget_seconds
+        self.stages = list(stages)
+        self.expires_at = (
+            start if start is not None else time.perf_counter()
+        ) + budget_seconds
+        self.degraded_stages: List[str] = []
+        self._lock = threading.Lock()
+        self._token: Optional[Token] = None
+
+    def __enter__(self) -> "Deadline":
+        self._token = _current_deadline.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._token is not None:
+            _current_deadline.reset(self._token)
+            self._token = None
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.perf_counter(), 0.0)
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    @property
+    def degraded(self) -> bool:
+        return bool(self.degraded_stages)
+
+    def stage_timeout(self, stage_name: str) -> float:
+        """
+        Time the stage may take: its share of the remaining budget, relative to
+        the stages still to come. Stages outside the plan may use all of it.
+        """
+        remaining = self.remaining()
+        if stage_name not in self.stages:
+            return remaining
+        upcoming = self.stages[self.stages.index(stage_name) :]
+        shares = [DEADLINE_STAGE_SHARES.get(name, 1.0) for name in upcoming]
+        return remaining * shares[0] / sum(shares) if sum(shares) > 0 else remaining
+
+    def exceeded(self, stage_name: str) -> DeadlineExceeded:
+        """Record that a stage ran out of budget and return the exception to raise."""
+        with self._lock:
+            if stage_name not in self.degraded_stages:
+                self.degraded_stages.append(stage_name)
+        FALLBACKS.labels(f"deadline_{stage_name}").inc()
+        return DeadlineExceeded(stage_name)
+
+    def check(self, stage_name: str):
+        """
+        Raise before starting a stage when no budget is left for it.
+
+        Raises:
+            DeadlineExceeded: The budget is exhausted
+        """
+        if self.expired():
+            raise self.exceeded(stage_name)
+
+    def as_dict(self) -> Dict[str, object]:
+        """Degradation details for a response."""
+        return {
+            "degraded": self.degraded,
+            "degraded_stages": list(self.degraded_stages),
+        }
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Deadline of the request being served in this context, if it has one."""
+    return _current_deadline.get()
+
+
+def stage_timeout(stage_name: str) -> Optional[float]:
+    """Timeout for a stage of the current request, or None when it has no deadline."""
+    deadline = _current_deadline.get()
+    return deadline.stage_timeout(stage_name) if deadline is not None else None
+
+
+def check_deadline(stage_name: str):
+    """Raise DeadlineExceeded if the current request has no budget left for the stage."""
+    deadline = _current_deadline.get()
+    if deadline is not None:
+        deadline.check(stage_name)
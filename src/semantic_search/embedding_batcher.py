@@ -0,0 +1,155 @@
+import threading
+import time
+from typing import List, Optional
+
+from .config import QUERY_EMBEDDING_BATCH_WINDOW_MS, QUERY_EMBEDDING_MAX_BATCH_SIZE
+from .embedding_providers import EmbeddingProvider
+from .metrics import QUERY_EMBEDDING_BATCH_SIZE
+from .model_scheduler import model_scheduler
+
+
+class _Batch:
+    """Texts collected during one batching window and the outcome of embedding them."""
+
+    def __init__(self) -> None:
+        self.texts: List[str] = []
+        # perf_counter() deadline of each caller, None for a caller without one
+        self.deadlines: List[Optional[float]] = []
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.embeddings: List[List[float]] = []
+        self.error: Optional[BaseException] = None
+
+    def latest_deadline(self) -> Optional[float]:
+        """Deadline of the caller willing to wait longest; None if any caller waits indefinitely."""
+        if any(deadline is None for deadline in self.deadlines):
+            return None
+        return max(deadline for deadline in self.deadlines if deadline is not None)
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent single-text embedding requests into batched provider calls.
+
+    The first caller of a batch becomes its leader: it waits up to the window
+    (or until the batch is full), closes the batch and embeds all collected
+    texts in one call. The other callers block until the leader publishes the
+    result and take their own vector from it. The call is given the latest
+    deadline of the batch, so a caller with a longer budget than the leader
+    does not inherit the leader's timeout; each caller still stops waiting at
+    its own deadline. A thread is started only when the call has to outlive
+    the leader's own wait, and several batches can be in flight at once.
+    """
+
+    def __init__(
+        self,
+        provider: EmbeddingProvider,
+        window_ms: float = QUERY_EMBEDDING_BATCH_WINDOW_MS,
+        max_batch_size: int = QUERY_EMBEDDING_MAX_BATCH_SIZE,
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            provider: Provider used to embed the collected texts
+            window_ms: How long the leader waits for more texts; 0 disables batching
+            max_batch_size: Batch size that triggers an immediate flush (capped by the provider's batch size)
+        """
+        self.provider = provider
+        self.window = max(window_ms, 0.0) / 1000
+        self.max_batch_size = max(1, min(max_batch_size, provider.batch_size))
+        self._lock = threading.Lock()
+        self._open: Optional[_Batch] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0 and self.max_batch_size > 1
+
+    def embed(self, text: str, timeout: Optional[float] = None) -> List[float]:
+        """
+        Embed one text, sharing the provider call with concurrent callers.
+
+        Args:
+            text: Text to embed
+            timeout: Seconds to wait for the embedding (None waits indefinitely)
+
+        Returns:
+            Embedding of the text
+
+        Raises:
+            TimeoutError: The batch was not embedded within the timeout
+            Whatever the provider raised for the batch containing the text
+        """
+        if not self.enabled:
+            QUERY_EMBEDDING_BATCH_SIZE.observe(1)
+            return self._embed([text], timeout)[0]
+
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        with self._lock:
+            leader = self._open is None
+            if self._open is None:
+                self._open = _Batch()
+            batch = self._open
+            index = len(batch.texts)
+            batch.texts.append(text)
+            batch.deadlines.append(deadline)
+            if len(batch.texts) >= self.max_batch_size:
+                self._open = None
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(
+                self.window if timeout is None else min(self.window, timeout)
+            )
+            with self._lock:
+                if self._open is batch:
+                    self._open = None
+            # The batch is closed now, so its texts and deadlines can no longer change
+            QUERY_EMBEDDING_BATCH_SIZE.observe(len(batch.texts))
+            batch_deadline = batch.latest_deadline()
+            if batch_deadline == deadline:
+                self._run(batch, batch_deadline)
+            else:
+                # Another caller waits longer, so the call must outlive the leader's wait
+                threading.Thread(
+                    target=self._run, args=(batch, batch_deadline), daemon=True
+                ).start()
+
+        remaining = (
+            None if deadline is None else max(deadline - time.perf_counter(), 0.0)
+        )
+        if not batch.done.wait(remaining):
+            # The call keeps going for the others; this caller just stops waiting
+            raise TimeoutError("Query embedding timed out")
+
+        if batch.error is not None:
+            raise batch.error
+        if len(batch.embeddings) <= index:
+            raise RuntimeError("Query embedding batch finished without a result")
+        return batch.embeddings[index]
+
+    def _run(self, batch: _Batch, deadline: Optional[float]):
+        """Embed a closed batch and publish the outcome to its callers."""
+        try:
+            timeout = (
+                None if deadline is None else max(deadline - time.perf_counter(), 0.001)
+            )
+            batch.embeddings = self._embed(batch.texts, timeout)
+        except BaseException as e:
+            batch.error = e
+        finally:
+            batch.done.set()
+
+    def _embed(self, texts: List[str], timeout: Optional[float]) -> List[List[float]]:
+        """Provider call at query priority; the timeout covers the wait for a slot and the call."""
+        start = time.perf_counter()
+
+        def call():
+            remaining = (
+                None
+                if timeout is None
+                else max(timeout - (time.perf_counter() - start), 0.001)
+            )
+            return self.provider.embed(texts, remaining)
+
+        return model_scheduler.run("query", call, timeout)
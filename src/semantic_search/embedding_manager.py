@@ -1,25 +1,111 @@
-import openai
 import os
+import threading
+import time
+import uuid
 import weaviate
-from typing import List, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, List, Tuple, Optional, Dict, Any
 from .config import (
     OPENAI_API_KEY,
     WEAVIATE_URL,
     WEAVIATE_API_KEY,
-    OPENAI_EMBEDDING_MODEL,
+    MAX_DOCUMENT_CHUNKS,
+    METADATA_PROPERTIES,
+    FILTERABLE_PROPERTIES,
+    VECTOR_BACKEND,
+    SEARCH_CERTAINTY,
+    SEARCH_AUTOCUT,
+    ENABLE_RERANK,
+    RERANK_OVERFETCH_FACTOR,
+    SCHEMA_REFRESH_SECONDS,
+    SCHEMA_RETRY_SECONDS,
+    SNAPSHOT_BATCH_SIZE,
+    SNAPSHOT_COMPRESSION_LEVEL,
+    ARTICLE_PROPERTIES,
+    CONTENTS_PAGE_SIZE,
+    WEAVIATE_QUERY_THREADS,
+    VectorIndexConfig,
+)
+from .text_processor import TextProcessor
+from .sharded_vector_store import create_local_vector_store
+from .embedding_providers import EmbeddingProvider, create_embedding_provider
+from .embedding_batcher import EmbeddingBatcher
+from .model_scheduler import model_scheduler
+from .rerank import mmr_rerank
+from .timing import stage
+from .deadline import DeadlineExceeded, current_deadline, check_deadline
+from .circuit_breaker import circuit_breaker
+from .schema_migration import iter_objects as iter_weaviate_objects
+from .snapshot import SnapshotReader, SnapshotWriter
+from .metrics import (
+    IN_FLIGHT,
+    FALLBACKS,
+    EMBEDDED_TEXTS,
+    RETRIEVED_PASSAGES,
 )
 
 # Import weaviate after other imports to avoid circular imports
 
 class EmbeddingManager:
-    """Manages text embeddings and similarity search operations using Weaviate."""
+    """Manages text embeddings and similarity search operations using Weaviate or the local vector store."""
     
-    def __init__(self):
-        """Initialize the embedding manager with OpenAI and Weaviate clients."""
+    def __init__(
+        self,
+        embedding_provider: Optional[EmbeddingProvider] = None,
+        vector_index_config: Optional[VectorIndexConfig] = None
+    ):
+        """
+        Initialize the embedding manager with an embedding provider and the vector backend.
+
+        Args:
+            embedding_provider: Provider used to embed texts (EMBEDDING_PROVIDER from config by default)
+            vector_index_config: Vector index settings used when creating the Weaviate class
+        """
         # Debug environment variables
         print(f"Initializing EmbeddingManager with:")
         print(f"OPENAI_API_KEY present: {bool(OPENAI_API_KEY)}")
         print(f"WEAVIATE_URL: {os.getenv('WEAVIATE_URL', 'not set')}")
+        print(f"VECTOR_BACKEND: {VECTOR_BACKEND}")
+
+        self.embedding_provider = embedding_provider or create_embedding_provider()
+        print(f"Embedding provider: {self.embedding_provider.name} ({self.embedding_provider.dimension} dimensions)")
+        self.vector_index_config = vector_index_config or VectorIndexConfig()
+        # Concurrent query embeddings share provider calls
+        self.query_batcher = EmbeddingBatcher(self.embedding_provider)
+        # Runs Weaviate vector queries that must finish within a request's budget
+        self._query_executor = ThreadPoolExecutor(
+            max_workers=max(WEAVIATE_QUERY_THREADS, 1), thread_name_prefix="weaviate-query"
+        )
+
+        # Bumped after every write so cached results of older generations are never served
+        self.index_generation = 0
+        self._generation_lock = threading.Lock()
+        # Serializes class creation and re-creation with the writes into the class;
+        # reentrant because writers validate the schema while holding it
+        self._schema_lock = threading.RLock()
+        # Queries share the class; clear_database waits for the running ones and holds
+        # new ones back while it drops and re-creates it (see _querying_class)
+        self._class_swap = threading.Condition()
+        self._class_queries = 0
+        self._class_swapping = False
+        # Outcome of the last schema validation, so writes and health probes do not
+        # fetch the schema every time (see _ensure_schema_exists)
+        self._schema_checked_at: Optional[float] = None
+        self.schema_error: Optional[str] = None
+
+        # The local backend keeps vectors in process memory instead of Weaviate
+        # (optionally sharded across processes, see create_local_vector_store)
+        self.local_store = create_local_vector_store(
+            indexed_properties=FILTERABLE_PROPERTIES + ["content_hash"],
+            dimension=self.embedding_provider.dimension
+        ) if VECTOR_BACKEND == "local" else None
+        # Set once the stored vectors are known to match the provider's dimension
+        self._stored_dimension_checked = False
+        self.client: Any = None
+        if self.local_store is not None:
+            return
         
         try:
             # Initialize Weaviate client with authentication
@@ -36,97 +122,265 @@ class EmbeddingManager:
             print(f"Error connecting to Weaviate: {str(e)}")
             print(f"Creating a dummy client for development")
             self.client = None
+            return
+
+        # Validate the schema once at startup; a failure is recorded for readiness and retried later
+        try:
+            self._ensure_schema_exists()
+        except Exception as e:
+            print(f"Schema validation failed: {str(e)}")
         
+    def _bump_index_generation(self):
+        """Mark the index as changed; called after each write, even a partially failed one."""
+        with self._generation_lock:
+            self.index_generation += 1
+
     def get_embedding(self, text: str) -> List[float]:
         """
-        Create embedding for a single text using OpenAI.
+        Create embedding for a single text using the embedding provider.
+        Concurrent calls are coalesced into batched requests by the query batcher.
         
         Args:
             text: Text string to embed
             
         Returns:
             Embedding as list of floats
+
+        Raises:
+            DeadlineExceeded: The request's latency budget ran out before the embedding arrived
         """
+        deadline = current_deadline()
         try:
-            # Use the older 0.28.0 OpenAI API style
-            openai.api_key = OPENAI_API_KEY
-            
-            # Call the embeddings API directly from the module
-            response = openai.Embedding.create(
-                model=OPENAI_EMBEDDING_MODEL,
-                input=text
-            )
-            return response["data"][0]["embedding"]
+            with stage("embed_query"), \
+                    IN_FLIGHT.labels("embed_query").track_inprogress():
+                if deadline is not None:
+                    deadline.check("embed_query")
+                    embedding = self.query_batcher.embed(text, deadline.stage_timeout("embed_query"))
+                else:
+                    embedding = self.query_batcher.embed(text)
+            EMBEDDED_TEXTS.labels("query").inc()
+            return embedding
+        except DeadlineExceeded:
+            raise
         except Exception as e:
-            print(f"OpenAI embedding error in get_embedding: {str(e)}")
-            # Return dummy embedding with correct dimension
-            # text-embedding-3-small produces 1536-dimensional vectors
-            return [0.0] * 1536
+            if deadline is not None and (isinstance(e, TimeoutError) or "timed out" in str(e).lower()):
+                # A zero vector would return arbitrary passages; skip retrieval instead
+                raise deadline.exceeded("embed_query") from e
+            print(f"Embedding error in get_embedding: {str(e)}")
+            FALLBACKS.labels("dummy_query_embedding").inc()
+            # Return dummy embedding with the provider's dimension
+            return [0.0] * self.embedding_provider.dimension
     
     def search(
         self,
         query: str,
         num_results: int = 5,
-        include_distances: bool = True
+        include_distances: bool = True,
+        certainty: float = SEARCH_CERTAINTY,
+        autocut: int = SEARCH_AUTOCUT,
+        rerank: bool = ENABLE_RERANK,
+        filters: Optional[Dict[str, Any]] = None
     ) -> Tuple[List[str], Optional[List[float]]]:
         """
         Search for similar texts using Weaviate's vector similarity search.
+        Low-relevance results are pruned in the vector query itself, so fewer
+        than num_results texts may be returned.
         
         Args:
             query: Search query
-            num_results: Number of results to return
+            num_results: Maximum number of results to return
             include_distances: Whether to include distances in results
+            certainty: Minimum certainty (1 - cosine distance / 2) of a result; 0 disables the cutoff
+            autocut: Stop results at this many jumps in distance; 0 disables autocut
+            rerank: Over-fetch candidates and pick a diverse final set with MMR
+            filters: Property values results must have, e.g. {"field": "Health"} or
+                {"field": ["Health", "Science"]}; applied as a pre-filter in the vector query
             
         Returns:
-            Tuple of (list of texts, optional list of similarity scores)
+            Tuple of (list of texts, optional list of similarity scores); empty
+            when the request's latency budget runs out (the deadline records it)
         """
         try:
             # Get query embedding
             query_embedding = self.get_embedding(query)
+            limit = num_results * max(RERANK_OVERFETCH_FACTOR, 1) if rerank else num_results
             
-            # Perform vector similarity search in Weaviate
-            result = (
-                self.client.query
-                .get("Articles", ["text"])
-                .with_near_vector({
-                    "vector": query_embedding
-                })
-                .with_limit(num_results)
-                .with_additional(["distance"] if include_distances else [])
-                .do()
-            )
+            check_deadline("vector_search")
+            with stage("vector_search"), \
+                    IN_FLIGHT.labels("vector_search").track_inprogress():
+                candidates = self._vector_query(query_embedding, limit, certainty, autocut, rerank, filters)
             
-            # Extract results, handle case when no results are found
-            if (not result.get("data") or 
-                not result["data"].get("Get") or 
-                not result["data"]["Get"].get("Articles") or 
-                len(result["data"]["Get"]["Articles"]) == 0):
-                print("No search results found in the database")
-                return [], [] if include_distances else None
-                
-            articles = result["data"]["Get"]["Articles"]
-            texts = [article.get("text", "") for article in articles]
+            if rerank and len(candidates) > 1:
+                with stage("rerank"):
+                    selected, similarities = mmr_rerank(
+                        query_embedding,
+                        [candidate["vector"] for candidate in candidates],
+                        num_results
+                    )
+                candidates = [
+                    dict(candidates[i], similarity=similarity)
+                    for i, similarity in zip(selected, similarities)
+                ]
+            candidates = candidates[:num_results]
             
-            # Return distances if requested
+            RETRIEVED_PASSAGES.observe(len(candidates))
+            if not candidates:
+                print("No search results found in the database")
+            texts = [candidate["text"] for candidate in candidates]
             if include_distances:
-                # Convert distances to similarities (1 - distance)
-                similarities = []
-                for article in articles:
-                    if "_additional" in article and "distance" in article["_additional"]:
-                        similarities.append(1 - article["_additional"]["distance"])
-                    else:
-                        similarities.append(0.0)  # Default similarity if distance is missing
-                return texts, similarities
-            
+                return texts, [candidate["similarity"] for candidate in candidates]
             return texts, None
+        except DeadlineExceeded as e:
+            print(f"Search degraded: {str(e)}")
+            return [], [] if include_distances else None
         except Exception as e:
             print(f"Error in search: {str(e)}")
+            FALLBACKS.labels("search_error").inc()
             # Return empty results instead of failing
             return [], [] if include_distances else None
 
+    def _vector_query(
+        self,
+        query_embedding: List[float],
+        limit: int,
+        certainty: float,
+        autocut: int,
+        include_vectors: bool,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Run the nearest-neighbour query against the active backend.
+
+        Returns:
+            List of dictionaries with text, similarity (1 - distance) and, if requested, vector
+        """
+        if self.local_store is not None:
+            # Certainty and cosine distance are related by certainty = 1 - distance / 2
+            max_distance = 2 * (1 - certainty) if certainty > 0 else None
+            hits = self.local_store.query(query_embedding, limit, max_distance, autocut, include_vectors, filters)
+            return [
+                {
+                    "text": hit["properties"].get("text", ""),
+                    "similarity": 1 - hit["distance"],
+                    "vector": hit.get("vector"),
+                }
+                for hit in hits
+            ]
+
+        near_vector: Dict[str, Any] = {"vector": query_embedding}
+        # Weaviate only defines certainty for the cosine distance
+        if certainty > 0 and self.vector_index_config.distance == "cosine":
+            near_vector["certainty"] = certainty
+
+        # Perform vector similarity search in Weaviate
+        search_query = (
+            self.client.query
+            .get("Articles", ["text"])
+            .with_near_vector(near_vector)
+            .with_limit(limit)
+            .with_additional(["distance", "vector"] if include_vectors else ["distance"])
+        )
+        if autocut > 0:
+            search_query = search_query.with_autocut(autocut)
+        if filters:
+            search_query = search_query.with_where(self._where_filter(filters))
+        def run_query() -> Dict[str, Any]:
+            with self._querying_class():
+                # Fails fast with CircuitOpenError while Weaviate is known to be down
+                return circuit_breaker("weaviate").call(search_query.do)
+
+        result = self._bounded_query(run_query)
+        if result.get("errors"):
+            # The class may have been dropped or changed elsewhere; re-validate on the next write
+            self._invalidate_schema_state(str(result["errors"]))
+
+        # Extract results, handle case when no results are found
+        articles = ((result.get("data") or {}).get("Get") or {}).get("Articles") or []
+        candidates = []
+        for article in articles:
+            additional = article.get("_additional") or {}
+            candidates.append({
+                "text": article.get("text", ""),
+                # Convert distances to similarities (1 - distance); default if distance is missing
+                "similarity": 1 - additional["distance"] if additional.get("distance") is not None else 0.0,
+                "vector": additional.get("vector"),
+            })
+        return candidates
+
+    @contextmanager
+    def _querying_class(self) -> Iterator[None]:
+        """
+        Hold the Articles class for a query. Queries do not block each other or the
+        writers, only clear_database, which would otherwise drop the class under them
+        and trip the weaviate circuit breaker with "class not found" errors.
+        """
+        with self._class_swap:
+            self._class_swap.wait_for(lambda: not self._class_swapping)
+            self._class_queries += 1
+        try:
+            yield
+        finally:
+            with self._class_swap:
+                self._class_queries -= 1
+                self._class_swap.notify_all()
+
+    @contextmanager
+    def _swapping_class(self) -> Iterator[None]:
+        """Hold queries back while the class is dropped and re-created."""
+        with self._class_swap:
+            self._class_swapping = True
+            self._class_swap.wait_for(lambda: self._class_queries == 0)
+        try:
+            yield
+        finally:
+            with self._class_swap:
+                self._class_swapping = False
+                self._class_swap.notify_all()
+
+    def _bounded_query(self, query: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Run a Weaviate query within the vector_search share of the request's budget.
+        The v3 client has no per-call timeout, so with a deadline the query runs on a
+        worker thread; when the budget runs out it is left to finish there.
+
+        Raises:
+            DeadlineExceeded: The query did not finish within the budget
+        """
+        deadline = current_deadline()
+        if deadline is None:
+            return query()
+        future = self._query_executor.submit(query)
+        try:
+            return future.result(timeout=deadline.stage_timeout("vector_search"))
+        except FutureTimeoutError:
+            if future.done():
+                # The query itself raised a timeout
+                raise
+            future.cancel()
+            raise deadline.exceeded("vector_search") from None
+
+    @staticmethod
+    def _where_filter(filters: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Translate property filters into a Weaviate where clause: values of one
+        property are alternatives (Or), different properties must all match (And).
+        """
+        operands = []
+        for name, value in filters.items():
+            values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+            alternatives = [
+                {"path": [name], "operator": "Equal", "valueText": str(v)}
+                for v in values
+            ]
+            operands.append(alternatives[0] if len(alternatives) == 1 else {
+                "operator": "Or",
+                "operands": alternatives
+            })
+        return operands[0] if len(operands) == 1 else {"operator": "And", "operands": operands}
+
     def create_embeddings(self, texts: List[str]) -> List[List[float]]:
         """
-        Create embeddings for multiple texts using OpenAI.
+        Create embeddings for multiple texts using the embedding provider.
         
         Args:
             texts: List of text strings to embed
@@ -134,28 +388,29 @@ class EmbeddingManager:
         Returns:
             List of embeddings as lists of floats
         """
+        with stage("create_embeddings"), \
+                IN_FLIGHT.labels("create_embeddings").track_inprogress():
+            return self._create_embeddings(texts)
+
+    def _create_embeddings(self, texts: List[str]) -> List[List[float]]:
         # Process texts in batches to avoid rate limits
         embeddings = []
-        batch_size = 100  # OpenAI allows up to 2048 texts per request, but we'll be conservative
+        batch_size = self.embedding_provider.batch_size
+        dimension = self.embedding_provider.dimension
         
         try:
-            # Set API key for the older style API
-            openai.api_key = OPENAI_API_KEY
-            
             for i in range(0, len(texts), batch_size):
                 batch = texts[i:i + batch_size]
                 try:
-                    response = openai.Embedding.create(
-                        model=OPENAI_EMBEDDING_MODEL,
-                        input=batch
-                    )
-                    batch_embeddings = [item["embedding"] for item in response["data"]]
+                    with stage("embedding_batch"):
+                        # Lowest priority: interactive calls overtake queued ingestion batches
+                        batch_embeddings = model_scheduler.run("bulk", lambda: self.embedding_provider.embed(batch))
+                    EMBEDDED_TEXTS.labels("document").inc(len(batch))
                     embeddings.extend(batch_embeddings)
                 except Exception as e:
-                    print(f"OpenAI embedding error for batch {i//batch_size}: {str(e)}")
-                    # Fall back to dummy embeddings with correct dimension for this model
-                    # text-embedding-3-small produces 1536-dimensional vectors
-                    dimension = 1536
+                    print(f"Embedding error for batch {i//batch_size}: {str(e)}")
+                    FALLBACKS.labels("dummy_document_embedding").inc(len(batch))
+                    # Fall back to dummy embeddings with the provider's dimension
                     dummy_embeddings = [[0.0] * dimension for _ in range(len(batch))]
                     print(f"Using dummy embeddings for this batch")
                     embeddings.extend(dummy_embeddings)
@@ -163,15 +418,23 @@ class EmbeddingManager:
             return embeddings
         except Exception as e:
             print(f"Fatal error in create_embeddings: {str(e)}")
+            FALLBACKS.labels("dummy_document_embedding").inc(len(texts))
             # Return dummy embeddings for the requested number of texts
-            dimension = 1536
             return [[0.0] * dimension for _ in range(len(texts))]
 
     def get_embeddings(self, texts: List[str]) -> List[List[float]]:
         """Alias for create_embeddings for backward compatibility."""
         return self.create_embeddings(texts)
 
-    def build_search_index(self, texts: List[str], embeddings: List[List[float]]):
+    def build_search_index(
+        self,
+        texts: List[str],
+        embeddings: List[List[float]],
+        doc_id: Optional[str] = None,
+        positions: Optional[List[int]] = None,
+        check_duplicates: bool = True,
+        metadata: Optional[Dict[str, str]] = None
+    ):
         """
         Build search index in Weaviate using text chunks and their embeddings.
         Checks for duplicates before adding new documents.
@@ -179,47 +442,272 @@ class EmbeddingManager:
         Args:
             texts: List of text chunks
             embeddings: List of embeddings corresponding to the text chunks
+            doc_id: ID of the document the chunks belong to
+            positions: Position of each chunk within its document (defaults to list order)
+            check_duplicates: Whether to skip chunks whose text is already stored
+            metadata: Document metadata stored with every chunk (title, field, url)
         """
         # Check if client is None (development or error mode)
-        if self.client is None:
+        if self.client is None and self.local_store is None:
             print("Warning: Weaviate client is not available, skipping index building")
             return
 
-        # Ensure the schema exists
-        self._ensure_schema_exists()
-        
-        # Add data objects with vectors
-        with self.client.batch as batch:
-            batch.batch_size = 100
-            for text, embedding in zip(texts, embeddings):
-                # Check if text already exists
-                result = (
-                    self.client.query
-                    .get("Articles", ["text"])
-                    .with_where({
-                        "path": ["text"],
-                        "operator": "Equal",
-                        "valueText": text
-                    })
-                    .do()
-                )
-                
-                # Only add if text doesn't exist
-                if not result["data"]["Get"]["Articles"]:
-                    # Create data object
-                    properties = {
-                        "text": text,
-                    }
-                    
+        try:
+            with stage("build_search_index"), \
+                    IN_FLIGHT.labels("build_search_index").track_inprogress():
+                self._build_search_index(texts, embeddings, doc_id, positions, check_duplicates, metadata)
+        except Exception as e:
+            self._invalidate_schema_state(str(e))
+            raise
+        finally:
+            self._bump_index_generation()
+
+    def _build_search_index(
+        self,
+        texts: List[str],
+        embeddings: List[List[float]],
+        doc_id: Optional[str],
+        positions: Optional[List[int]],
+        check_duplicates: bool,
+        metadata: Optional[Dict[str, str]]
+    ):
+        if positions is None:
+            positions = list(range(len(texts)))
+        dimension = self.embedding_provider.dimension
+        wrong = next((len(e) for e in embeddings if len(e) != dimension), None)
+        if wrong is not None:
+            raise ValueError(f"Embedding has {wrong} dimensions, the index stores {dimension}")
+
+        if self.local_store is not None:
+            objects, vectors = [], []
+            for text, embedding, position in zip(texts, embeddings, positions):
+                properties = self._chunk_properties(text, doc_id, position, metadata)
+                # The content hash is indexed, so the duplicate check is a lookup rather than a scan
+                if check_duplicates and self.local_store.find({"content_hash": properties["content_hash"]}, limit=1):
+                    continue
+                objects.append(properties)
+                vectors.append(embedding)
+            self.local_store.add(objects, vectors)
+            return
+
+        # Held while writing, so clear_database never drops the class mid-batch
+        with self._schema_lock:
+            # Ensure the schema exists
+            self._ensure_schema_exists()
+
+            # Add data objects with vectors
+            with self.client.batch as batch:
+                batch.batch_size = 100
+                for text, embedding, position in zip(texts, embeddings, positions):
+                    if check_duplicates:
+                        # Check if text already exists
+                        result = (
+                            self.client.query
+                            .get("Articles", ["text"])
+                            .with_where({
+                                "path": ["text"],
+                                "operator": "Equal",
+                                "valueText": text
+                            })
+                            .do()
+                        )
+                        if result["data"]["Get"]["Articles"]:
+                            continue
+
                     # Add the object with its vector
                     batch.add_data_object(
-                        data_object=properties,
+                        data_object=self._chunk_properties(text, doc_id, position, metadata),
                         class_name="Articles",
                         vector=embedding
                     )
 
+    @staticmethod
+    def _chunk_properties(
+        text: str,
+        doc_id: Optional[str],
+        position: int,
+        metadata: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """Build the stored properties of a chunk."""
+        properties: Dict[str, Any] = {
+            "text": text,
+            "content_hash": TextProcessor.content_hash(text),
+        }
+        if doc_id is not None:
+            properties["doc_id"] = doc_id
+            properties["chunk_index"] = int(position)
+        for name in METADATA_PROPERTIES:
+            if metadata and metadata.get(name):
+                properties[name] = str(metadata[name])
+        return properties
+
+    def get_document_chunks(self, doc_id: str) -> List[Dict[str, Any]]:
+        """
+        Get the stored chunks of a document.
+
+        Args:
+            doc_id: ID of the document
+
+        Returns:
+            List of dictionaries with the object id, chunk_index and content_hash of each chunk
+        """
+        if self.local_store is not None:
+            return [
+                {
+                    "id": obj["id"],
+                    "chunk_index": obj["properties"].get("chunk_index"),
+                    "content_hash": obj["properties"].get("content_hash"),
+                }
+                for obj in self.local_store.find({"doc_id": doc_id})
+            ]
+
+        if self.client is None:
+            print("Warning: Weaviate client is not available, returning no document chunks")
+            return []
+
+        self._ensure_schema_exists()
+        result = (
+            self.client.query
+            .get("Articles", ["chunk_index", "content_hash"])
+            .with_where({
+                "path": ["doc_id"],
+                "operator": "Equal",
+                "valueText": doc_id
+            })
+            .with_additional(["id"])
+            .with_limit(MAX_DOCUMENT_CHUNKS)
+            .do()
+        )
+
+        articles = (result.get("data") or {}).get("Get", {}).get("Articles") or []
+        return [
+            {
+                "id": article["_additional"]["id"],
+                "chunk_index": article.get("chunk_index"),
+                "content_hash": article.get("content_hash"),
+            }
+            for article in articles
+        ]
+
+    def update_chunk_positions(self, positions: Dict[str, int]):
+        """
+        Update the position of stored chunks that moved within their document.
+
+        Args:
+            positions: Mapping of object id to new chunk index
+        """
+        self.update_chunk_properties({
+            object_id: {"chunk_index": int(position)} for object_id, position in positions.items()
+        })
+
+    def update_chunk_properties(self, updates: Dict[str, Dict[str, Any]]):
+        """
+        Merge new property values into stored chunks without re-embedding them.
+
+        Args:
+            updates: Mapping of object id to the properties to set
+        """
+        if self.local_store is not None:
+            for object_id, properties in updates.items():
+                self.local_store.update(object_id, properties)
+            if updates:
+                self._bump_index_generation()
+            return
+
+        if self.client is None or not updates:
+            return
+
+        try:
+            with self._schema_lock:
+                for object_id, properties in updates.items():
+                    self.client.data_object.update(
+                        data_object=properties,
+                        class_name="Articles",
+                        uuid=object_id
+                    )
+        finally:
+            self._bump_index_generation()
+
+    def delete_objects(self, object_ids: List[str]) -> int:
+        """
+        Delete stored objects by id in batches.
+
+        Args:
+            object_ids: Weaviate object ids to delete
+
+        Returns:
+            Number of objects deleted
+        """
+        if self.local_store is not None:
+            try:
+                return self.local_store.delete(object_ids)
+            finally:
+                self._bump_index_generation()
+
+        if self.client is None or not object_ids:
+            return 0
+
+        deleted = 0
+        batch_size = 100
+        try:
+            with self._schema_lock:
+                for i in range(0, len(object_ids), batch_size):
+                    batch_ids = object_ids[i:i + batch_size]
+                    result = self.client.batch.delete_objects(
+                        class_name="Articles",
+                        where={
+                            "path": ["id"],
+                            "operator": "ContainsAny",
+                            "valueTextArray": batch_ids
+                        }
+                    )
+                    deleted += (result or {}).get("results", {}).get("successful", len(batch_ids))
+        finally:
+            self._bump_index_generation()
+        return deleted
+
+    def delete_document(self, doc_id: str) -> int:
+        """
+        Delete all stored chunks of a document.
+
+        Args:
+            doc_id: ID of the document
+
+        Returns:
+            Number of chunks deleted
+        """
+        if self.local_store is not None:
+            try:
+                return self.local_store.delete([obj["id"] for obj in self.local_store.find({"doc_id": doc_id})])
+            finally:
+                self._bump_index_generation()
+
+        if self.client is None:
+            print("Warning: Weaviate client is not available, skipping document deletion")
+            return 0
+
+        try:
+            with self._schema_lock:
+                self._ensure_schema_exists()
+                result = self.client.batch.delete_objects(
+                    class_name="Articles",
+                    where={
+                        "path": ["doc_id"],
+                        "operator": "Equal",
+                        "valueText": doc_id
+                    }
+                )
+        finally:
+            self._bump_index_generation()
+        return (result or {}).get("results", {}).get("successful", 0)
+
     def clear_database(self):
         """Clear all contents from the database."""
+        if self.local_store is not None:
+            self.local_store.clear()
+            self._bump_index_generation()
+            return
+
         # Check if client is None (development or error mode)
         if self.client is None:
             print("Warning: Weaviate client is not available, skipping database clearing")
@@ -227,78 +715,446 @@ class EmbeddingManager:
             
         try:
             print("Clearing existing database...")
-            # Ensure schema exists before attempting to delete
-            self._ensure_schema_exists()
-            
-            # Delete all objects in the Articles class where text exists
-            self.client.batch.delete_objects(
-                class_name="Articles",
-                where={
-                    "path": ["text"],
-                    "operator": "Like",
-                    "valueString": "*"  # Match any text
-                }
-            )
+            # Dropping the class removes every object in one call, independent of the
+            # collection size and of the per-call batch delete limit, so a partly
+            # cleared index is never visible. Writers hold the same lock, so none of
+            # them writes into the class while it is dropped, and queries wait until
+            # it is re-created instead of failing on a missing class.
+            with self._schema_lock, self._swapping_class():
+                if self.client.schema.exists("Articles"):
+                    self.client.schema.delete_class("Articles")
+                self.client.schema.create_class(self.articles_class_definition(self.vector_index_config))
+                # The new class takes its vector length from the next write
+                self._stored_dimension_checked = False
+                self._record_schema_state(None)
             print("Database cleared successfully")
         except Exception as e:
             print(f"Error clearing database: {str(e)}")
+            self._invalidate_schema_state(str(e))
             raise e
+        finally:
+            self._bump_index_generation()
+
+    @staticmethod
+    def articles_class_definition(
+        vector_index_config: Optional[VectorIndexConfig] = None,
+        class_name: str = "Articles"
+    ) -> Dict[str, Any]:
+        """
+        Weaviate class definition for the chunks, including the vector index settings.
+
+        Args:
+            vector_index_config: Vector index settings (from the environment by default)
+            class_name: Name of the class to define
+
+        Returns:
+            Class definition accepted by client.schema.create_class
+        """
+        vector_index_config = vector_index_config or VectorIndexConfig()
+        return {
+            "class": class_name,
+            "vectorizer": "none",  # We provide vectors manually
+            "vectorIndexType": "hnsw",
+            "vectorIndexConfig": vector_index_config.to_weaviate(),
+            "properties": [
+                {
+                    "name": "text",
+                    "dataType": ["text"],
+                    "description": "The text content",
+                },
+                {
+                    "name": "doc_id",
+                    "dataType": ["text"],
+                    "description": "ID of the document the chunk belongs to",
+                    "tokenization": "field",
+                },
+                {
+                    "name": "chunk_index",
+                    "dataType": ["int"],
+                    "description": "Position of the chunk within its document",
+                },
+                {
+                    "name": "content_hash",
+                    "dataType": ["text"],
+                    "description": "SHA-256 hash of the chunk text",
+                    "tokenization": "field",
+                }
+            ] + EmbeddingManager._metadata_schema_properties()
+        }
+
+    @staticmethod
+    def _metadata_schema_properties() -> List[Dict[str, Any]]:
+        """
+        Schema of the metadata properties. They are matched exactly and indexed
+        for filtering (not for keyword search), so filtered vector queries are
+        served from the inverted index.
+        """
+        descriptions = {
+            "title": "Title of the source document",
+            "field": "Subject area of the source document",
+            "url": "URL of the source document",
+        }
+        return [
+            {
+                "name": name,
+                "dataType": ["text"],
+                "description": descriptions.get(name, name),
+                "tokenization": "field",
+                "indexFilterable": True,
+                "indexSearchable": False,
+            }
+            for name in METADATA_PROPERTIES
+        ]
+
+    def _schema_fresh(self) -> bool:
+        """Whether the last schema validation succeeded within SCHEMA_REFRESH_SECONDS."""
+        checked_at = self._schema_checked_at
+        return (
+            checked_at is not None
+            and self.schema_error is None
+            and time.monotonic() - checked_at < SCHEMA_REFRESH_SECONDS
+        )
+
+    def _record_schema_state(self, error: Optional[str]):
+        self._schema_checked_at = time.monotonic()
+        self.schema_error = error
+
+    def _invalidate_schema_state(self, error: str):
+        """Force the next write or readiness probe to validate the schema again."""
+        self._schema_checked_at = None
+        self.schema_error = error
 
     def _ensure_schema_exists(self):
-        """Ensure the required Weaviate schema exists."""
+        """
+        Ensure the required Weaviate schema exists. The result is cached for
+        SCHEMA_REFRESH_SECONDS, and dropped earlier when a write or query fails.
+        """
         # Check if client is None (development or error mode)
         if self.client is None:
             print("Warning: Weaviate client is not available, skipping schema check")
             return
+        if self._schema_fresh():
+            return
             
         try:
-            # Check if schema exists
-            schema = self.client.schema.get()
-            classes = [c["class"] for c in schema["classes"]] if schema.get("classes") else []
-            
-            if "Articles" not in classes:
-                # Define the schema
-                class_obj = {
-                    "class": "Articles",
-                    "vectorizer": "none",  # We provide vectors manually
-                    "properties": [
-                        {
-                            "name": "text",
-                            "dataType": ["text"],
-                            "description": "The text content",
-                        }
-                    ]
-                }
+            with self._schema_lock:
+                # Another thread may have validated it while this one waited
+                if self._schema_fresh():
+                    return
+                # Check if schema exists
+                schema = circuit_breaker("weaviate").call(self.client.schema.get)
+                classes = [c["class"] for c in schema["classes"]] if schema.get("classes") else []
                 
-                # Create the schema
-                self.client.schema.create_class(class_obj)
+                if "Articles" not in classes:
+                    # Define the schema
+                    class_obj = self.articles_class_definition(self.vector_index_config)
+
+                    # Create the schema
+                    self.client.schema.create_class(class_obj)
+                else:
+                    # Classes created by older versions get the missing properties added
+                    # (doc_id, chunk_index and content_hash, or the metadata)
+                    articles = next(c for c in schema["classes"] if c["class"] == "Articles")
+                    existing = {prop["name"] for prop in articles.get("properties") or []}
+                    for prop in self.articles_class_definition()["properties"]:
+                        if prop["name"] not in existing:
+                            self.client.schema.property.create("Articles", prop)
+                    self._check_stored_dimension()
+                self._record_schema_state(None)
                 
         except Exception as e:
+            self._record_schema_state(str(e))
             raise Exception(f"Failed to ensure schema exists: {str(e)}")
 
-    def get_all_texts(self, limit: int = 100) -> List[str]:
+    def dependency_status(self) -> Dict[str, Any]:
+        """
+        State of the vector backend for readiness probes. Served from the cached
+        schema validation; Weaviate is only contacted when that is older than
+        SCHEMA_REFRESH_SECONDS (SCHEMA_RETRY_SECONDS after a failure).
+
+        Returns:
+            Dictionary with ready, backend and, for Weaviate, the age of the last check, its error
+            and the state of the Weaviate circuit breaker
+        """
+        if self.local_store is not None:
+            return {"ready": True, "backend": "local"}
+        if self.client is None:
+            return {"ready": False, "backend": "weaviate", "error": "Weaviate client is not available"}
+
+        checked_at = self._schema_checked_at
+        max_age = SCHEMA_REFRESH_SECONDS if self.schema_error is None else SCHEMA_RETRY_SECONDS
+        if checked_at is None or time.monotonic() - checked_at >= max_age:
+            try:
+                self._ensure_schema_exists()
+            except Exception:
+                pass  # recorded in schema_error
+            checked_at = self._schema_checked_at
+
+        return {
+            "ready": checked_at is not None and self.schema_error is None,
+            "backend": "weaviate",
+            "checked_seconds_ago": round(time.monotonic() - checked_at, 1) if checked_at is not None else None,
+            "error": self.schema_error,
+            "circuit": circuit_breaker("weaviate").snapshot(),
+        }
+
+    def _check_stored_dimension(self):
+        """
+        Refuse to mix vector lengths in one class. Weaviate fixes the dimension
+        with the first stored vector rather than in the schema, so a sample
+        object is compared against the provider's dimension.
+        """
+        if self._stored_dimension_checked:
+            return
+        result = self.client.data_object.get(class_name="Articles", with_vector=True, limit=1)
+        objects = (result or {}).get("objects") or []
+        stored = len(objects[0].get("vector") or []) if objects else 0
+        expected = self.embedding_provider.dimension
+        if stored and stored != expected:
+            raise ValueError(
+                f"Articles stores {stored}-dimensional vectors but EMBEDDING_DIMENSION is {expected}; "
+                f"run src/scripts/migrate_embedding_dimension.py to convert the index"
+            )
+        # An empty class takes its dimension from the first write
+        self._stored_dimension_checked = bool(stored)
+
+    def get_objects_page(
+        self,
+        after: Optional[str] = None,
+        limit: int = 100,
+        properties: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
         """
-        Get all texts stored in the database up to the specified limit.
+        One page of stored objects in cursor order (object id), for walking the
+        whole collection: pass the id of the last object of a page as `after` to
+        get the next one. Objects written meanwhile appear if their id sorts later.
         
         Args:
-            limit: Maximum number of texts to return
+            after: Id of the last object of the previous page, or None for the first page
+            limit: Maximum number of objects
+            properties: Properties to return (default: all of ARTICLE_PROPERTIES)
             
         Returns:
-            List of texts from the database
+            List of dictionaries with id and the requested properties that are set
+
+        Raises:
+            ValueError: A requested property does not exist, or `after` is not an object id
         """
+        properties = list(properties) if properties else list(ARTICLE_PROPERTIES)
+        unknown = sorted(set(properties) - set(ARTICLE_PROPERTIES))
+        if unknown:
+            raise ValueError(f"Unknown properties: {', '.join(unknown)}. Available: {', '.join(ARTICLE_PROPERTIES)}")
+        if limit <= 0:
+            return []
+
+        if self.local_store is not None:
+            return [
+                {"id": obj["id"], **{name: obj["properties"][name] for name in properties if name in obj["properties"]}}
+                for obj in self.local_store.page(after, limit)
+            ]
+
         # Check if client is None (development or error mode)
         if self.client is None:
             print("Warning: Weaviate client is not available, returning empty list")
             return []
             
-        result = (
+        if after is not None:
+            # Weaviate answers a malformed cursor with a server error
+            try:
+                uuid.UUID(after)
+            except ValueError:
+                raise ValueError(f"Invalid cursor {after!r}: expected an object id") from None
+
+        # GraphQL cursor query, so only the requested properties are read
+        query = (
             self.client.query
-            .get("Articles", ["text"])
+            .get("Articles", properties)
+            .with_additional(["id"])
             .with_limit(limit)
-            .do()
         )
+        if after is not None:
+            query = query.with_after(after)
+        with self._querying_class():
+            result = circuit_breaker("weaviate").call(query.do)
+        if result.get("errors"):
+            raise RuntimeError(f"Weaviate query failed: {result['errors']}")
+        articles = ((result.get("data") or {}).get("Get") or {}).get("Articles") or []
+        return [
+            {"id": article["_additional"]["id"], **{name: article[name] for name in properties if article.get(name) is not None}}
+            for article in articles
+        ]
+
+    def iter_objects(
+        self,
+        properties: Optional[List[str]] = None,
+        after: Optional[str] = None,
+        page_size: int = CONTENTS_PAGE_SIZE
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Walk the stored objects page by page (see get_objects_page), holding one page at a time.
         
-        if result and "data" in result and "Get" in result["data"] and "Articles" in result["data"]["Get"]:
-            articles = result["data"]["Get"]["Articles"]
-            return [article["text"] for article in articles if "text" in article]
-        return [] 
+        Args:
+            properties: Properties to return (default: all)
+            after: Start after this object id
+            page_size: Objects fetched per page
+
+        Yields:
+            Dictionaries with id and the requested properties
+        """
+        while True:
+            page = self.get_objects_page(after, page_size, properties)
+            yield from page
+            if len(page) < page_size:
+                return
+            after = page[-1]["id"]
+
+    def get_all_texts(self, limit: int = 100) -> List[str]:
+        """
+        Get the texts of the first stored objects in cursor order.
+
+        Args:
+            limit: Maximum number of texts to return
+
+        Returns:
+            List of texts from the database
+        """
+        return [obj.get("text", "") for obj in self.get_objects_page(None, limit, ["text"])]
+
+    def _iter_object_batches(self, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+        """Every stored object with id, properties and vector, in batches (cursor order)."""
+        if self.local_store is not None:
+            after = None
+            while True:
+                page = self.local_store.page(after, batch_size, include_vectors=True)
+                if not page:
+                    return
+                yield page
+                after = page[-1]["id"]
+
+        if self.client is None:
+            raise RuntimeError("Weaviate client is not available")
+        batch = []
+        for obj in iter_weaviate_objects(self.client, "Articles", batch_size):
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def export_snapshot(
+        self,
+        path: Path,
+        batch_size: int = SNAPSHOT_BATCH_SIZE,
+        compresslevel: int = SNAPSHOT_COMPRESSION_LEVEL
+    ) -> Dict[str, Any]:
+        """
+        Stream every object with its vector and properties into a snapshot
+        (see SnapshotWriter), so a collection can be restored without embedding calls.
+
+        Args:
+            path: Snapshot directory to write (replaced once complete)
+            batch_size: Objects read and written per block
+            compresslevel: gzip level of the text and metadata table
+
+        Returns:
+            The snapshot's manifest
+        """
+        metadata = {
+            "backend": "local" if self.local_store is not None else "weaviate",
+            "embedding_provider": self.embedding_provider.name,
+        }
+        writer = SnapshotWriter(path, self.embedding_provider.dimension, metadata, compresslevel)
+        try:
+            for batch in self._iter_object_batches(batch_size):
+                writer.write(batch)
+        except BaseException:
+            writer.abort()
+            raise
+        manifest = writer.close()
+        print(f"Exported {writer.count} objects to {path}")
+        return manifest
+
+    def import_snapshot(
+        self,
+        path: Path,
+        replace: bool = True,
+        on_batch: Optional[Callable[[List[str], List[Dict[str, Any]]], None]] = None
+    ) -> int:
+        """
+        Bulk-load a snapshot with the objects' original ids, vectors and properties.
+        The whole snapshot is verified before the database is cleared, so a damaged
+        snapshot leaves the current index in place.
+
+        Args:
+            path: Snapshot directory written by export_snapshot
+            replace: Clear the database first; otherwise the objects are added to it
+            on_batch: Called with the ids and properties of every imported block
+
+        Returns:
+            Number of imported objects
+
+        Raises:
+            ValueError: The snapshot is invalid or its vectors do not have the provider's dimension
+            RuntimeError: Weaviate rejected some of the objects
+        """
+        reader = SnapshotReader(path)
+        dimension = self.embedding_provider.dimension
+        if reader.dimension != dimension:
+            raise ValueError(f"Snapshot vectors have {reader.dimension} dimensions, the index stores {dimension}")
+        reader.verify()
+        if reader.manifest.get("embedding_provider") != self.embedding_provider.name:
+            print(f"Warning: snapshot was embedded with {reader.manifest.get('embedding_provider')}, "
+                  f"queries use {self.embedding_provider.name}")
+
+        if replace:
+            self.clear_database()
+        imported = 0
+        try:
+            if self.local_store is not None:
+                for ids, properties, vectors in reader.batches():
+                    self.local_store.add(properties, vectors, ids=ids)
+                    imported += len(ids)
+                    if on_batch is not None:
+                        on_batch(ids, properties)
+            else:
+                if self.client is None:
+                    raise RuntimeError("Weaviate client is not available")
+                # Objects Weaviate rejects are only reported to the batch callback
+                failed: List[str] = []
+
+                def collect_errors(results):
+                    for result in results or []:
+                        errors = (result.get("result") or {}).get("errors")
+                        if errors:
+                            messages = "; ".join(error.get("message", "") for error in errors.get("error", []))
+                            failed.append(f"{result.get('id')}: {messages}")
+
+                with self._schema_lock:
+                    self._ensure_schema_exists()
+                    self.client.batch.configure(batch_size=200, callback=collect_errors)
+                    try:
+                        with self.client.batch as batch:
+                            for ids, properties, vectors in reader.batches():
+                                for object_id, object_properties, vector in zip(ids, properties, vectors):
+                                    batch.add_data_object(
+                                        data_object=object_properties,
+                                        class_name="Articles",
+                                        uuid=object_id,
+                                        vector=vector
+                                    )
+                                imported += len(ids)
+                                if on_batch is not None:
+                                    on_batch(ids, properties)
+                    finally:
+                        # Back to the client's defaults for the other writes
+                        self.client.batch.configure()
+                if failed:
+                    raise RuntimeError(
+                        f"Weaviate rejected {len(failed)} of {imported} snapshot objects: "
+                        + "; ".join(failed[:5])
+                    )
+        finally:
+            self._bump_index_generation()
+        print(f"Imported {imported} objects from {path}")
+        return imported
@@ -0,0 +1,312 @@
+import re
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Type
+
+import numpy as np
+import openai
+
+from .circuit_breaker import circuit_breaker
+from .config import (
+    EMBEDDING_DIMENSION,
+    EMBEDDING_PROVIDER,
+    LOCAL_EMBEDDING_BATCH_SIZE,
+    LOCAL_EMBEDDING_MODEL_PATH,
+    OPENAI_API_BASE,
+    OPENAI_API_KEY,
+    OPENAI_EMBEDDING_MODEL,
+)
+from .metrics import record_token_usage
+
+
+def truncate_embedding(vector, dimension: int) -> np.ndarray:
+    """
+    Shorten an embedding to its leading dimensions and re-normalize it, which is
+    how Matryoshka-trained models (such as text-embedding-3) are meant to be shortened.
+
+    Args:
+        vector: Embedding, or a 2-D array of embeddings (one per row)
+        dimension: Target length
+
+    Returns:
+        Float32 array with the last axis cut to `dimension` and unit L2 norm
+    """
+    truncated = np.asarray(vector, dtype=np.float32)[..., :dimension]
+    norms = np.linalg.norm(truncated, axis=-1, keepdims=True)
+    return truncated / np.where(norms == 0, 1.0, norms)
+
+
+class EmbeddingProvider:
+    """
+    Interface for turning texts into embedding vectors.
+
+    Providers raise on failure; EmbeddingManager decides how to fall back.
+    """
+
+    name = ""
+
+    # Largest number of texts sent to the model in one call
+    batch_size = 100
+
+    @property
+    def dimension(self) -> int:
+        """Length of the vectors this provider produces."""
+        raise NotImplementedError
+
+    def embed(
+        self, texts: List[str], timeout: Optional[float] = None
+    ) -> List[List[float]]:
+        """
+        Embed a batch of texts (at most batch_size).
+
+        Args:
+            texts: Texts to embed
+            timeout: Seconds a remote call may take (in-process providers ignore it)
+
+        Returns:
+            One embedding per text, in input order
+        """
+        raise NotImplementedError
+
+
+EMBEDDING_PROVIDERS: Dict[str, Type[EmbeddingProvider]] = {}
+
+
+def register_embedding_provider(
+    name: str,
+) -> Callable[[Type[EmbeddingProvider]], Type[EmbeddingProvider]]:
+    """Class decorator adding a provider to the registry under the given name."""
+
+    def decorator(cls: Type[EmbeddingProvider]) -> Type[EmbeddingProvider]:
+        cls.name = name
+        EMBEDDING_PROVIDERS[name] = cls
+        return cls
+
+    return decorator
+
+
+def create_embedding_provider(
+    name: str = EMBEDDING_PROVIDER, **kwargs
+) -> EmbeddingProvider:
+    """
+    Instantiate a registered embedding provider.
+
+    Args:
+        name: Registry name of the provider (EMBEDDING_PROVIDER by default)
+        **kwargs: Provider-specific settings overriding the configuration
+
+    Returns:
+        The provider instance
+    """
+    if name not in EMBEDDING_PROVIDERS:
+        raise ValueError(
+            f"Embedding provider {name} not supported. Available providers: {sorted(EMBEDDING_PROVIDERS)}"
+        )
+    return EMBEDDING_PROVIDERS[name](**kwargs)
+
+
+@register_embedding_provider("openai")
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """Embeddings from the OpenAI API (or an OpenAI-compatible server via OPENAI_API_BASE)."""
+
+    # OpenAI allows up to 2048 texts per request, but we'll be conservative
+    batch_size = 100
+
+    # Full vector length per model; text-embedding-3 models can return fewer dimensions
+    NATIVE_DIMENSIONS = {
+        "text-embedding-3-small": 1536,
+        "text-embedding-3-large": 3072,
+        "text-embedding-ada-002": 1536,
+    }
+
+    def __init__(
+        self,
+        model: str = OPENAI_EMBEDDING_MODEL,
+        dimension: int = EMBEDDING_DIMENSION,
+        api_key: Optional[str] = OPENAI_API_KEY,
+        api_base: str = OPENAI_API_BASE,
+    ):
+        """
+        Initialize the provider.
+
+        Args:
+            model: OpenAI embedding model name
+            dimension: Vector length to request; below the model's native length the
+                API returns shortened embeddings (text-embedding-3 models only)
+            api_key: OpenAI API key
+            api_base: Base URL of an OpenAI-compatible server (the OpenAI API if empty)
+        """
+        native = self.NATIVE_DIMENSIONS.get(model)
+        if native is not None and dimension > native:
+            raise ValueError(
+                f"{model} produces at most {native} dimensions, {dimension} requested"
+            )
+        if (
+            native is not None
+            and dimension < native
+            and not model.startswith("text-embedding-3")
+        ):
+            raise ValueError(f"{model} does not support shortened embeddings")
+        self.model = model
+        self._dimension = dimension
+        # Only ask for shortened vectors when needed, so other compatible servers keep working
+        self._request_dimensions = native is None or dimension < native
+        # Use the older 0.28.0 OpenAI API style
+        openai.api_key = api_key
+        if api_base:
+            openai.api_base = api_base
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    def embed(
+        self, texts: List[str], timeout: Optional[float] = None
+    ) -> List[List[float]]:
+        kwargs: Dict[str, Any] = (
+            {"dimensions": self._dimension} if self._request_dimensions else {}
+        )
+        if timeout is not None:
+            kwargs["request_timeout"] = timeout
+        response = circuit_breaker("openai").call(
+            lambda: openai.Embedding.create(model=self.model, input=texts, **kwargs),
+            lambda error: is_openai_outage(error, timeout),
+        )
+        record_token_usage(self.model, response)
+        return [item["embedding"] for item in response["data"]]
+
+
+def is_openai_outage(error: BaseException, timeout: Optional[float] = None) -> bool:
+    """
+    Whether a failed OpenAI call counts against the API's circuit breaker.
+
+    Invalid requests are the caller's fault, and a timeout the caller chose
+    (from a request's latency budget) says nothing about the API's health.
+
+    Args:
+        error: Exception raised by the call
+        timeout: request_timeout the call was made with, if any
+    """
+    if isinstance(error, openai.error.InvalidRequestError):
+        return False
+    if timeout is not None and isinstance(error, openai.error.Timeout):
+        return False
+    return True
+
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def hash_embedding(text: str, dimension: int) -> np.ndarray:
+    """
+    Deterministic embedding: signed feature hashing of word unigrams, L2-normalized.
+    Texts sharing words get similar vectors, which keeps search results meaningful.
+
+    Args:
+        text: Text to embed
+        dimension: Vector length
+
+    Returns:
+        Float32 vector of the given dimension
+    """
+    vector = np.zeros(dimension, dtype=np.float32)
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        digest = zlib.crc32(token.encode("utf-8"))
+        vector[digest % dimension] += 1.0 if digest & 0x80000000 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+@register_embedding_provider("hashing")
+class HashingEmbeddingProvider(EmbeddingProvider):
+    """
+    Hashing-vectorizer embeddings computed in process. No model, no network,
+    fully deterministic; captures word overlap rather than meaning.
+    """
+
+    batch_size = 1000
+
+    def __init__(self, dimension: int = EMBEDDING_DIMENSION):
+        """
+        Initialize the provider.
+
+        Args:
+            dimension: Vector length
+        """
+        self._dimension = dimension
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    def embed(
+        self, texts: List[str], timeout: Optional[float] = None
+    ) -> List[List[float]]:
+        return [hash_embedding(text, self._dimension).tolist() for text in texts]
+
+
+@register_embedding_provider("local")
+class LocalModelEmbeddingProvider(EmbeddingProvider):
+    """
+    Sentence-embedding model loaded from a local path and run on CPU.
+    Needs the optional sentence-transformers package; weights are never downloaded.
+    """
+
+    def __init__(
+        self,
+        model_path: str = LOCAL_EMBEDDING_MODEL_PATH,
+        batch_size: int = LOCAL_EMBEDDING_BATCH_SIZE,
+        dimension: int = EMBEDDING_DIMENSION,
+    ):
+        """
+        Load the model.
+
+        Args:
+            model_path: Directory containing a sentence-transformers model
+            batch_size: Number of texts per forward pass
+            dimension: Vector length; shorter than the model's output truncates the
+                embeddings (only sensible for Matryoshka-trained models)
+        """
+        if not model_path:
+            raise ValueError(
+                "LOCAL_EMBEDDING_MODEL_PATH must point to a local model directory"
+            )
+        try:
+            from sentence_transformers import (  # type: ignore[import-not-found]
+                SentenceTransformer,
+            )
+        except ImportError as e:
+            raise ImportError(
+                "The local embedding provider needs sentence-transformers: pip install sentence-transformers"
+            ) from e
+
+        self.model_path = model_path
+        self.batch_size = batch_size
+        self.model = SentenceTransformer(model_path, device="cpu")
+        native = self.model.get_sentence_embedding_dimension()
+        if dimension > native:
+            print(
+                f"Model produces {native} dimensions, using those instead of {dimension}"
+            )
+        self._dimension = min(dimension, native)
+        self._truncate = self._dimension < native
+        print(
+            f"Loaded local embedding model from {model_path} ({self._dimension} dimensions)"
+        )
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    def embed(
+        self, texts: List[str], timeout: Optional[float] = None
+    ) -> List[List[float]]:
+        vectors = self.model.encode(
+            list(texts),
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
+        if self._truncate:
+            vectors = truncate_embedding(vectors, self._dimension)
+        return vectors.astype(np.float32).tolist()
@@ -4,10 +4,17 @@ import os
 
 from .config import (
     OPENAI_API_KEY,
+    OPENAI_API_BASE,
     OPENAI_MODEL,
     OPENAI_TEMPERATURE,
     OPENAI_MAX_TOKENS
 )
+from .metrics import IN_FLIGHT, FALLBACKS, record_token_usage
+from .timing import stage
+from .deadline import DeadlineExceeded, current_deadline
+from .model_scheduler import model_scheduler
+from .circuit_breaker import circuit_breaker
+from .embedding_providers import is_openai_outage
 
 class GenerativeSearch:
     """Combines semantic search with text generation for question answering."""
@@ -22,6 +29,8 @@ class GenerativeSearch:
         try:
             # Set the API key for the older OpenAI API style (v0.28.0)
             openai.api_key = OPENAI_API_KEY
+            if OPENAI_API_BASE:
+                openai.api_base = OPENAI_API_BASE
             self.embedding_manager = embedding_manager
             print(f"OpenAI API key set successfully for generative search")
         except Exception as e:
@@ -40,9 +49,18 @@ class GenerativeSearch:
             
         Returns:
             Generated answer as a string
+
+        Raises:
+            DeadlineExceeded: The request's latency budget ran out before the answer arrived
         """
+        # Nothing passed the relevance cutoff; skip the completion call entirely
+        if not context:
+            FALLBACKS.labels("no_relevant_context").inc()
+            return "I couldn't find any passages relevant enough to answer this question."
+
         # Prepare the prompt
-        prompt = f"""Based on the following context, please answer the question. If the context doesn't contain enough information to answer the question, say so.
+        with stage("context_build"):
+            prompt = f"""Based on the following context, please answer the question. If the context doesn't contain enough information to answer the question, say so.
 
 Context:
 {' '.join(context)}
@@ -53,25 +71,48 @@ Answer:"""
 
         # If the API key is not set, return a fallback response
         if not openai.api_key:
+            FALLBACKS.labels("missing_api_key").inc()
             return f"I'm unable to generate an answer because the OpenAI API key is not set. " + \
                    f"Please check your API key and network configuration. " + \
                    f"The relevant context I found was: {context[0][:100]}..." if context else "No relevant context found."
 
+        deadline = current_deadline()
+        timeout = None
+        if deadline is not None:
+            deadline.check("generation")
+            timeout = deadline.stage_timeout("generation")
+
+        def complete():
+            # Whatever is left of the stage budget after waiting for a slot
+            kwargs = {"request_timeout": deadline.stage_timeout("generation")} if deadline is not None else {}
+            # Fails fast with CircuitOpenError while the API is known to be down
+            return circuit_breaker("openai").call(
+                lambda: openai.ChatCompletion.create(
+                    model=OPENAI_MODEL,
+                    messages=[
+                        {"role": "system", "content": "You are a helpful assistant that answers questions based on the provided context."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=OPENAI_TEMPERATURE,
+                    max_tokens=OPENAI_MAX_TOKENS,
+                    **kwargs
+                ),
+                lambda error: is_openai_outage(error, kwargs.get("request_timeout"))
+            )
+
         try:
             # Generate response using OpenAI with the older API style
-            response = openai.ChatCompletion.create(
-                model=OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that answers questions based on the provided context."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=OPENAI_TEMPERATURE,
-                max_tokens=OPENAI_MAX_TOKENS
-            )
+            with stage("generation"), \
+                    IN_FLIGHT.labels("generation").track_inprogress():
+                response = model_scheduler.run("generation", complete, timeout)
+            record_token_usage(OPENAI_MODEL, response)
             
             return response["choices"][0]["message"]["content"].strip()
         except Exception as e:
+            if deadline is not None and (isinstance(e, TimeoutError) or "timed out" in str(e).lower()):
+                raise deadline.exceeded("generation") from e
             print(f"Error generating answer: {str(e)}")
+            FALLBACKS.labels("generation_error").inc()
             return f"I'm unable to generate an answer due to a technical issue: {str(e)}"
 
     def search_and_generate(
@@ -89,8 +130,11 @@ Answer:"""
             num_generations: Number of different answers to generate
             
         Returns:
-            Dictionary containing generated answers and retrieved documents
+            Dictionary containing generated answers and retrieved documents. When the
+            request's latency budget runs out, the answers generated so far (possibly
+            none) are returned with the documents, marked with degraded and degraded_stages.
         """
+        deadline = current_deadline()
         try:
             # Search for relevant passages
             results, distances = self.embedding_manager.search(
@@ -99,17 +143,23 @@ Answer:"""
                 include_distances=True
             )
             
-            # Generate multiple answers if requested
+            # Generate multiple answers if requested; without retrieval there is nothing to answer from
             answers = []
-            for _ in range(num_generations):
-                answer = self.generate_answer(question, results)
-                answers.append(answer)
+            if deadline is None or not deadline.degraded:
+                for _ in range(num_generations):
+                    try:
+                        answers.append(self.generate_answer(question, results))
+                    except DeadlineExceeded:
+                        break
                 
-            return {
+            response = {
                 "answers": answers,
                 "documents": results,
                 "relevance_scores": [1 - d for d in distances] if distances else None
             }
+            if deadline is not None and deadline.degraded:
+                response.update(deadline.as_dict())
+            return response
         except Exception as e:
             print(f"Error in search_and_generate: {str(e)}")
             return {
@@ -0,0 +1,394 @@
+import bisect
+import threading
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+import numpy as np
+
+
+def _allowed_values(value: Any) -> List[Any]:
+    """A filter value is either a single required value or a list of alternatives."""
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+
+def _matches(properties: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+    return all(
+        properties.get(name) in _allowed_values(value)
+        for name, value in filters.items()
+    )
+
+
+def autocut(distances: List[float], jumps: int) -> int:
+    """
+    Number of leading results to keep so the list stops after the given number
+    of jumps in distance. Follows Weaviate's autocut: distances are normalized
+    to [0, 1] and compared with a straight line from first to last, and each
+    local maximum of the difference marks a jump.
+
+    Args:
+        distances: Result distances, nearest first
+        jumps: Number of jumps to keep results up to (0 keeps everything)
+
+    Returns:
+        How many leading results to keep
+    """
+    count = len(distances)
+    if count <= 1 or jumps <= 0:
+        return count
+    spread = distances[-1] - distances[0]
+    if spread <= 0:
+        return count
+    step = 1.0 / (count - 1)
+    diff = [(d - distances[0]) / spread - i * step for i, d in enumerate(distances)]
+    found = 0
+    for i in range(1, count - 1):
+        if diff[i] > diff[i - 1] and diff[i] > diff[i + 1]:
+            found += 1
+            if found >= jumps:
+                return i
+    return count
+
+
+class LocalVectorStore:
+    """
+    In-process vector store with exact cosine search over a NumPy matrix.
+    Used in place of Weaviate for offline development and benchmarks
+    (VECTOR_BACKEND=local); contents live in memory only.
+    """
+
+    def __init__(
+        self,
+        initial_capacity: int = 1024,
+        indexed_properties: Iterable[str] = (),
+        dimension: Optional[int] = None,
+    ):
+        """
+        Initialize an empty store.
+
+        Args:
+            initial_capacity: Number of rows to allocate before the first resize
+            indexed_properties: Properties with an inverted index, so filters on them
+                only touch matching objects instead of scanning the store
+            dimension: Required vector length; None takes it from the first add
+        """
+        self._lock = threading.RLock()
+        self._initial_capacity = initial_capacity
+        self._indexed_properties = set(indexed_properties)
+        self._fixed_dimension = dimension
+        self._reset()
+
+    def _reset(self) -> None:
+        self._ids: List[str] = []
+        self._properties: List[Dict[str, Any]] = []
+        self._row_of: Dict[str, int] = {}
+        self._vectors: Optional[np.ndarray] = (
+            None  # allocated on first add, once the dimension is known
+        )
+        self._sorted_ids: Optional[List[str]] = (
+            None  # cursor order for page, rebuilt after writes
+        )
+        # (property, value) -> ids of the objects holding that value
+        self._index: Dict[tuple, Set[str]] = defaultdict(set)
+
+    def _index_object(
+        self, object_id: str, properties: Dict[str, Any], add: bool = True
+    ):
+        for name in self._indexed_properties.intersection(properties):
+            key = (name, properties[name])
+            if add:
+                self._index[key].add(object_id)
+            else:
+                self._index[key].discard(object_id)
+                if not self._index[key]:
+                    del self._index[key]
+
+    def _filtered_rows(self, filters: Dict[str, Any]) -> Optional[List[int]]:
+        """
+        Rows of the objects matching all filters, using the inverted index where
+        possible; None when no filter applies (every row matches).
+        """
+        if not filters:
+            return None
+        indexed = [name for name in filters if name in self._indexed_properties]
+        rows: Sequence[int]
+        if indexed:
+            candidate_ids: Optional[Set[str]] = None
+            for name in indexed:
+                ids: Set[str] = set()
+                for value in _allowed_values(filters[name]):
+                    ids |= self._index.get((name, value), set())
+                candidate_ids = ids if candidate_ids is None else candidate_ids & ids
+            rows = sorted(self._row_of[object_id] for object_id in candidate_ids or ())
+        else:
+            rows = range(len(self._ids))
+        remaining = {
+            name: value
+            for name, value in filters.items()
+            if name not in self._indexed_properties
+        }
+        return [row for row in rows if _matches(self._properties[row], remaining)]
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def dimension(self) -> Optional[int]:
+        if self._vectors is not None:
+            return self._vectors.shape[1]
+        return self._fixed_dimension
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the vector matrix, including unused capacity."""
+        return 0 if self._vectors is None else self._vectors.nbytes
+
+    def _check_dimension(self, dimension: int):
+        expected = self.dimension
+        if expected is not None and dimension != expected:
+            raise ValueError(
+                f"Vector dimension {dimension} does not match store dimension {expected}"
+            )
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        """L2-normalize rows so cosine similarity is a dot product; zero vectors stay zero."""
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _matrix(self) -> np.ndarray:
+        """The vector matrix, which exists once anything was added."""
+        if self._vectors is None:
+            raise ValueError("The store holds no vectors")
+        return self._vectors
+
+    def _ensure_capacity(self, rows: int, dimension: int) -> np.ndarray:
+        """Grow the vector matrix to hold at least `rows` rows and return it."""
+        self._check_dimension(dimension)
+        if self._vectors is None:
+            capacity = max(self._initial_capacity, rows)
+            self._vectors = np.zeros((capacity, dimension), dtype=np.float32)
+        elif rows > self._vectors.shape[0]:
+            # Grow geometrically so repeated adds stay amortized O(1) per row
+            capacity = max(rows, 2 * self._vectors.shape[0])
+            grown = np.zeros((capacity, dimension), dtype=np.float32)
+            grown[: len(self._ids)] = self._vectors[: len(self._ids)]
+            self._vectors = grown
+        return self._vectors
+
+    def add(
+        self,
+        objects: List[Dict[str, Any]],
+        vectors: List[List[float]],
+        ids: Optional[List[str]] = None,
+    ) -> List[str]:
+        """
+        Add objects with their vectors.
+
+        Args:
+            objects: Property dictionaries of the objects
+            vectors: One vector per object
+            ids: Ids to store the objects under, e.g. when restoring a snapshot (generated by default)
+
+        Returns:
+            Ids of the added objects
+
+        Raises:
+            ValueError: An id is already stored
+        """
+        if not objects:
+            return []
+        matrix = self._normalize(
+            np.asarray(vectors, dtype=np.float32).reshape(len(objects), -1)
+        )
+        with self._lock:
+            if ids is not None:
+                taken = next(
+                    (object_id for object_id in ids if object_id in self._row_of), None
+                )
+                if taken is not None or len(set(ids)) != len(ids):
+                    raise ValueError(
+                        f"Duplicate object id {taken or 'in the added objects'}"
+                    )
+            start = len(self._ids)
+            stored = self._ensure_capacity(start + len(objects), matrix.shape[1])
+            stored[start : start + len(objects)] = matrix
+            new_ids = [str(uuid.uuid4()) for _ in objects] if ids is None else list(ids)
+            self._sorted_ids = None
+            for offset, (object_id, properties) in enumerate(zip(new_ids, objects)):
+                self._ids.append(object_id)
+                self._properties.append(dict(properties))
+                self._row_of[object_id] = start + offset
+                self._index_object(object_id, properties)
+            return new_ids
+
+    def query(
+        self,
+        vector: List[float],
+        limit: int,
+        max_distance: Optional[float] = None,
+        autocut_jumps: int = 0,
+        include_vectors: bool = False,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Find the nearest objects by cosine distance.
+
+        Args:
+            vector: Query vector
+            limit: Maximum number of results
+            max_distance: Drop results farther than this cosine distance
+            autocut_jumps: Stop after this many jumps in distance (0 disables, see autocut)
+            include_vectors: Also return each object's (normalized) vector
+            filters: Only score objects whose properties match (see find)
+
+        Returns:
+            List of dictionaries with id, properties, distance and optionally vector, nearest first
+        """
+        with self._lock:
+            size = len(self._ids)
+            if size == 0 or limit <= 0:
+                return []
+            query = self._normalize(np.asarray(vector, dtype=np.float32))
+            self._check_dimension(query.shape[-1])
+            vectors = self._matrix()
+            filtered = self._filtered_rows(filters or {})
+            if filtered is None:
+                rows = np.arange(size)
+                scores = vectors[:size] @ query
+            else:
+                # Pre-filter: only matching rows are scored
+                rows = np.asarray(filtered, dtype=np.int64)
+                if len(rows) == 0:
+                    return []
+                scores = np.zeros(size, dtype=np.float32)
+                scores[rows] = vectors[rows] @ query
+            k = min(limit, len(rows))
+            top = (
+                rows[np.argpartition(-scores[rows], k - 1)[:k]]
+                if k < len(rows)
+                else rows
+            )
+            top = top[np.argsort(-scores[top], kind="stable")]
+            if max_distance is not None:
+                top = top[1.0 - scores[top] <= max_distance]
+            if autocut_jumps > 0:
+                top = top[
+                    : autocut([float(1.0 - scores[row]) for row in top], autocut_jumps)
+                ]
+            hits = [
+                {
+                    "id": self._ids[row],
+                    "properties": dict(self._properties[row]),
+                    "distance": float(1.0 - scores[row]),
+                }
+                for row in top
+            ]
+            if include_vectors:
+                for hit, row in zip(hits, top):
+                    hit["vector"] = vectors[row].copy()
+            return hits
+
+    def find(
+        self, filters: Dict[str, Any], limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Find objects whose properties equal all given values.
+
+        Args:
+            filters: Mapping of property name to required value, or to a list of allowed values
+            limit: Maximum number of objects to return
+
+        Returns:
+            List of dictionaries with id and properties
+        """
+        with self._lock:
+            filtered = self._filtered_rows(filters)
+            rows: Sequence[int] = (
+                range(len(self._ids)) if filtered is None else filtered
+            )
+            if limit is not None:
+                rows = rows[:limit]
+            return [
+                {"id": self._ids[row], "properties": dict(self._properties[row])}
+                for row in rows
+            ]
+
+    def objects(self, limit: int) -> List[Dict[str, Any]]:
+        """Return up to `limit` stored objects with id and properties."""
+        return self.find({}, limit=limit)
+
+    def page(
+        self, after: Optional[str], limit: int, include_vectors: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Objects in id order, starting after the given id (like Weaviate's cursor API),
+        so a collection can be read page by page while it changes.
+
+        Args:
+            after: Id of the last object of the previous page, or None for the first page
+            limit: Maximum number of objects
+            include_vectors: Also return each object's (normalized) vector
+
+        Returns:
+            List of dictionaries with id, properties and optionally vector
+        """
+        with self._lock:
+            if self._sorted_ids is None:
+                self._sorted_ids = sorted(self._ids)
+            start = 0 if after is None else bisect.bisect_right(self._sorted_ids, after)
+            page = []
+            for object_id in self._sorted_ids[start : start + limit]:
+                row = self._row_of[object_id]
+                obj = {"id": object_id, "properties": dict(self._properties[row])}
+                if include_vectors:
+                    obj["vector"] = self._matrix()[row].copy()
+                page.append(obj)
+            return page
+
+    def update(self, object_id: str, properties: Dict[str, Any]):
+        """Merge properties into a stored object."""
+        with self._lock:
+            row = self._row_of.get(object_id)
+            if row is not None:
+                self._index_object(object_id, self._properties[row], add=False)
+                self._properties[row].update(properties)
+                self._index_object(object_id, self._properties[row])
+
+    def delete(self, object_ids: List[str]) -> int:
+        """
+        Delete objects by id.
+
+        Args:
+            object_ids: Ids of the objects to delete
+
+        Returns:
+            Number of objects deleted
+        """
+        deleted = 0
+        with self._lock:
+            for object_id in object_ids:
+                row = self._row_of.pop(object_id, None)
+                if row is None:
+                    continue
+                self._index_object(object_id, self._properties[row], add=False)
+                # Move the last row into the freed slot to keep the matrix dense
+                last = len(self._ids) - 1
+                if row != last:
+                    moved_id = self._ids[last]
+                    self._ids[row] = moved_id
+                    self._properties[row] = self._properties[last]
+                    vectors = self._matrix()
+                    vectors[row] = vectors[last]
+                    self._row_of[moved_id] = row
+                self._ids.pop()
+                self._properties.pop()
+                self._sorted_ids = None
+                deleted += 1
+        return deleted
+
+    def clear(self):
+        """Remove all objects."""
+        with self._lock:
+            self._reset()
@@ -0,0 +1,384 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from cache hits up to slow chat completions
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Sequence[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    return (
+        "{"
+        + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels)
+        + "}"
+    )
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _CounterChild:
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        if amount < 0:
+            raise ValueError("Counters can only be incremented")
+        with self._lock:
+            self._value += amount
+
+    def get(self) -> float:
+        return self._value
+
+
+class _GaugeChild:
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float):
+        with self._lock:
+            self._value = float(value)
+
+    def get(self) -> float:
+        return self._value
+
+    @contextmanager
+    def track_inprogress(self):
+        """Increment the gauge while the block runs."""
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+
+class _HistogramChild:
+    def __init__(self, buckets: Sequence[float]):
+        self._upper_bounds = list(buckets) + [float("inf")]
+        self._counts = [0] * len(self._upper_bounds)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self._sum += value
+            for i, bound in enumerate(self._upper_bounds):
+                if value <= bound:
+                    self._counts[i] += 1
+                    break
+
+    @contextmanager
+    def time(self):
+        """Observe the duration of the block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def snapshot(self) -> Tuple[List[Tuple[float, int]], float, int]:
+        """Return cumulative bucket counts, sum and count."""
+        with self._lock:
+            cumulative, total = [], 0
+            for bound, count in zip(self._upper_bounds, self._counts):
+                total += count
+                cumulative.append((bound, total))
+            return cumulative, self._sum, total
+
+
+class _Metric:
+    """Base class for labelled metrics; unlabelled metrics act as their own single child."""
+
+    metric_type = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry=None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Return the child metric for the given label values."""
+        if len(values) != len(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {values}"
+            )
+        key = tuple(str(v) for v in values)
+        with self._lock:
+            child = self._children.get(key)
+            if child is None:
+                child = self._children[key] = self._new_child()
+            return child
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            children = list(self._children.items())
+        lines = []
+        for values, child in sorted(children):
+            labels = list(zip(self.labelnames, values))
+            lines.append(
+                f"{self.name}{_format_labels(labels)} {_format_value(child.get())}"
+            )
+        return lines
+
+    def render(self) -> str:
+        header = [
+            f"# HELP {self.name} {_escape(self.documentation)}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        return "\n".join(header + self._samples())
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    metric_type = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, such as the number of in-flight calls."""
+
+    metric_type = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self.labels().dec(amount)
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def track_inprogress(self):
+        return self.labels().track_inprogress()
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        registry=None,
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            children = list(self._children.items())
+        lines = []
+        for values, child in sorted(children, key=lambda item: item[0]):
+            labels = list(zip(self.labelnames, values))
+            cumulative, total_sum, count = child.snapshot()
+            for bound, bucket_count in cumulative:
+                bucket_labels = labels + [("le", _format_value(bound))]
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(bucket_labels)} {bucket_count}"
+                )
+            lines.append(
+                f"{self.name}_sum{_format_labels(labels)} {_format_value(total_sum)}"
+            )
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# Stage latencies inside the search pipeline
+STAGE_LATENCY = Histogram(
+    "semantic_search_stage_duration_seconds",
+    "Duration of individual search pipeline stages",
+    ["stage"],
+)
+
+# HTTP layer
+HTTP_REQUEST_LATENCY = Histogram(
+    "semantic_search_http_request_duration_seconds",
+    "Duration of HTTP requests by endpoint",
+    ["method", "endpoint", "status"],
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "semantic_search_http_requests_in_flight",
+    "HTTP requests currently being served by endpoint",
+    ["endpoint"],
+)
+
+# Outbound calls and their side effects
+IN_FLIGHT = Gauge(
+    "semantic_search_operations_in_flight",
+    "Pipeline operations currently running",
+    ["operation"],
+)
+TOKENS = Counter(
+    "semantic_search_openai_tokens_total",
+    "Tokens reported by the OpenAI API",
+    ["model", "kind"],
+)
+CACHE_EVENTS = Counter(
+    "semantic_search_cache_events_total",
+    "Cache lookups by cache and result",
+    ["cache", "result"],
+)
+FALLBACKS = Counter(
+    "semantic_search_fallbacks_total",
+    "Times a fallback path was taken instead of the normal result",
+    ["reason"],
+)
+EMBEDDED_TEXTS = Counter(
+    "semantic_search_embedded_texts_total",
+    "Texts sent to the embedding model",
+    ["kind"],
+)
+
+QUERY_EMBEDDING_BATCH_SIZE = Histogram(
+    "semantic_search_query_embedding_batch_size",
+    "Query embeddings sent per coalesced embedding request",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+# Admission control (per endpoint pool), for load shedding and autoscaling
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "semantic_search_admission_queue_depth",
+    "Requests waiting for a slot in an admission pool",
+    ["pool"],
+)
+ADMISSION_ACTIVE = Gauge(
+    "semantic_search_admission_active_requests",
+    "Requests holding a slot in an admission pool",
+    ["pool"],
+)
+ADMISSION_REJECTIONS = Counter(
+    "semantic_search_admission_rejections_total",
+    "Requests rejected by admission control",
+    ["pool", "reason"],
+)
+ADMISSION_QUEUE_WAIT = Histogram(
+    "semantic_search_admission_queue_wait_seconds",
+    "Time admitted requests waited for a slot",
+    ["pool"],
+)
+
+# Outbound model call scheduling, per priority class
+MODEL_CALL_QUEUE_DEPTH = Gauge(
+    "semantic_search_model_call_queue_depth",
+    "Model calls waiting for a slot by priority class",
+    ["call_class"],
+)
+MODEL_CALL_QUEUE_WAIT = Histogram(
+    "semantic_search_model_call_queue_wait_seconds",
+    "Time model calls waited for a slot by priority class",
+    ["call_class"],
+)
+
+# Circuit breakers, per dependency
+CIRCUIT_STATE = Gauge(
+    "semantic_search_circuit_state",
+    "Circuit breaker state by dependency (0 closed, 1 half-open, 2 open)",
+    ["dependency"],
+)
+CIRCUIT_TRANSITIONS = Counter(
+    "semantic_search_circuit_transitions_total",
+    "Circuit breaker state changes by dependency and new state",
+    ["dependency", "state"],
+)
+CIRCUIT_REJECTIONS = Counter(
+    "semantic_search_circuit_rejections_total",
+    "Calls refused without trying because the dependency's circuit was open",
+    ["dependency"],
+)
+
+RETRIEVED_PASSAGES = Histogram(
+    "semantic_search_retrieved_passages",
+    "Passages returned by a vector search after certainty and autocut pruning",
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21),
+)
+
+
+def record_token_usage(model: str, response):
+    """Count the tokens reported in the usage block of an OpenAI response."""
+    try:
+        usage = response["usage"]
+    except (KeyError, TypeError):
+        return
+    for kind in ("prompt_tokens", "completion_tokens"):
+        if usage.get(kind):
+            TOKENS.labels(model, kind.replace("_tokens", "")).inc(usage[kind])
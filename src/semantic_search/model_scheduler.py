@@ -0,0 +1,112 @@
+import itertools
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .config import MODEL_CALL_QUOTAS, MODEL_MAX_CONCURRENT_CALLS
+from .metrics import MODEL_CALL_QUEUE_DEPTH, MODEL_CALL_QUEUE_WAIT
+
+# Lower value runs first
+PRIORITIES = {"query": 0, "generation": 1, "bulk": 2}
+
+
+class ModelCallScheduler:
+    """
+    Central gate for outbound model calls (embeddings and chat completions),
+    which share one API key and its rate limit.
+
+    At most max_concurrency calls run at once, and each priority class at most
+    its quota. When a slot frees up it goes to the waiting call of the highest
+    priority class that is under its quota (first come, first served within a
+    class): interactive query embeddings before answer generation before bulk
+    ingestion. Bulk ingestion is scheduled one provider batch at a time, so
+    queued bulk batches are overtaken by every interactive call that arrives,
+    while a batch already sent is left to finish.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = MODEL_MAX_CONCURRENT_CALLS,
+        quotas: Optional[Dict[str, int]] = None,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_concurrency: Calls allowed in flight across all classes (0 disables scheduling)
+            quotas: Calls allowed in flight per class (MODEL_CALL_QUOTAS by default)
+        """
+        self.max_concurrency = max_concurrency
+        self.quotas = dict(MODEL_CALL_QUOTAS if quotas is None else quotas)
+        self._cond = threading.Condition()
+        self._active: Dict[str, int] = {name: 0 for name in PRIORITIES}
+        self._waiting: List[Tuple[int, int, str]] = []
+        self._sequence = itertools.count()
+
+    def _next_ticket(self) -> Optional[Tuple[int, int, str]]:
+        """Waiting call that gets the next free slot; caller holds the condition."""
+        if sum(self._active.values()) >= self.max_concurrency:
+            return None
+        eligible = [
+            t
+            for t in self._waiting
+            if self._active[t[2]] < self.quotas.get(t[2], self.max_concurrency)
+        ]
+        return min(eligible) if eligible else None
+
+    def run(
+        self, call_class: str, fn: Callable[[], Any], timeout: Optional[float] = None
+    ) -> Any:
+        """
+        Run a model call once a slot is granted to it.
+
+        Args:
+            call_class: Priority class: "query", "generation" or "bulk"
+            fn: The call
+            timeout: Longest to wait for a slot (None waits indefinitely); the call itself is not limited
+
+        Returns:
+            Whatever fn returns
+
+        Raises:
+            TimeoutError: No slot was granted within the timeout
+            Whatever fn raised
+        """
+        if self.max_concurrency <= 0:
+            return fn()
+
+        ticket = (PRIORITIES[call_class], next(self._sequence), call_class)
+        start = time.perf_counter()
+        with self._cond:
+            self._waiting.append(ticket)
+            MODEL_CALL_QUEUE_DEPTH.labels(call_class).inc()
+            try:
+                while self._next_ticket() != ticket:
+                    remaining = (
+                        None
+                        if timeout is None
+                        else timeout - (time.perf_counter() - start)
+                    )
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(
+                            f"No model call slot for {call_class} within {timeout:.3f}s"
+                        )
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting.remove(ticket)
+                MODEL_CALL_QUEUE_DEPTH.labels(call_class).dec()
+                # Leaving the queue may let another class through
+                self._cond.notify_all()
+            self._active[call_class] += 1
+        MODEL_CALL_QUEUE_WAIT.labels(call_class).observe(time.perf_counter() - start)
+
+        try:
+            return fn()
+        finally:
+            with self._cond:
+                self._active[call_class] -= 1
+                self._cond.notify_all()
+
+
+# Shared by every component of the process, since they share the API key
+model_scheduler = ModelCallScheduler()
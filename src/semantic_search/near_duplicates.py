@@ -0,0 +1,386 @@
+import json
+import os
+import threading
+import zlib
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .config import (
+    NEAR_DUPLICATE_BANDS,
+    NEAR_DUPLICATE_INDEX_FILE,
+    NEAR_DUPLICATE_NUM_PERM,
+    NEAR_DUPLICATE_SHINGLE_SIZE,
+    NEAR_DUPLICATE_THRESHOLD,
+)
+from .text_processor import TextProcessor
+
+# Mersenne prime used by the universal hash family of the MinHash permutations
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+class NearDuplicateDetector:
+    """
+    Detects near-duplicate text chunks using MinHash signatures and an LSH index.
+
+    The index holds the stored chunks of all documents, keyed by content hash,
+    together with the documents holding each of them. A skipped chunk is
+    recorded as depending on the stored chunk it matched. When the last
+    document holding that chunk releases it, the dependent chunks are handed
+    back (see release) so they can be stored in its place.
+    """
+
+    def __init__(
+        self,
+        threshold: float = NEAR_DUPLICATE_THRESHOLD,
+        num_perm: int = NEAR_DUPLICATE_NUM_PERM,
+        bands: int = NEAR_DUPLICATE_BANDS,
+        shingle_size: int = NEAR_DUPLICATE_SHINGLE_SIZE,
+        index_file: Optional[Path] = NEAR_DUPLICATE_INDEX_FILE,
+        seed: int = 1,
+    ):
+        """
+        Initialize the detector and load a persisted index if one exists.
+
+        Args:
+            threshold: Minimum estimated Jaccard similarity to treat two chunks as near-duplicates
+            num_perm: Number of MinHash permutations per signature
+            bands: Number of LSH bands (must divide num_perm)
+            shingle_size: Number of characters per shingle
+            index_file: Where to persist the index, or None to keep it in memory only
+            seed: Seed for the permutation parameters (must stay fixed for a persisted index)
+        """
+        if num_perm % bands != 0:
+            raise ValueError(
+                f"num_perm ({num_perm}) must be divisible by bands ({bands})"
+            )
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.index_file = Path(index_file) if index_file else None
+
+        generator = np.random.RandomState(seed)
+        self._a = generator.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = generator.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+        self._lock = threading.Lock()
+        self._reset()
+        self._load()
+
+    def _reset(self) -> None:
+        # Signature of every stored chunk by content hash
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._buckets: List[Dict[bytes, Set[str]]] = [
+            defaultdict(set) for _ in range(self.bands)
+        ]
+        # Documents storing a chunk with the content hash
+        self._holders: Dict[str, Set[str]] = {}
+        # Skipped chunks of each document: position, text, metadata and matched content hash
+        self._skipped: Dict[str, List[Dict[str, Any]]] = {}
+        # Documents with skipped chunks matching the content hash
+        self._dependents: Dict[str, Set[str]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def holders(self, content_hash: str) -> Set[str]:
+        """IDs of the documents storing a chunk with the content hash."""
+        with self._lock:
+            return set(self._holders.get(content_hash, ()))
+
+    def skipped_chunks(self, doc_id: str) -> List[Dict[str, Any]]:
+        """Chunks of a document skipped as near-duplicates, with their position and match."""
+        with self._lock:
+            return [dict(record) for record in self._skipped.get(doc_id, [])]
+
+    def _shingles(self, text: str) -> np.ndarray:
+        """Hash the character shingles of normalized text to 32-bit values."""
+        normalized = " ".join(text.lower().split())
+        if len(normalized) <= self.shingle_size:
+            shingles = {normalized}
+        else:
+            shingles = {
+                normalized[i : i + self.shingle_size]
+                for i in range(len(normalized) - self.shingle_size + 1)
+            }
+        return np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingles),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+
+    def signature(self, text: str) -> np.ndarray:
+        """
+        Compute the MinHash signature of a text.
+
+        Args:
+            text: Text to sign
+
+        Returns:
+            Array of num_perm 32-bit minimum hash values
+        """
+        hashes = self._shingles(text)
+        # (a * h + b) mod p for every (permutation, shingle) pair, then min over shingles
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME
+        return np.bitwise_and(permuted, _MAX_HASH).min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [
+            signature[band * self.rows : (band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+    def _find_match(self, signature: np.ndarray) -> Optional[str]:
+        """Return the content hash of a stored chunk similar to the signature, if any."""
+        candidates: Set[str] = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(key, ()))
+
+        # Sorted, so the same chunk is matched however the buckets were filled
+        for candidate in sorted(candidates):
+            similarity = float(np.mean(self._signatures[candidate] == signature))
+            if similarity >= self.threshold:
+                return candidate
+        return None
+
+    def _insert(self, content_hash: str, signature: np.ndarray, doc_id: str):
+        if content_hash not in self._signatures:
+            self._signatures[content_hash] = signature
+            for band, band_key in enumerate(self._band_keys(signature)):
+                self._buckets[band][band_key].add(content_hash)
+        self._holders.setdefault(content_hash, set()).add(doc_id)
+
+    def _discard(self, content_hash: str):
+        signature = self._signatures.pop(content_hash)
+        for band, band_key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets[band].get(band_key)
+            if bucket is not None:
+                bucket.discard(content_hash)
+                if not bucket:
+                    del self._buckets[band][band_key]
+
+    def find_duplicate(self, text: str) -> Optional[str]:
+        """
+        Look up a stored chunk of any document that is a near-duplicate of the text.
+
+        Args:
+            text: Chunk text to check
+
+        Returns:
+            Content hash of the matching stored chunk, or None
+        """
+        content_hash = TextProcessor.content_hash(text)
+        with self._lock:
+            if content_hash in self._signatures:
+                return content_hash
+            return self._find_match(self.signature(text))
+
+    def filter_chunks(
+        self,
+        chunks: List[str],
+        doc_id: str = "",
+        positions: Optional[List[int]] = None,
+        metadata: Optional[Dict[str, str]] = None,
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Split chunks into new ones and near-duplicates of stored chunks of any
+        document. New chunks are added to the index as held by the document, so
+        near-duplicates within the same batch are caught as well. Skipped chunks
+        are recorded as depending on their match.
+
+        Args:
+            chunks: Chunk texts about to be embedded
+            doc_id: ID of the document the chunks belong to
+            positions: Position of each chunk within its document (defaults to list order)
+            metadata: Document metadata, kept with skipped chunks for re-storing them
+
+        Returns:
+            Tuple of (chunks to embed, skipped near-duplicate chunks)
+        """
+        if positions is None:
+            positions = list(range(len(chunks)))
+        kept, skipped = [], []
+        with self._lock:
+            for chunk, position in zip(chunks, positions):
+                content_hash = TextProcessor.content_hash(chunk)
+                match = content_hash
+                if content_hash not in self._signatures:
+                    signature = self.signature(chunk)
+                    found = self._find_match(signature)
+                    if found is None:
+                        self._insert(content_hash, signature, doc_id)
+                        kept.append(chunk)
+                        continue
+                    match = found
+
+                self._skipped.setdefault(doc_id, []).append(
+                    {
+                        "position": int(position),
+                        "text": chunk,
+                        "metadata": dict(metadata or {}),
+                        "match": match,
+                    }
+                )
+                self._dependents[match].add(doc_id)
+                skipped.append(chunk)
+
+            if chunks:
+                self._save()
+
+        return kept, skipped
+
+    def register(self, chunks: List[str], doc_ids: List[str], save: bool = True):
+        """
+        Add chunks that are already stored, e.g. restored from a snapshot, without filtering them.
+
+        Args:
+            chunks: Stored chunk texts
+            doc_ids: ID of the document holding each chunk
+            save: Persist the index now; pass False while registering many batches and call save()
+        """
+        with self._lock:
+            for chunk, doc_id in zip(chunks, doc_ids):
+                content_hash = TextProcessor.content_hash(chunk)
+                signature = self._signatures.get(content_hash)
+                if signature is None:
+                    signature = self.signature(chunk)
+                self._insert(content_hash, signature, doc_id)
+            if save:
+                self._save()
+
+    def release(self, doc_id: str, content_hashes: List[str]) -> List[Dict[str, Any]]:
+        """
+        Record that a document no longer stores chunks, e.g. after they were deleted.
+        Chunks no other document stores leave the index.
+
+        Args:
+            doc_id: ID of the document
+            content_hashes: Content hashes of the chunks it no longer stores
+
+        Returns:
+            Skipped chunks that depended on a chunk that left the index, as dictionaries
+            with doc_id, position, text and metadata; they are no longer recorded and
+            have to be stored (or filtered again) by the caller
+        """
+        orphans: List[Dict[str, Any]] = []
+        with self._lock:
+            for content_hash in content_hashes:
+                holders = self._holders.get(content_hash)
+                if holders is None:
+                    continue
+                holders.discard(doc_id)
+                if holders:
+                    continue
+                del self._holders[content_hash]
+                self._discard(content_hash)
+
+                for dependent in sorted(self._dependents.pop(content_hash, ())):
+                    records = self._skipped.get(dependent, [])
+                    orphans.extend(
+                        {"doc_id": dependent, **r}
+                        for r in records
+                        if r["match"] == content_hash
+                    )
+                    remaining = [r for r in records if r["match"] != content_hash]
+                    if remaining:
+                        self._skipped[dependent] = remaining
+                    else:
+                        self._skipped.pop(dependent, None)
+            self._save()
+
+        for orphan in orphans:
+            del orphan["match"]
+        return orphans
+
+    def forget_skipped(self, doc_id: str):
+        """
+        Drop the skipped chunks recorded for a document, before it is deleted or re-filtered.
+
+        Args:
+            doc_id: ID of the document
+        """
+        with self._lock:
+            records = self._skipped.pop(doc_id, [])
+            for record in records:
+                dependents = self._dependents.get(record["match"])
+                if dependents is not None:
+                    dependents.discard(doc_id)
+                    if not dependents:
+                        del self._dependents[record["match"]]
+            if records:
+                self._save()
+
+    def clear(self):
+        """Forget all indexed chunks, including the persisted index."""
+        with self._lock:
+            self._reset()
+            if self.index_file and self.index_file.exists():
+                self.index_file.unlink()
+
+    def save(self):
+        """Persist the index (see register)."""
+        with self._lock:
+            self._save()
+
+    def _save(self):
+        """Persist signatures and references atomically; LSH buckets are rebuilt on load."""
+        if self.index_file is None:
+            return
+        try:
+            keys = list(self._signatures.keys())
+            signatures = (
+                np.stack([self._signatures[k] for k in keys])
+                if keys
+                else np.empty((0, self.num_perm), dtype=np.uint32)
+            )
+            references = {
+                "holders": {h: sorted(docs) for h, docs in self._holders.items()},
+                "skipped": self._skipped,
+            }
+            tmp_file = self.index_file.with_suffix(".tmp")
+            with open(tmp_file, "wb") as f:
+                np.savez(
+                    f,
+                    keys=np.array(keys, dtype=str),
+                    signatures=signatures,
+                    references=np.array(json.dumps(references)),
+                )
+            os.replace(tmp_file, self.index_file)
+        except Exception as e:
+            print(f"Error saving near-duplicate index: {str(e)}")
+
+    def _load(self):
+        if self.index_file is None or not self.index_file.exists():
+            return
+        try:
+            with np.load(str(self.index_file), allow_pickle=False) as data:
+                keys, signatures = data["keys"], data["signatures"]
+                if "references" not in data.files:
+                    print(
+                        "Near-duplicate index has no chunk references, starting empty"
+                    )
+                    return
+                references = json.loads(str(data["references"]))
+            if signatures.shape[1:] != (self.num_perm,):
+                print(
+                    "Near-duplicate index was built with different settings, starting empty"
+                )
+                return
+            holders = references["holders"]
+            for key, signature in zip(keys, signatures):
+                for doc_id in holders.get(str(key), ()):
+                    self._insert(str(key), signature, doc_id)
+            self._skipped = references["skipped"]
+            for doc_id, records in self._skipped.items():
+                for record in records:
+                    self._dependents[record["match"]].add(doc_id)
+            print(f"Loaded near-duplicate index with {len(self._signatures)} chunks")
+        except Exception as e:
+            print(f"Error loading near-duplicate index: {str(e)}")
+            self._reset()
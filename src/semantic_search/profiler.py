@@ -0,0 +1,159 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import PROFILE_MAX_SECONDS, PROFILE_MIN_INTERVAL_MS
+
+# Leaf frames of threads that are blocked waiting for work rather than running code
+_IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+}
+
+
+class ProfilerBusyError(Exception):
+    """Raised when a profile is requested while another one is running."""
+
+
+def _frame_label(code) -> str:
+    """Label a code object as `function (package/module.py:line)`."""
+    path = code.co_filename.replace("\\", "/").split("/")
+    return f"{code.co_name} ({'/'.join(path[-2:])}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler that samples the Python stacks of all threads at a
+    fixed interval. Unlike cProfile it sees every worker thread of the server,
+    and its overhead is bounded by the sampling interval rather than by the
+    number of function calls. Only one profile can run at a time.
+    """
+
+    def __init__(
+        self,
+        max_seconds: float = PROFILE_MAX_SECONDS,
+        min_interval_ms: float = PROFILE_MIN_INTERVAL_MS,
+    ):
+        """
+        Initialize the profiler.
+
+        Args:
+            max_seconds: Upper bound on the duration of a single profile
+            min_interval_ms: Lower bound on the sampling interval, which bounds the overhead
+        """
+        self.max_seconds = max_seconds
+        self.min_interval_ms = min_interval_ms
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def profile(
+        self,
+        seconds: float,
+        interval_ms: float = 10.0,
+        include_idle: bool = False,
+        top: int = 30,
+    ) -> Dict[str, Any]:
+        """
+        Sample all threads for the given duration and summarize where time went.
+
+        Args:
+            seconds: How long to sample (capped at max_seconds)
+            interval_ms: Time between samples (at least min_interval_ms)
+            include_idle: Whether to keep samples of threads blocked waiting for work
+            top: Number of hotspots to report
+
+        Returns:
+            Dictionary with sampling statistics, hotspots sorted by self time,
+            and collapsed stacks in the flame graph format (`frame;frame;frame count`)
+
+        Raises:
+            ProfilerBusyError: If another profile is already running
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running")
+        try:
+            seconds = max(0.0, min(float(seconds), self.max_seconds))
+            interval = max(float(interval_ms), self.min_interval_ms) / 1000
+            stacks, samples, elapsed = self._sample(seconds, interval, include_idle)
+        finally:
+            self._lock.release()
+
+        return {
+            "duration_s": round(elapsed, 3),
+            "interval_ms": interval * 1000,
+            "samples": samples,
+            "stack_samples": sum(stacks.values()),
+            "hotspots": self._hotspots(stacks, top),
+            "collapsed": self._collapsed(stacks),
+        }
+
+    def _sample(
+        self, seconds: float, interval: float, include_idle: bool
+    ) -> Tuple[Counter, int, float]:
+        stacks: Counter = Counter()
+        samples = 0
+        own_thread = threading.get_ident()
+        start = time.perf_counter()
+        deadline = start + seconds
+
+        while True:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                leaf = frame.f_code
+                if (
+                    not include_idle
+                    and (os.path.basename(leaf.co_filename), leaf.co_name)
+                    in _IDLE_LEAVES
+                ):
+                    continue
+                stack = []
+                current: Optional[FrameType] = frame
+                while current is not None:
+                    stack.append(_frame_label(current.f_code))
+                    current = current.f_back
+                stacks[tuple(reversed(stack))] += 1
+            samples += 1
+
+            now = time.perf_counter()
+            if now >= deadline:
+                return stacks, samples, now - start
+            time.sleep(min(interval, deadline - now))
+
+    @staticmethod
+    def _hotspots(stacks: Counter, top: int) -> List[Dict[str, Any]]:
+        """Rank functions by self samples, with inclusive samples alongside."""
+        self_samples: Counter = Counter()
+        total_samples: Counter = Counter()
+        for stack, count in stacks.items():
+            self_samples[stack[-1]] += count
+            for label in set(stack):
+                total_samples[label] += count
+
+        stack_total = sum(stacks.values()) or 1
+        return [
+            {
+                "function": label,
+                "self_samples": count,
+                "self_pct": round(100 * count / stack_total, 2),
+                "total_samples": total_samples[label],
+                "total_pct": round(100 * total_samples[label] / stack_total, 2),
+            }
+            for label, count in self_samples.most_common(top)
+        ]
+
+    @staticmethod
+    def _collapsed(stacks: Counter) -> str:
+        return "\n".join(
+            f"{';'.join(stack)} {count}"
+            for stack, count in sorted(stacks.items(), key=lambda item: -item[1])
+        )
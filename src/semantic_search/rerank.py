@@ -0,0 +1,61 @@
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from .config import MMR_LAMBDA
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def mmr_rerank(
+    query_vector: Sequence[float],
+    candidate_vectors: Sequence[Sequence[float]],
+    k: int,
+    lambda_: float = MMR_LAMBDA,
+) -> Tuple[List[int], List[float]]:
+    """
+    Rescore candidates with exact cosine similarity and pick a diverse subset
+    with Maximal Marginal Relevance: each step takes the candidate maximizing
+    lambda * sim(query, c) - (1 - lambda) * max sim(c, already selected).
+
+    Args:
+        query_vector: Query embedding
+        candidate_vectors: Embeddings of the candidates
+        k: Number of candidates to select
+        lambda_: Trade-off between relevance (1.0) and diversity (0.0)
+
+    Returns:
+        Tuple of (indices of the selected candidates in selection order,
+        their exact cosine similarity to the query)
+    """
+    if len(candidate_vectors) == 0 or k <= 0:
+        return [], []
+
+    candidates = _normalize_rows(np.asarray(candidate_vectors, dtype=np.float32))
+    query = _normalize_rows(np.asarray(query_vector, dtype=np.float32).reshape(1, -1))[
+        0
+    ]
+    relevance = candidates @ query
+    k = min(k, len(candidates))
+
+    # Pairwise similarities once up front; the candidate set is small (k * over-fetch)
+    pairwise = candidates @ candidates.T
+    redundancy = np.full(len(candidates), -np.inf, dtype=np.float32)
+    available = np.ones(len(candidates), dtype=bool)
+    selected: List[int] = []
+
+    for _ in range(k):
+        # Nothing selected yet means no redundancy penalty
+        penalty = np.where(np.isfinite(redundancy), redundancy, 0.0)
+        scores = lambda_ * relevance - (1.0 - lambda_) * penalty
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        redundancy = np.maximum(redundancy, pairwise[best])
+
+    return selected, [float(relevance[i]) for i in selected]
@@ -0,0 +1,93 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from .config import SEARCH_RESULT_CACHE_SIZE, SEARCH_RESULT_CACHE_TTL_SECONDS
+from .metrics import CACHE_EVENTS
+
+
+class ResultCache:
+    """
+    LRU cache of results tagged with the index generation they were computed at.
+
+    An entry is only served while the index is still at that generation, so any
+    write to the index invalidates every cached result at once without having
+    to find the affected entries. The TTL bounds staleness from writes this
+    process cannot see (other replicas writing to the same Weaviate instance).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = SEARCH_RESULT_CACHE_SIZE,
+        ttl_seconds: float = SEARCH_RESULT_CACHE_TTL_SECONDS,
+    ):
+        """
+        Initialize an empty cache.
+
+        Args:
+            name: Label used for the hit/miss metrics
+            max_entries: Maximum number of cached results
+            ttl_seconds: Maximum age of a served result; 0 means no limit
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, generation: int) -> Optional[Any]:
+        """
+        Look up a result computed at the given index generation.
+
+        Args:
+            key: Identity of the request
+            generation: Current index generation
+
+        Returns:
+            A private copy of the cached result, or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                CACHE_EVENTS.labels(self.name, "miss").inc()
+                return None
+            entry_generation, stored_at, value = entry
+            expired = (
+                self.ttl_seconds > 0 and time.monotonic() - stored_at > self.ttl_seconds
+            )
+            if entry_generation != generation or expired:
+                del self._entries[key]
+                CACHE_EVENTS.labels(self.name, "stale").inc()
+                return None
+            self._entries.move_to_end(key)
+        CACHE_EVENTS.labels(self.name, "hit").inc()
+        return copy.deepcopy(value)
+
+    def put(self, key: Hashable, generation: int, value: Any):
+        """
+        Store a result.
+
+        Args:
+            key: Identity of the request
+            generation: Index generation read before the result was computed
+            value: The result; a copy is stored so callers may keep modifying theirs
+        """
+        if self.max_entries <= 0:
+            return
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (generation, time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,246 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Scalar HNSW settings that can be changed on an existing class
+MUTABLE_SCALAR_KEYS = ["ef"]
+IMMUTABLE_SCALAR_KEYS = ["distance", "efConstruction", "maxConnections"]
+
+
+def iter_objects(
+    client, class_name: str = "Articles", batch_size: int = 500
+) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate over every object of a class with its vector, using the cursor API
+    so large classes are read in constant memory and without offset limits.
+
+    Args:
+        client: Weaviate client
+        class_name: Class to read
+        batch_size: Objects fetched per request
+
+    Yields:
+        Dictionaries with id, properties and vector
+    """
+    after = None
+    while True:
+        result = client.data_object.get(
+            class_name=class_name, with_vector=True, limit=batch_size, after=after
+        )
+        objects = (result or {}).get("objects") or []
+        if not objects:
+            return
+        for obj in objects:
+            yield {
+                "id": obj["id"],
+                "properties": obj.get("properties", {}),
+                "vector": obj.get("vector"),
+            }
+        after = objects[-1]["id"]
+
+
+def count_objects(client, class_name: str = "Articles") -> int:
+    """Number of objects stored in a class."""
+    result = client.query.aggregate(class_name).with_meta_count().do()
+    return result["data"]["Aggregate"][class_name][0]["meta"]["count"]
+
+
+def export_objects(
+    client,
+    path: Path,
+    class_name: str = "Articles",
+    transform: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+) -> int:
+    """
+    Write every object of a class to a JSON-lines file, one object per line.
+
+    Args:
+        client: Weaviate client
+        path: File to write; replaced atomically once complete
+        class_name: Class to export
+        transform: Optional function applied to each object before it is written
+
+    Returns:
+        Number of exported objects
+    """
+    path = Path(path)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    exported = 0
+    with open(tmp_path, "w") as f:
+        for obj in iter_objects(client, class_name):
+            if transform is not None:
+                obj = transform(obj)
+            f.write(json.dumps(obj) + "\n")
+            exported += 1
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return exported
+
+
+def import_objects(
+    client, path: Path, class_name: str = "Articles", batch_size: int = 100
+) -> int:
+    """
+    Re-create exported objects with their original ids and vectors.
+
+    Args:
+        client: Weaviate client
+        path: JSON-lines file written by export_objects
+        class_name: Class to import into
+        batch_size: Objects per batch request
+
+    Returns:
+        Number of imported objects
+    """
+    imported = 0
+    with client.batch as batch:
+        batch.batch_size = batch_size
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                obj = json.loads(line)
+                batch.add_data_object(
+                    data_object=obj["properties"],
+                    class_name=class_name,
+                    uuid=obj["id"],
+                    vector=obj["vector"],
+                )
+                imported += 1
+    return imported
+
+
+def vector_index_changes(
+    current: Dict[str, Any], target: Dict[str, Any]
+) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Compare the vectorIndexConfig of an existing class with the target settings.
+
+    Args:
+        current: vectorIndexConfig reported by Weaviate
+        target: vectorIndexConfig to apply (VectorIndexConfig.to_weaviate())
+
+    Returns:
+        Tuple of (changes that can be applied in place, names of settings that need a rebuild)
+    """
+    mutable, immutable = {}, []
+    for key in MUTABLE_SCALAR_KEYS:
+        if key in target and current.get(key) != target[key]:
+            mutable[key] = target[key]
+    for key in IMMUTABLE_SCALAR_KEYS:
+        if key in target and current.get(key) != target[key]:
+            immutable.append(key)
+
+    current_pq = current.get("pq") or {"enabled": False}
+    target_pq = target.get("pq") or {"enabled": False}
+    if target_pq["enabled"] and not current_pq.get("enabled"):
+        # PQ can be switched on for an existing class; it trains on the stored vectors
+        mutable["pq"] = target_pq
+    elif current_pq.get("enabled") and (
+        not target_pq["enabled"]
+        or any(current_pq.get(k) != v for k, v in target_pq.items())
+    ):
+        immutable.append("pq")
+
+    current_bq = bool((current.get("bq") or {}).get("enabled"))
+    target_bq = bool((target.get("bq") or {}).get("enabled"))
+    if current_bq != target_bq:
+        immutable.append("bq")
+    return mutable, immutable
+
+
+def rebuild_class(
+    client,
+    class_definition: Dict[str, Any],
+    export_file: Path,
+    transform: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+    from_export: bool = False,
+) -> Dict[str, int]:
+    """
+    Re-create a class with a new definition and copy its objects over. Objects
+    are exported to a file first, so an interrupted migration can be resumed
+    with from_export=True without losing data.
+
+    Args:
+        client: Weaviate client
+        class_definition: New class definition
+        export_file: Where the objects are exported
+        transform: Optional function applied to each exported object
+        from_export: Skip the export and import an existing export file
+
+    Returns:
+        Dictionary with the number of exported and imported objects
+    """
+    class_name = class_definition["class"]
+    if from_export:
+        with open(export_file) as f:
+            exported = sum(1 for line in f if line.strip())
+    else:
+        exported = export_objects(client, export_file, class_name, transform)
+        print(f"Exported {exported} objects to {export_file}")
+
+    if client.schema.exists(class_name):
+        client.schema.delete_class(class_name)
+    client.schema.create_class(class_definition)
+    imported = import_objects(client, export_file, class_name)
+    stored = count_objects(client, class_name)
+    print(f"Imported {imported} objects, {stored} stored")
+    if stored != exported:
+        raise RuntimeError(
+            f"Class {class_name} holds {stored} objects but {exported} were exported; "
+            f"re-run with the export file {export_file} to retry the import"
+        )
+    return {"exported": exported, "imported": imported}
+
+
+def apply_vector_index_config(
+    client,
+    class_definition: Dict[str, Any],
+    export_file: Path,
+    rebuild: bool = False,
+    dry_run: bool = False,
+    from_export: bool = False,
+) -> Dict[str, Any]:
+    """
+    Bring the vector index of an existing class in line with a new definition:
+    settings Weaviate can change in place are updated, the rest rebuild the class.
+
+    Args:
+        client: Weaviate client
+        class_definition: Target class definition (EmbeddingManager.articles_class_definition())
+        export_file: Where objects are exported if the class has to be rebuilt
+        rebuild: Rebuild even if every change could be applied in place
+        dry_run: Only report what would change
+        from_export: Rebuild from an existing export file (resuming an interrupted rebuild)
+
+    Returns:
+        Dictionary describing the changes and the action taken
+    """
+    class_name = class_definition["class"]
+    target = class_definition["vectorIndexConfig"]
+    if not client.schema.exists(class_name):
+        if not dry_run:
+            client.schema.create_class(class_definition)
+        return {"action": "created", "in_place": {}, "rebuild": []}
+
+    current = client.schema.get(class_name).get("vectorIndexConfig", {})
+    in_place, needs_rebuild = vector_index_changes(current, target)
+    report: Dict[str, Any] = {"in_place": in_place, "rebuild": needs_rebuild}
+
+    if needs_rebuild or rebuild or from_export:
+        report["action"] = "rebuild"
+        if not dry_run:
+            report.update(
+                rebuild_class(
+                    client, class_definition, export_file, from_export=from_export
+                )
+            )
+    elif in_place:
+        report["action"] = "update"
+        if not dry_run:
+            client.schema.update_config(class_name, {"vectorIndexConfig": in_place})
+    else:
+        report["action"] = "none"
+    return report
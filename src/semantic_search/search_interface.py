@@ -1,10 +1,26 @@
-from typing import List, Optional, Dict, Any
-from .config import SearchConfig
+import uuid
+import numpy as np
+from collections import defaultdict
+from pathlib import Path
+from typing import Iterator, List, Optional, Dict, Any, Tuple
+from .config import (
+    SearchConfig,
+    ENABLE_NEAR_DUPLICATE_DETECTION,
+    ENABLE_SINGLE_FLIGHT,
+    FILTERABLE_PROPERTIES,
+    SEED_SNAPSHOT_PATH,
+)
 from .text_processor import TextProcessor
 from .embedding_manager import EmbeddingManager
 from .generative_search import GenerativeSearch
 from .sample_data import get_all_sample_data
 from .generate_embeddings import EmbeddingGenerator
+from .near_duplicates import NearDuplicateDetector
+from .singleflight import SingleFlight
+from .result_cache import ResultCache
+from .metrics import CACHE_EVENTS
+from .timing import stage
+from .deadline import current_deadline
 
 class SemanticSearchInterface:
     """Main interface for semantic search and question answering."""
@@ -32,24 +48,47 @@ class SemanticSearchInterface:
         self.embedding_manager = EmbeddingManager()
         self.embedding_generator = EmbeddingGenerator()
         self.generative_search = GenerativeSearch(embedding_manager=self.embedding_manager)
+        self.duplicate_detector = NearDuplicateDetector() if ENABLE_NEAR_DUPLICATE_DETECTION else None
+        # Identical concurrent requests share one embedding, vector search and generation
+        self.search_flights = SingleFlight("search_singleflight") if ENABLE_SINGLE_FLIGHT else None
+        self.question_flights = SingleFlight("question_singleflight") if ENABLE_SINGLE_FLIGHT else None
+        # Search results, valid until the next index write
+        self.search_cache = ResultCache("search_results")
         
-        # Clear existing data and load samples if requested
-        self.clear_database()
-        if load_sample_data:
+        # Replace existing data with a seed snapshot or the samples if requested;
+        # otherwise the stored chunks and the persisted near-duplicate index are kept
+        if SEED_SNAPSHOT_PATH:
+            self.import_snapshot(SEED_SNAPSHOT_PATH)
+        elif load_sample_data:
+            self.clear_database()
             self._load_sample_data(use_cached_embeddings)
-            
+        else:
+            self._reconcile_duplicate_detector()
+
+    def _reconcile_duplicate_detector(self):
+        """Forget the persisted near-duplicate index if the database it describes is empty."""
+        if self.duplicate_detector is None or len(self.duplicate_detector) == 0:
+            return
+        try:
+            empty = not self.get_database_page(limit=1, properties=["content_hash"])
+        except Exception as e:
+            print(f"Could not check the database, keeping the near-duplicate index: {str(e)}")
+            return
+        if empty:
+            # E.g. the in-memory local backend after a restart
+            print("Database is empty, clearing the near-duplicate index")
+            self.duplicate_detector.clear()
+
+
     def _load_sample_data(self, use_cached: bool = True):
         """
-        Clear database and load sample texts into the vector database.
+        Load sample texts into the (freshly cleared) vector database.
         If cached embeddings are available and use_cached is True, use them.
         Otherwise, generate new embeddings.
         
         Args:
             use_cached: Whether to use cached embeddings if available
         """
-        print("Clearing existing database...")
-        self.embedding_manager.clear_database()
-        
         print("Loading sample data...")
         sample_data = get_all_sample_data()
         
@@ -57,8 +96,18 @@ class SemanticSearchInterface:
             text = article["text"]
             title = article["title"]
             
-            # Process text into chunks
-            chunks = self.text_processor.process_text(text)
+            # Stable document ID derived from the title
+            doc_id = uuid.uuid5(uuid.NAMESPACE_URL, title).hex
+
+            # Process text into chunks and drop near-duplicates of chunks already loaded
+            metadata = {"title": title, "field": article.get("field")}
+            all_chunks = self.text_processor.process_text(text)
+            chunks, positions, _ = self._filter_near_duplicates(
+                all_chunks, list(range(len(all_chunks))), doc_id, metadata
+            )
+            if len(chunks) == 0:
+                print(f"Skipping empty article: {title}")
+                continue
             
             # Try to get cached embeddings if enabled
             embeddings = None
@@ -70,6 +119,7 @@ class SemanticSearchInterface:
                     print(f"No cached embeddings found for: {title}")
             
             # Generate new embeddings if needed
+            CACHE_EVENTS.labels("sample_embeddings", "miss" if embeddings is None else "hit").inc()
             if embeddings is None:
                 print(f"Generating new embeddings for: {title}")
                 embeddings = self.embedding_manager.create_embeddings(chunks.tolist())
@@ -78,21 +128,130 @@ class SemanticSearchInterface:
             
             # Add to database
             print(f"Adding article to database: {title}")
-            self.embedding_manager.build_search_index(chunks, embeddings)
+            self.embedding_manager.build_search_index(
+                chunks.tolist(), embeddings, doc_id=doc_id, positions=positions, metadata=metadata
+            )
             
         print("Sample data loading complete")
         
-    def process_and_index_text(self, text: str):
+    def _filter_near_duplicates(
+        self,
+        chunks: np.ndarray,
+        positions: List[int],
+        doc_id: str,
+        metadata: Optional[Dict[str, str]] = None
+    ) -> Tuple[np.ndarray, List[int], List[str]]:
+        """
+        Drop chunks that are near-duplicates of already indexed chunks of any
+        document, so they skip both the embedding call and the database write.
+        The detector records what each skipped chunk depends on; when the last
+        document storing that chunk lets go of it, the skipped chunks are
+        stored instead (see _restore_chunks).
+
+        Args:
+            chunks: Processed text chunks
+            positions: Position of each chunk within its document
+            doc_id: ID of the document the chunks belong to
+            metadata: Document metadata, stored with skipped chunks if they are restored
+
+        Returns:
+            Tuple of (chunks to embed and index, their positions, skipped near-duplicate chunks)
+        """
+        if self.duplicate_detector is None:
+            return chunks, positions, []
+        kept, skipped = self.duplicate_detector.filter_chunks(
+            chunks.tolist(), doc_id, positions, metadata
+        )
+        CACHE_EVENTS.labels("near_duplicates", "hit").inc(len(skipped))
+        CACHE_EVENTS.labels("near_duplicates", "miss").inc(len(kept))
+        if skipped:
+            print(f"Skipped {len(skipped)} near-duplicate chunks")
+
+        # Kept chunks are an in-order subsequence of the input chunks
+        kept_positions: List[int] = []
+        for chunk, position in zip(chunks.tolist(), positions):
+            if len(kept_positions) < len(kept) and chunk == kept[len(kept_positions)]:
+                kept_positions.append(position)
+        return np.array(kept), kept_positions, skipped
+
+    def _forget_unindexed_chunks(self, chunks: np.ndarray, doc_id: str):
+        """Remove chunks that never made it into the database from the near-duplicate index."""
+        if self.duplicate_detector is None or len(chunks) == 0:
+            return
+        hashes = [self.text_processor.content_hash(c) for c in chunks]
+        orphans = self.duplicate_detector.release(doc_id, hashes)
+        try:
+            self._restore_chunks(orphans)
+        except Exception as e:
+            print(f"Error restoring {len(orphans)} chunks skipped as near-duplicates: {str(e)}")
+
+    def _restore_chunks(self, orphans: List[Dict[str, Any]]):
+        """
+        Store skipped chunks whose near-duplicate left the index (see
+        NearDuplicateDetector.release). They are filtered again, so chunks that
+        match another stored chunk stay skipped.
+
+        Args:
+            orphans: Dictionaries with doc_id, position, text and metadata
+        """
+        by_document: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for orphan in orphans:
+            by_document[orphan["doc_id"]].append(orphan)
+
+        for doc_id, records in by_document.items():
+            metadata = records[0].get("metadata") or None
+            chunks, positions, _ = self._filter_near_duplicates(
+                np.array([r["text"] for r in records]), [r["position"] for r in records], doc_id, metadata
+            )
+            if len(chunks) == 0:
+                continue
+            print(f"Restoring {len(chunks)} chunks of document {doc_id} skipped as near-duplicates")
+            try:
+                embeddings = self.embedding_manager.create_embeddings(chunks.tolist())
+                self.embedding_manager.build_search_index(
+                    chunks.tolist(), embeddings, doc_id=doc_id, positions=positions, check_duplicates=False,
+                    metadata=metadata
+                )
+            except Exception:
+                self._forget_unindexed_chunks(chunks, doc_id)
+                raise
+
+    def process_and_index_text(
+        self,
+        text: str,
+        doc_id: Optional[str] = None,
+        metadata: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
         """
         Process text and build search index.
         
         Args:
             text: Text to process and index
+            doc_id: ID for the new document (generated if not given)
+            metadata: Document metadata stored with every chunk (title, field, url)
+
+        Returns:
+            Dictionary with the document ID and the number of chunks produced,
+            indexed, and skipped as near-duplicates
         """
+        doc_id = doc_id or uuid.uuid4().hex
+        chunks = np.array([])
         try:
             # Process text into chunks
             print("Step 1: Processing text into chunks")
-            chunks = self.text_processor.process_text(text)
+            all_chunks = self.text_processor.process_text(text)
+            chunks, positions, skipped = self._filter_near_duplicates(
+                all_chunks, list(range(len(all_chunks))), doc_id, metadata
+            )
+            stats = {
+                "doc_id": doc_id,
+                "chunks": len(all_chunks),
+                "indexed": len(chunks),
+                "near_duplicates_skipped": len(skipped)
+            }
+            if len(chunks) == 0:
+                print("All chunks are near-duplicates of each other, nothing to embed")
+                return stats
             
             # Create embeddings
             print(f"Step 2: Creating embeddings for {len(chunks)} text chunks")
@@ -106,16 +265,149 @@ class SemanticSearchInterface:
             
             # Build search index
             print(f"Step 3: Building search index")
-            self.embedding_manager.build_search_index(chunks, embeddings)
+            self.embedding_manager.build_search_index(
+                chunks.tolist(), embeddings, doc_id=doc_id, positions=positions, metadata=metadata
+            )
             
             print(f"Successfully processed and indexed text")
-            return True
+            return stats
         except Exception as e:
             print(f"Error in process_and_index_text: {str(e)}")
+            # Chunks that never made it into the database must not block a retry
+            self._forget_unindexed_chunks(chunks, doc_id)
             import traceback
             traceback.print_exc()
             raise Exception(f"Failed to process and index text: {str(e)}")
         
+    def update_document(
+        self,
+        doc_id: str,
+        text: str,
+        metadata: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Re-index a document incrementally. The new chunk hashes are diffed
+        against the stored ones: only changed chunks are embedded, moved
+        chunks get their position updated, and stale chunks are deleted in batch.
+        A changed chunk that is a near-duplicate of a stale chunk keeps the stale
+        chunk in its place. Unknown document IDs are indexed as new documents.
+
+        Args:
+            doc_id: ID of the document to update
+            text: New full text of the document
+            metadata: New document metadata; also applied to unchanged chunks (kept if not given)
+
+        Returns:
+            Dictionary with the document ID and the number of chunks that were
+            unchanged, embedded, moved, deleted, and skipped as near-duplicates
+        """
+        chunks = np.array([])
+        try:
+            all_chunks = self.text_processor.process_text(text)
+            hashes = [self.text_processor.content_hash(c) for c in all_chunks]
+
+            # Match new chunks to stored chunks with the same content
+            stored_by_hash = defaultdict(list)
+            for stored_chunk in self.embedding_manager.get_document_chunks(doc_id):
+                stored_by_hash[stored_chunk["content_hash"]].append(stored_chunk)
+
+            changed_positions = []
+            moved = {}
+            retained_ids = []
+            retained_hashes = set()
+
+            def retain(stored_chunk: Dict[str, Any], position: int):
+                retained_ids.append(stored_chunk["id"])
+                retained_hashes.add(stored_chunk["content_hash"])
+                if stored_chunk["chunk_index"] != position:
+                    moved[stored_chunk["id"]] = position
+
+            for position, chunk_hash in enumerate(hashes):
+                if stored_by_hash.get(chunk_hash):
+                    retain(stored_by_hash[chunk_hash].pop(), position)
+                else:
+                    changed_positions.append(position)
+            unchanged = len(all_chunks) - len(changed_positions)
+
+            reused = 0
+            if self.duplicate_detector is not None:
+                # Chunks skipped in the old version are not stored, so they are filtered again below
+                self.duplicate_detector.forget_skipped(doc_id)
+                # An edited chunk close to one of the stale chunks keeps that chunk in its place
+                still_changed = []
+                for position in changed_positions:
+                    match = self.duplicate_detector.find_duplicate(all_chunks[position])
+                    if match is not None and stored_by_hash.get(match):
+                        retain(stored_by_hash[match].pop(), position)
+                        reused += 1
+                    else:
+                        still_changed.append(position)
+                changed_positions = still_changed
+            stale = [c for matches in stored_by_hash.values() for c in matches]
+
+            chunks, positions, skipped = self._filter_near_duplicates(
+                all_chunks[changed_positions], changed_positions, doc_id, metadata
+            )
+            print(f"Updating document {doc_id}: {unchanged} unchanged, "
+                  f"{len(chunks)} to embed, {len(stale)} stale")
+
+            # Add new chunks before deleting stale ones, so the document never disappears
+            if len(chunks) > 0:
+                embeddings = self.embedding_manager.create_embeddings(chunks.tolist())
+                self.embedding_manager.build_search_index(
+                    chunks.tolist(), embeddings, doc_id=doc_id, positions=positions, check_duplicates=False,
+                    metadata=metadata
+                )
+            if metadata:
+                # Unchanged chunks keep their vectors but take the new metadata
+                updates: Dict[str, Dict[str, Any]] = {
+                    object_id: dict(metadata) for object_id in retained_ids
+                }
+                for object_id, position in moved.items():
+                    updates[object_id]["chunk_index"] = position
+                self.embedding_manager.update_chunk_properties(updates)
+            else:
+                self.embedding_manager.update_chunk_positions(moved)
+            if self.duplicate_detector is not None:
+                # Chunks of other documents skipped in favour of a stale chunk are stored before it goes
+                released = {c["content_hash"] for c in stale} - retained_hashes
+                self._restore_chunks(self.duplicate_detector.release(doc_id, sorted(released)))
+            deleted = self.embedding_manager.delete_objects([c["id"] for c in stale])
+
+            return {
+                "doc_id": doc_id,
+                "chunks": len(all_chunks),
+                "unchanged": unchanged,
+                "indexed": len(chunks),
+                "moved": len(moved),
+                "deleted": deleted,
+                "near_duplicates_skipped": len(skipped) + reused
+            }
+        except Exception as e:
+            print(f"Error in update_document: {str(e)}")
+            self._forget_unindexed_chunks(chunks, doc_id)
+            import traceback
+            traceback.print_exc()
+            raise Exception(f"Failed to update document {doc_id}: {str(e)}")
+
+    def delete_document(self, doc_id: str) -> int:
+        """
+        Delete all chunks of a document.
+
+        Args:
+            doc_id: ID of the document to delete
+
+        Returns:
+            Number of chunks deleted
+        """
+        if self.duplicate_detector is not None:
+            stored_chunks = self.embedding_manager.get_document_chunks(doc_id)
+            self.duplicate_detector.forget_skipped(doc_id)
+            orphans = self.duplicate_detector.release(doc_id, [c["content_hash"] for c in stored_chunks])
+            # Chunks of other documents skipped in favour of this document's are stored before it goes
+            self._restore_chunks(orphans)
+        return self.embedding_manager.delete_document(doc_id)
+
     def get_database_contents(self, limit: int = 100) -> List[str]:
         """
         Get the first N texts stored in the database.
@@ -128,48 +420,204 @@ class SemanticSearchInterface:
         """
         return self.embedding_manager.get_all_texts(limit)
         
-    def save_index(self, filepath: str):
-        """Save the search index to disk."""
-        self.embedding_manager.save_index(filepath)
+    @property
+    def index_generation(self) -> int:
+        """Counter bumped by every write to the index (see EmbeddingManager.index_generation)."""
+        return self.embedding_manager.index_generation
+
+    def get_database_page(
+        self,
+        after: Optional[str] = None,
+        limit: int = 100,
+        properties: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get one page of stored chunks in cursor order (see EmbeddingManager.get_objects_page).
+
+        Args:
+            after: Id of the last chunk of the previous page, or None for the first page
+            limit: Maximum number of chunks
+            properties: Properties to return (default: all)
+
+        Returns:
+            List of dictionaries with id and the requested properties
+
+        Raises:
+            ValueError: A requested property does not exist, or `after` is not a chunk id
+        """
+        return self.embedding_manager.get_objects_page(after, limit, properties)
+
+    def iter_database_contents(
+        self,
+        properties: Optional[List[str]] = None,
+        after: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Walk all stored chunks after the given id, one page in memory at a time.
+
+        Args:
+            properties: Properties to return (default: all)
+            after: Start after this chunk id
+
+        Yields:
+            Dictionaries with id and the requested properties
+        """
+        return self.embedding_manager.iter_objects(properties, after)
+
+    def export_snapshot(self, path: str) -> Dict[str, Any]:
+        """
+        Write every stored chunk with its vector and metadata to a snapshot directory.
         
-    def load_index(self, filepath: str):
-        """Load the search index from disk."""
-        self.embedding_manager.load_index(filepath)
+        Args:
+            path: Snapshot directory to write
+
+        Returns:
+            The snapshot's manifest
+        """
+        return self.embedding_manager.export_snapshot(Path(path))
+
+    def import_snapshot(self, path: str, replace: bool = True) -> int:
+        """
+        Restore a snapshot without any embedding calls.
+
+        Args:
+            path: Snapshot directory written by export_snapshot
+            replace: Clear the database first; otherwise the chunks are added to it
+
+        Returns:
+            Number of imported chunks
+        """
+        detector = self.duplicate_detector
+        if detector is None:
+            return self.embedding_manager.import_snapshot(Path(path), replace=replace)
+
+        # Later uploads are checked against the restored chunks, registered as each block is imported.
+        # The detector is only cleared once the snapshot has been verified and the database cleared.
+        cleared = not replace
+
+        def register(ids: List[str], properties: List[Dict[str, Any]]):
+            nonlocal cleared
+            if not cleared:
+                detector.clear()
+                cleared = True
+            detector.register(
+                [p.get("text", "") for p in properties],
+                [p.get("doc_id", "") for p in properties],
+                save=False
+            )
+
+        try:
+            imported = self.embedding_manager.import_snapshot(Path(path), replace=replace, on_batch=register)
+            if not cleared:
+                # An empty snapshot
+                detector.clear()
+        finally:
+            detector.save()
+        return imported
         
     def clear_database(self):
         """Clear all contents from the vector database."""
         self.embedding_manager.clear_database()
+        if self.duplicate_detector is not None:
+            self.duplicate_detector.clear()
         
     def search(
         self,
         query: str,
         num_results: Optional[int] = None,
-        include_distances: bool = True
+        include_distances: bool = True,
+        filters: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
-        Perform semantic search.
+        Perform semantic search. Results are cached until the next index write,
+        and concurrent identical searches share one computation.
         
         Args:
             query: Search query
             num_results: Number of results to return
             include_distances: Whether to include distances in results
+            filters: Required property values, e.g. {"field": "Health"}; a list means any of its values
             
         Returns:
-            Dictionary containing search results and optionally distances
+            Dictionary containing search results and optionally distances; when the
+            request's latency budget ran out, also degraded and degraded_stages
+
+        Raises:
+            ValueError: If a filter names a property that cannot be filtered on
         """
         num_results = num_results or self.search_config.num_results
-        results, distances = self.embedding_manager.search(
-            query,
-            num_results=num_results,
-            include_distances=include_distances
-        )
+        filters = self._normalize_filters(filters)
+        with stage("clean"):
+            query = self.text_processor.clean_text(query)
         
-        response = {"results": results}
-        if distances is not None:
-            response["distances"] = distances
+        key = (query, num_results, include_distances, tuple(sorted(filters.items())))
+        # Read before searching: a write during the search leaves the entry stale
+        generation = self.embedding_manager.index_generation
+        cached = self.search_cache.get(key, generation)
+        if cached is not None:
+            return cached
+
+        deadline = current_deadline()
+
+        def run() -> Dict[str, Any]:
+            results, distances = self.embedding_manager.search(
+                query,
+                num_results=num_results,
+                include_distances=include_distances,
+                filters=filters
+            )
             
-        return response
+            response: Dict[str, Any] = {"results": results}
+            if distances is not None:
+                response["distances"] = distances
+            if deadline is not None and deadline.degraded:
+                # Partial results are neither cached nor shared with identical searches
+                response.update(deadline.as_dict())
+            elif results:
+                # Empty results usually mean the search failed; retry those next time
+                self.search_cache.put(key, generation, response)
+            return response
+
+        if self.search_flights is None:
+            return run()
+        try:
+            return self.search_flights.do(
+                key,
+                run,
+                deadline.remaining() if deadline is not None else None,
+                shareable=self._is_complete
+            )
+        except TimeoutError:
+            # Only raised for waiting callers with a deadline
+            if deadline is None:
+                raise
+            deadline.exceeded("singleflight_wait")
+            response: Dict[str, Any] = {"results": []}
+            if include_distances:
+                response["distances"] = []
+            return {**response, **deadline.as_dict()}
     
+    @staticmethod
+    def _is_complete(response: Dict[str, Any]) -> bool:
+        """Whether a response was built without running out of its request's latency budget."""
+        return not response.get("degraded")
+
+    @staticmethod
+    def _normalize_filters(filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Validate filters and bring them into a canonical, hashable form."""
+        normalized = {}
+        for name, value in (filters or {}).items():
+            if name not in FILTERABLE_PROPERTIES:
+                raise ValueError(f"Cannot filter on '{name}'. Filterable properties: {FILTERABLE_PROPERTIES}")
+            if isinstance(value, (list, tuple, set)):
+                values = tuple(sorted({str(v) for v in value}))
+                if not values:
+                    raise ValueError(f"Filter on '{name}' needs at least one value")
+                normalized[name] = values[0] if len(values) == 1 else values
+            else:
+                normalized[name] = str(value)
+        return normalized
+
     def ask_question(
         self,
         question: str,
@@ -177,7 +625,7 @@ class SemanticSearchInterface:
         num_generations: int = 1
     ) -> Dict[str, Any]:
         """
-        Ask a question and get generated answers.
+        Ask a question and get generated answers. Concurrent identical questions share one computation.
         
         Args:
             question: The question to answer
@@ -185,10 +633,32 @@ class SemanticSearchInterface:
             num_generations: Number of different answers to generate
             
         Returns:
-            Dictionary containing generated answers, source documents, and relevance scores
+            Dictionary containing generated answers, source documents, and relevance scores;
+            when the request's latency budget ran out, also degraded and degraded_stages
         """
-        return self.generative_search.search_and_generate(
-            question,
-            num_search_results=num_search_results,
-            num_generations=num_generations
-        ) 
\ No newline at end of file
+        with stage("clean"):
+            question = self.text_processor.clean_text(question)
+
+        def run() -> Dict[str, Any]:
+            return self.generative_search.search_and_generate(
+                question,
+                num_search_results=num_search_results,
+                num_generations=num_generations
+            )
+
+        if self.question_flights is None:
+            return run()
+        deadline = current_deadline()
+        try:
+            return self.question_flights.do(
+                (question, num_search_results, num_generations),
+                run,
+                deadline.remaining() if deadline is not None else None,
+                shareable=self._is_complete
+            )
+        except TimeoutError:
+            # Only raised for waiting callers with a deadline
+            if deadline is None:
+                raise
+            deadline.exceeded("singleflight_wait")
+            return {"answers": [], "documents": [], "relevance_scores": None, **deadline.as_dict()}
\ No newline at end of file
@@ -0,0 +1,392 @@
+import atexit
+import heapq
+import itertools
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.managers import BaseManager
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterable, List, Optional, Tuple, cast
+
+import numpy as np
+
+from .config import LOCAL_SHARD_ADDRESSES, LOCAL_SHARD_AUTHKEY, LOCAL_SHARDS
+from .local_vector_store import LocalVectorStore, autocut
+
+SHARD_SERVER_SCRIPT = (
+    Path(__file__).resolve().parent.parent / "scripts" / "serve_vector_shard.py"
+)
+
+
+class VectorShard(LocalVectorStore):
+    """LocalVectorStore held by a shard process, with the attributes a proxy cannot read."""
+
+    def stats(self) -> Dict[str, Any]:
+        return {"count": len(self), "dimension": self.dimension, "nbytes": self.nbytes}
+
+
+# The store of this process when it serves a shard
+_shard: Optional[VectorShard] = None
+
+
+def _init_shard(indexed_properties: List[str], dimension: Optional[int]):
+    global _shard
+    _shard = VectorShard(indexed_properties=indexed_properties, dimension=dimension)
+
+
+def _get_shard() -> VectorShard:
+    if _shard is None:
+        raise RuntimeError("This process does not serve a vector shard")
+    return _shard
+
+
+class ShardManager(BaseManager):
+    """Serves one VectorShard to clients over a socket (multiprocessing.managers)."""
+
+
+ShardManager.register(
+    "shard",
+    callable=_get_shard,
+    exposed=(
+        "add",
+        "query",
+        "find",
+        "objects",
+        "page",
+        "update",
+        "delete",
+        "clear",
+        "stats",
+    ),
+)
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """Split "host:port" into the tuple multiprocessing expects."""
+    host, _, port = address.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"Invalid shard address {address!r}, expected host:port")
+    return host, int(port)
+
+
+def serve_shard(
+    address: Tuple[str, int],
+    authkey: bytes,
+    indexed_properties: Iterable[str] = (),
+    dimension: Optional[int] = None,
+):
+    """
+    Serve a shard from this process until it is killed (see src/scripts/serve_vector_shard.py).
+
+    Args:
+        address: (host, port) to listen on
+        authkey: Secret clients must present
+        indexed_properties: Properties with an inverted index
+        dimension: Required vector length
+    """
+    _init_shard(list(indexed_properties), dimension)
+    server = ShardManager(address=address, authkey=authkey).get_server()
+    # The bound address, which differs from the requested one for port 0; spawn reads this line
+    host, port = cast(Tuple[str, int], server.address)
+    print(f"Serving vector shard on {host}:{port}", flush=True)
+    server.serve_forever()
+
+
+class ShardedVectorStore:
+    """
+    Vector store partitioned across shard processes, with the LocalVectorStore
+    interface so it can replace it behind EmbeddingManager.
+
+    Each shard is a LocalVectorStore in its own process, started here or
+    running on another host (src/scripts/serve_vector_shard.py), so scoring
+    runs on as many cores, and holds as many machines' memory, as there are
+    shards. Objects are spread round-robin over the shards. A query is sent to
+    all shards at once (scatter); each returns its own top-k, nearest first,
+    and the lists are k-way merged into the global top-k (gather). Distance
+    thresholds are applied per shard, autocut on the merged list. Updates and
+    deletes by id are broadcast, since ids do not say where an object lives.
+    """
+
+    # Concurrent calls per shard; each calling thread holds its own connection to every shard
+    CLIENT_THREADS_PER_SHARD = 4
+
+    def __init__(self, shards: List[Any], dimension: Optional[int] = None):
+        """
+        Use shards that are already running; see spawn and connect to get them.
+
+        Args:
+            shards: Shard proxies (or any objects with the VectorShard interface)
+            dimension: Required vector length
+        """
+        if not shards:
+            raise ValueError("A sharded store needs at least one shard")
+        self._shards = shards
+        self._processes: List[subprocess.Popen] = []
+        self._fixed_dimension = dimension
+        self._next_shard = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=len(shards) * self.CLIENT_THREADS_PER_SHARD,
+            thread_name_prefix="vector-shard",
+        )
+
+    @classmethod
+    def spawn(
+        cls,
+        num_shards: int,
+        indexed_properties: Iterable[str] = (),
+        dimension: Optional[int] = None,
+    ) -> "ShardedVectorStore":
+        """
+        Start num_shards shard servers on this host and connect to them.
+
+        The shards run src/scripts/serve_vector_shard.py as separate programs
+        rather than multiprocessing children, which would re-import the parent's
+        main module (and with it the search server) in every shard.
+
+        Args:
+            num_shards: Number of shard processes
+            indexed_properties: Properties with an inverted index in every shard
+            dimension: Required vector length
+        """
+        authkey = os.urandom(16).hex()
+        command = [
+            sys.executable,
+            str(SHARD_SERVER_SCRIPT),
+            "--port",
+            "0",
+            "--indexed-properties",
+            ",".join(indexed_properties),
+        ]
+        if dimension is not None:
+            command += ["--dimension", str(dimension)]
+        environment = dict(os.environ, LOCAL_SHARD_AUTHKEY=authkey)
+        processes, addresses = [], []
+        try:
+            for _ in range(num_shards):
+                process = subprocess.Popen(
+                    command, env=environment, stdout=subprocess.PIPE, text=True
+                )
+                processes.append(process)
+                # The server announces the port it bound: "Serving vector shard on host:port"
+                stdout = cast(IO[str], process.stdout)  # stdout=PIPE, text=True
+                line = stdout.readline()
+                stdout.close()
+                if not line.startswith("Serving vector shard on "):
+                    raise RuntimeError(
+                        f"Vector shard server failed to start (exit code {process.wait()})"
+                    )
+                addresses.append(line.rsplit(" ", 1)[-1].strip())
+            store = cls.connect(addresses, authkey, dimension)
+        except Exception:
+            for process in processes:
+                process.terminate()
+            raise
+        store._processes = processes
+        atexit.register(store.close)
+        print(f"Started {num_shards} local vector shards")
+        return store
+
+    @classmethod
+    def connect(
+        cls, addresses: List[str], authkey: str, dimension: Optional[int] = None
+    ) -> "ShardedVectorStore":
+        """
+        Use shard servers that are already running, on this or other hosts.
+
+        Args:
+            addresses: "host:port" of each shard server
+            authkey: Secret the shard servers were started with
+            dimension: Required vector length
+        """
+        if not authkey:
+            raise ValueError("Remote vector shards need LOCAL_SHARD_AUTHKEY")
+        shards = []
+        for address in addresses:
+            manager = ShardManager(
+                address=parse_address(address), authkey=authkey.encode("utf-8")
+            )
+            manager.connect()
+            # Registered at runtime by ShardManager.register
+            shards.append(manager.shard())  # type: ignore[attr-defined]
+        print(f"Connected to {len(shards)} vector shards")
+        return cls(shards, dimension=dimension)
+
+    def _scatter(self, call: Callable[[Any], Any]) -> List[Any]:
+        """Run call on every shard in parallel; results in shard order."""
+        if len(self._shards) == 1:
+            return [call(self._shards[0])]
+        return list(self._executor.map(call, self._shards))
+
+    def __len__(self) -> int:
+        return sum(
+            stats["count"] for stats in self._scatter(lambda shard: shard.stats())
+        )
+
+    @property
+    def num_shards(self) -> int:
+        return len(self._shards)
+
+    @property
+    def dimension(self) -> Optional[int]:
+        if self._fixed_dimension is not None:
+            return self._fixed_dimension
+        return next(
+            (
+                s["dimension"]
+                for s in self._scatter(lambda shard: shard.stats())
+                if s["dimension"]
+            ),
+            None,
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the vector matrices of all shards."""
+        return sum(
+            stats["nbytes"] for stats in self._scatter(lambda shard: shard.stats())
+        )
+
+    def add(
+        self,
+        objects: List[Dict[str, Any]],
+        vectors: List[List[float]],
+        ids: Optional[List[str]] = None,
+    ) -> List[str]:
+        """
+        Add objects with their vectors, spread round-robin over the shards.
+        Given ids are only checked for duplicates within the receiving shard.
+
+        Returns:
+            Ids of the added objects, in input order
+        """
+        if not objects:
+            return []
+        matrix = np.asarray(vectors, dtype=np.float32).reshape(len(objects), -1)
+        with self._lock:
+            first = self._next_shard
+            self._next_shard = (first + len(objects)) % len(self._shards)
+        assignment = (first + np.arange(len(objects))) % len(self._shards)
+        rows_per_shard = [
+            np.flatnonzero(assignment == index) for index in range(len(self._shards))
+        ]
+
+        def add_to(index: int) -> List[str]:
+            rows = rows_per_shard[index]
+            if len(rows) == 0:
+                return []
+            shard_ids = None if ids is None else [ids[row] for row in rows]
+            return self._shards[index].add(
+                [objects[row] for row in rows], matrix[rows], shard_ids
+            )
+
+        added = [""] * len(objects)
+        for rows, shard_ids in zip(
+            rows_per_shard, self._executor.map(add_to, range(len(self._shards)))
+        ):
+            # Every row goes to exactly one shard, so each slot is filled once
+            for row, object_id in zip(rows, shard_ids):
+                added[row] = object_id
+        return added
+
+    def query(
+        self,
+        vector: List[float],
+        limit: int,
+        max_distance: Optional[float] = None,
+        autocut_jumps: int = 0,
+        include_vectors: bool = False,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Find the nearest objects across all shards (see LocalVectorStore.query).
+
+        Returns:
+            List of dictionaries with id, properties, distance and optionally vector, nearest first
+        """
+        if limit <= 0:
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        per_shard = self._scatter(
+            lambda shard: shard.query(
+                query, limit, max_distance, 0, include_vectors, filters
+            )
+        )
+        # Every shard's list is sorted, so a k-way merge yields the global order
+        hits = list(
+            itertools.islice(
+                heapq.merge(*per_shard, key=lambda hit: hit["distance"]), limit
+            )
+        )
+        if autocut_jumps > 0:
+            hits = hits[: autocut([hit["distance"] for hit in hits], autocut_jumps)]
+        return hits
+
+    def find(
+        self, filters: Dict[str, Any], limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Find objects whose properties equal all given values (see LocalVectorStore.find)."""
+        found = itertools.chain.from_iterable(
+            self._scatter(lambda shard: shard.find(filters, limit))
+        )
+        return list(itertools.islice(found, limit))
+
+    def objects(self, limit: int) -> List[Dict[str, Any]]:
+        """Return up to `limit` stored objects with id and properties."""
+        return self.find({}, limit=limit)
+
+    def page(
+        self, after: Optional[str], limit: int, include_vectors: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Objects in id order after the given id, across all shards (see LocalVectorStore.page)."""
+        per_shard = self._scatter(
+            lambda shard: shard.page(after, limit, include_vectors)
+        )
+        return list(
+            itertools.islice(heapq.merge(*per_shard, key=lambda obj: obj["id"]), limit)
+        )
+
+    def update(self, object_id: str, properties: Dict[str, Any]):
+        """Merge properties into a stored object."""
+        self._scatter(lambda shard: shard.update(object_id, properties))
+
+    def delete(self, object_ids: List[str]) -> int:
+        """
+        Delete objects by id.
+
+        Returns:
+            Number of objects deleted
+        """
+        return sum(self._scatter(lambda shard: shard.delete(object_ids)))
+
+    def clear(self):
+        """Remove all objects."""
+        self._scatter(lambda shard: shard.clear())
+
+    def close(self):
+        """Stop the shard processes this store started."""
+        self._executor.shutdown(wait=False)
+        for process in self._processes:
+            process.terminate()
+        for process in self._processes:
+            process.wait()
+        self._processes = []
+
+
+def create_local_vector_store(
+    indexed_properties: Iterable[str] = (), dimension: Optional[int] = None
+):
+    """
+    Vector store of the local backend: shard servers at LOCAL_SHARD_ADDRESSES,
+    else LOCAL_SHARDS shard processes on this host, else a single in-process store.
+    """
+    indexed_properties = list(indexed_properties)
+    if LOCAL_SHARD_ADDRESSES:
+        return ShardedVectorStore.connect(
+            LOCAL_SHARD_ADDRESSES, LOCAL_SHARD_AUTHKEY, dimension
+        )
+    if LOCAL_SHARDS > 1:
+        return ShardedVectorStore.spawn(LOCAL_SHARDS, indexed_properties, dimension)
+    return LocalVectorStore(indexed_properties=indexed_properties, dimension=dimension)
@@ -0,0 +1,100 @@
+import copy
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from .metrics import CACHE_EVENTS
+from .timing import stage
+
+
+class _Call:
+    """One in-flight computation and its outcome."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent identical calls: while a call for a key is running,
+    later callers with the same key wait for it and share its result instead of
+    repeating the work. Nothing is kept once the call finishes, so this is not
+    a cache; it only collapses bursts of simultaneous requests.
+    """
+
+    def __init__(self, name: str):
+        """
+        Initialize the group.
+
+        Args:
+            name: Label used for the hit/miss metrics
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Any],
+        timeout: Optional[float] = None,
+        shareable: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """
+        Run fn for the key, or wait for the identical call already running.
+
+        Args:
+            key: Identity of the call; equal keys must produce equal results
+            fn: Computation to run when no identical call is in flight
+            timeout: Longest a waiting caller waits for the running call (None waits indefinitely)
+            shareable: Tells whether a result may be handed to waiting callers; those
+                that get a result it rejects (e.g. one cut short by the running caller's
+                deadline) run their own fn instead
+
+        Returns:
+            The result of fn (a private deep copy for callers that waited)
+
+        Raises:
+            TimeoutError: A waiting caller gave up after the timeout
+            Whatever fn raised, in the caller that ran it and in every caller that waited
+        """
+        with self._lock:
+            running = self._calls.get(key)
+            call = running or self._calls.setdefault(key, _Call())
+
+        if running is not None:
+            return self._wait(running, fn, timeout, shareable)
+
+        CACHE_EVENTS.labels(self.name, "miss").inc()
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def _wait(
+        self,
+        running: _Call,
+        fn: Callable[[], Any],
+        timeout: Optional[float],
+        shareable: Optional[Callable[[Any], bool]],
+    ) -> Any:
+        """Wait for the identical call already running and take its result (see do)."""
+        CACHE_EVENTS.labels(self.name, "hit").inc()
+        with stage("singleflight_wait"):
+            finished = running.done.wait(timeout)
+        if not finished:
+            raise TimeoutError("Timed out waiting for an identical request")
+        if running.error is not None:
+            raise running.error
+        if shareable is not None and not shareable(running.result):
+            CACHE_EVENTS.labels(self.name, "unshareable").inc()
+            return fn()
+        # Callers may modify their response, so they never share one object
+        return copy.deepcopy(running.result)
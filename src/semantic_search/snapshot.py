@@ -0,0 +1,307 @@
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import struct
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .config import SNAPSHOT_COMPRESSION_LEVEL
+
+SNAPSHOT_FORMAT = "semantic-search-snapshot"
+SNAPSHOT_VERSION = 1
+
+VECTORS_FILE = "vectors.npy"
+TABLE_FILE = "objects.jsonl.gz"
+MANIFEST_FILE = "manifest.json"
+
+# Vector rows hashed at a time when a snapshot is verified
+_VERIFY_ROWS = 4096
+
+# Width of the row count in the .npy header, so the header can be rewritten in place once the count is known
+_COUNT_WIDTH = 20
+
+
+def _npy_header(count: int, dimension: int) -> bytes:
+    """Header of a float32 .npy matrix (format 1.0) with a fixed-width row count."""
+    header = "{'descr': '<f4', 'fortran_order': False, 'shape': (%s, %d), }" % (
+        str(count).rjust(_COUNT_WIDTH),
+        dimension,
+    )
+    # Magic, version and length take 10 bytes; numpy pads the header so the data is 64-byte aligned
+    header += " " * (-(10 + len(header) + 1) % 64) + "\n"
+    return (
+        b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header.encode("latin1")
+    )
+
+
+class SnapshotWriter:
+    """
+    Writes a snapshot of a collection: a directory holding
+
+    - vectors.npy: float32 matrix with one row per object, loadable with np.load (or memory-mapped)
+    - objects.jsonl.gz: gzip-compressed blocks of columns (ids and properties) aligned with
+      the vector rows, one JSON line per block
+    - manifest.json: format version, object count, dimension, sha256 checksums of the vector
+      rows and the uncompressed table, and the source's details
+
+    Objects are streamed in blocks, so memory use does not depend on the collection size.
+    The directory is written under a temporary name and only replaces the target once complete.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        dimension: int,
+        metadata: Optional[Dict[str, Any]] = None,
+        compresslevel: int = SNAPSHOT_COMPRESSION_LEVEL,
+    ):
+        """
+        Start a snapshot.
+
+        Args:
+            path: Snapshot directory to create (replaced if it exists)
+            dimension: Vector length of every object
+            metadata: Extra manifest entries, e.g. the embedding provider
+            compresslevel: gzip level of the text and metadata table
+        """
+        self.path = Path(path)
+        self.dimension = dimension
+        self.count = 0
+        self.blocks = 0
+        self.manifest: Optional[Dict[str, Any]] = None
+        self._metadata = dict(metadata or {})
+        self._digests = {VECTORS_FILE: hashlib.sha256(), TABLE_FILE: hashlib.sha256()}
+        self._tmp_path = self.path.with_name(self.path.name + ".tmp")
+        shutil.rmtree(self._tmp_path, ignore_errors=True)
+        self._tmp_path.mkdir(parents=True)
+        self._vectors = open(self._tmp_path / VECTORS_FILE, "wb")
+        self._vectors.write(_npy_header(0, dimension))
+        self._table = gzip.open(
+            self._tmp_path / TABLE_FILE,
+            "wt",
+            compresslevel=compresslevel,
+            encoding="utf-8",
+        )
+
+    def __enter__(self) -> "SnapshotWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, objects: List[Dict[str, Any]]):
+        """
+        Append a block of objects.
+
+        Args:
+            objects: Dictionaries with id, properties and vector
+
+        Raises:
+            ValueError: A vector does not have the snapshot's dimension
+        """
+        if not objects:
+            return
+        vectors = np.asarray([obj["vector"] for obj in objects], dtype="<f4")
+        if vectors.ndim != 2 or vectors.shape[1] != self.dimension:
+            raise ValueError(
+                f"Snapshot vectors must have {self.dimension} dimensions, got shape {vectors.shape}"
+            )
+        columns: Dict[str, List[Any]] = {}
+        for obj in objects:
+            columns.update(
+                (name, []) for name in obj["properties"] if name not in columns
+            )
+        for obj in objects:
+            for name, values in columns.items():
+                values.append(obj["properties"].get(name))
+        line = (
+            json.dumps({"ids": [obj["id"] for obj in objects], "properties": columns})
+            + "\n"
+        )
+        rows = vectors.tobytes()
+        self._table.write(line)
+        self._vectors.write(rows)
+        self._digests[TABLE_FILE].update(line.encode("utf-8"))
+        self._digests[VECTORS_FILE].update(rows)
+        self.count += len(objects)
+        self.blocks += 1
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Finish the snapshot and move it into place.
+
+        Returns:
+            The manifest
+        """
+        self._table.close()
+        self._vectors.seek(0)
+        self._vectors.write(_npy_header(self.count, self.dimension))
+        self._vectors.flush()
+        os.fsync(self._vectors.fileno())
+        self._vectors.close()
+
+        self.manifest = {
+            "format": SNAPSHOT_FORMAT,
+            "version": SNAPSHOT_VERSION,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "count": self.count,
+            "dimension": self.dimension,
+            "blocks": self.blocks,
+            "bytes": {
+                name: (self._tmp_path / name).stat().st_size
+                for name in (VECTORS_FILE, TABLE_FILE)
+            },
+            "sha256": {
+                name: digest.hexdigest() for name, digest in self._digests.items()
+            },
+            **self._metadata,
+        }
+        with open(self._tmp_path / MANIFEST_FILE, "w") as f:
+            json.dump(self.manifest, f, indent=2)
+
+        if self.path.exists():
+            shutil.rmtree(self.path)
+        os.replace(self._tmp_path, self.path)
+        return self.manifest
+
+    def abort(self):
+        """Discard a partly written snapshot."""
+        self._table.close()
+        self._vectors.close()
+        shutil.rmtree(self._tmp_path, ignore_errors=True)
+
+
+class SnapshotReader:
+    """Reads a snapshot written by SnapshotWriter, block by block."""
+
+    def __init__(self, path: Path):
+        """
+        Open a snapshot and validate its manifest.
+
+        Args:
+            path: Snapshot directory
+
+        Raises:
+            ValueError: The directory is not a snapshot of a supported version, or its files do not match
+        """
+        self.path = Path(path)
+        manifest_path = self.path / MANIFEST_FILE
+        if not manifest_path.exists():
+            raise ValueError(f"{self.path} is not a snapshot (no {MANIFEST_FILE})")
+        with open(manifest_path) as f:
+            self.manifest = json.load(f)
+        if (
+            self.manifest.get("format") != SNAPSHOT_FORMAT
+            or self.manifest.get("version") != SNAPSHOT_VERSION
+        ):
+            raise ValueError(f"Unsupported snapshot format in {self.path}")
+        self.count = self.manifest["count"]
+        self.dimension = self.manifest["dimension"]
+
+        # Memory-mapped, so blocks are read from disk as they are imported
+        self._vectors = np.load(self.path / VECTORS_FILE, mmap_mode="r")
+        if self._vectors.shape != (self.count, self.dimension):
+            raise ValueError(
+                f"Snapshot vectors have shape {self._vectors.shape}, manifest says {(self.count, self.dimension)}"
+            )
+
+    def verify(self):
+        """
+        Read the whole snapshot and check it against the manifest, without keeping it in memory.
+
+        Raises:
+            ValueError: The table cannot be read, its blocks or objects do not match the manifest,
+                or a checksum differs
+        """
+        digest = hashlib.sha256()
+        count = blocks = 0
+        try:
+            with gzip.open(self.path / TABLE_FILE, "rt", encoding="utf-8") as table:
+                for line in table:
+                    digest.update(line.encode("utf-8"))
+                    block = json.loads(line)
+                    ids = block["ids"]
+                    if any(
+                        len(values) != len(ids)
+                        for values in block["properties"].values()
+                    ):
+                        raise ValueError(
+                            f"Snapshot block {blocks} has columns of different lengths"
+                        )
+                    count += len(ids)
+                    blocks += 1
+        except (
+            OSError,
+            EOFError,
+            zlib.error,
+            json.JSONDecodeError,
+            KeyError,
+            TypeError,
+            AttributeError,
+        ) as e:
+            raise ValueError(
+                f"Snapshot table in {self.path} cannot be read: {e}"
+            ) from e
+        if count != self.count or blocks != self.manifest.get("blocks", blocks):
+            raise ValueError(
+                f"Snapshot table has {count} objects in {blocks} blocks, "
+                f"manifest says {self.count} in {self.manifest.get('blocks')}"
+            )
+
+        # Snapshots written before checksums were added are only checked for their counts
+        checksums = self.manifest.get("sha256", {})
+        if TABLE_FILE in checksums and digest.hexdigest() != checksums[TABLE_FILE]:
+            raise ValueError(
+                f"Snapshot table checksum in {self.path} does not match the manifest"
+            )
+        if VECTORS_FILE in checksums:
+            digest = hashlib.sha256()
+            for start in range(0, self.count, _VERIFY_ROWS):
+                digest.update(
+                    np.ascontiguousarray(
+                        self._vectors[start : start + _VERIFY_ROWS]
+                    ).tobytes()
+                )
+            if digest.hexdigest() != checksums[VECTORS_FILE]:
+                raise ValueError(
+                    f"Snapshot vectors checksum in {self.path} does not match the manifest"
+                )
+
+    def batches(self) -> Iterator[Tuple[List[str], List[Dict[str, Any]], np.ndarray]]:
+        """
+        Yield the stored objects block by block.
+
+        Yields:
+            Tuples of (ids, property dictionaries, float32 vector matrix)
+        """
+        offset = 0
+        with gzip.open(self.path / TABLE_FILE, "rt", encoding="utf-8") as table:
+            for line in table:
+                block = json.loads(line)
+                ids = block["ids"]
+                columns = block["properties"]
+                properties = [
+                    {
+                        name: values[row]
+                        for name, values in columns.items()
+                        if values[row] is not None
+                    }
+                    for row in range(len(ids))
+                ]
+                yield ids, properties, np.array(
+                    self._vectors[offset : offset + len(ids)]
+                )
+                offset += len(ids)
+        if offset != self.count:
+            raise ValueError(
+                f"Snapshot table has {offset} objects, manifest says {self.count}"
+            )
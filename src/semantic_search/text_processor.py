@@ -1,3 +1,4 @@
+import hashlib
 from typing import List
 import numpy as np
 from .config import CHUNK_SEPARATOR, DEFAULT_CHUNK_SIZE, DEFAULT_CHUNK_OVERLAP
@@ -64,6 +65,19 @@ class TextProcessor:
             
         return chunks
     
+    @staticmethod
+    def content_hash(text: str) -> str:
+        """
+        Hash chunk content so unchanged chunks can be recognized across uploads.
+
+        Args:
+            text: Chunk text
+
+        Returns:
+            Hex digest identifying the exact chunk content
+        """
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
     def clean_text(self, text: str) -> str:
         """
         Clean text by removing extra whitespace and normalizing line endings.
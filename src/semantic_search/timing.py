@@ -0,0 +1,78 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from .metrics import STAGE_LATENCY
+
+_current_timings: ContextVar[Optional["RequestTimings"]] = ContextVar(
+    "request_timings", default=None
+)
+
+
+class RequestTimings:
+    """Per-request stage durations, collected for Server-Timing headers and debug payloads."""
+
+    def __init__(self):
+        self._durations: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._token = None
+
+    def __enter__(self) -> "RequestTimings":
+        self._token = _current_timings.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _current_timings.reset(self._token)
+        self._token = None
+
+    def add(self, stage_name: str, seconds: float):
+        """Add a duration to a stage; repeated stages (e.g. several generations) accumulate."""
+        with self._lock:
+            self._durations[stage_name] = self._durations.get(stage_name, 0.0) + seconds
+
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self._start) * 1000
+
+    def as_dict(self) -> Dict[str, float]:
+        """Stage durations in milliseconds, in the order the stages first ran."""
+        with self._lock:
+            timings = {
+                name: round(seconds * 1000, 3)
+                for name, seconds in self._durations.items()
+            }
+        timings["total"] = round(self.total_ms(), 3)
+        return timings
+
+    def server_timing_header(self) -> str:
+        """Render the timings as a Server-Timing header value."""
+        return ", ".join(
+            f"{name};dur={duration}" for name, duration in self.as_dict().items()
+        )
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """Timings of the request being served in this context, if any."""
+    return _current_timings.get()
+
+
+@contextmanager
+def stage(stage_name: str):
+    """
+    Time a pipeline stage into the stage latency histogram and, when called
+    while serving a request, into that request's timings.
+
+    Args:
+        stage_name: Name of the stage, used as metric label and Server-Timing name
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        STAGE_LATENCY.labels(stage_name).observe(duration)
+        timings = _current_timings.get()
+        if timings is not None:
+            timings.add(stage_name, duration)
@@ -4,6 +4,7 @@ import weaviate
 from semantic_search.config import (
     OPENAI_API_KEY,
     WEAVIATE_URL,
+    VectorIndexConfig,
 )
 import openai
 
@@ -23,6 +24,7 @@ def setup_weaviate_schema():
             "class": "Articles",
             "description": "A collection of articles with embeddings for semantic search",
             "vectorizer": "none",  # Don't use a vectorizer, we'll provide vectors directly
+            "vectorIndexConfig": VectorIndexConfig().to_weaviate(),
             "properties": [
                 {
                     "name": "title",
@@ -0,0 +1,21 @@
+"""Shared test setup: import the package from src and use the in-process backends."""
+
+import os
+import sys
+from pathlib import Path
+
+# Tests import the package as src.semantic_search, like the scripts; the search
+# server imports it as semantic_search, so src is on the path as well
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root / "src"))
+sys.path.insert(0, str(project_root))
+
+# Settings are read when the package is imported, so they must be in place first
+os.environ["VECTOR_BACKEND"] = "local"
+os.environ["EMBEDDING_PROVIDER"] = "hashing"
+os.environ["LOCAL_SHARDS"] = "1"
+os.environ["LOCAL_SHARD_ADDRESSES"] = ""
+os.environ["SEED_SNAPSHOT_PATH"] = ""
+os.environ["LOAD_SAMPLE_DATA"] = "false"
+os.environ["SEARCH_CERTAINTY"] = "0"
+os.environ["SEARCH_AUTOCUT"] = "0"
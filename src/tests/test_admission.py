@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.responses import StreamingResponse
+
+from src.search_server import main
+from src.semantic_search.admission import AdmissionPool, AdmissionRejected
+
+
+def test_requests_within_capacity_run_at_once():
+    async def scenario():
+        pool = AdmissionPool("test", max_concurrency=2, max_queue=0)
+        await pool.acquire()
+        await pool.acquire()
+        assert pool.active == 2
+        pool.release(0.5)
+        pool.release(0.5)
+        assert pool.active == 0
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_is_rejected_with_429():
+    async def scenario():
+        pool = AdmissionPool("test", max_concurrency=1, max_queue=0)
+        await pool.acquire()
+        with pytest.raises(AdmissionRejected) as rejected:
+            await pool.acquire()
+        assert rejected.value.status_code == 429
+        assert rejected.value.retry_after >= 1
+
+    asyncio.run(scenario())
+
+
+def test_queued_request_gets_the_next_free_slot():
+    async def scenario():
+        pool = AdmissionPool("test", max_concurrency=1, max_queue=1)
+        await pool.acquire()
+        queued = asyncio.ensure_future(pool.acquire())
+        await asyncio.sleep(0)
+        assert pool.waiting == 1
+        pool.release(0.1)
+        await queued
+        assert pool.active == 1 and pool.waiting == 0
+
+    asyncio.run(scenario())
+
+
+def test_queue_timeout_is_rejected_with_503():
+    async def scenario():
+        pool = AdmissionPool("test", max_concurrency=1, max_queue=1, queue_timeout=0.01)
+        await pool.acquire()
+        with pytest.raises(AdmissionRejected) as rejected:
+            await pool.acquire()
+        assert rejected.value.status_code == 503
+        assert pool.waiting == 0
+
+    asyncio.run(scenario())
+
+
+def test_disabled_pool_never_limits():
+    async def scenario():
+        pool = AdmissionPool("test", max_concurrency=0, max_queue=0)
+        for _ in range(10):
+            await pool.acquire()
+        assert pool.active == 0
+
+    asyncio.run(scenario())
+
+
+def test_retry_after_grows_with_the_queue():
+    pool = AdmissionPool("test", max_concurrency=2, max_queue=10)
+    pool._service_time = 4.0  # pylint: disable=protected-access
+    assert pool.retry_after() == 2
+    pool.waiting = 5
+    assert pool.retry_after() == 12
+
+
+def test_slot_is_held_until_the_streamed_body_is_sent():
+    events = []
+
+    async def body():
+        for chunk in (b"one\n", b"two\n"):
+            yield chunk
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message["body"]:
+            events.append(message["body"])
+
+    async def receive():
+        await asyncio.sleep(3600)
+
+    response = main._ReleaseAfterSend(  # pylint: disable=protected-access
+        StreamingResponse(body()), lambda: events.append("released")
+    )
+    assert response.status_code == 200
+    asyncio.run(
+        response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+    )
+    assert events == [b"one\n", b"two\n", "released"]
+
+
+def test_streaming_endpoint_goes_through_its_pool(monkeypatch):
+    pool = AdmissionPool("retrieval", max_concurrency=1, max_queue=0)
+    released = []
+    release = pool.release
+    monkeypatch.setattr(pool, "release", lambda t: (released.append(t), release(t)))
+    monkeypatch.setitem(main.admission_pools, "retrieval", pool)
+
+    with TestClient(main.app) as client:
+        response = client.get("/database-contents", params={"format": "ndjson"})
+    assert response.status_code == 200
+    assert len(released) == 1
+    assert pool.active == 0
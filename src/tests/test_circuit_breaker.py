@@ -0,0 +1,116 @@
+import openai
+import pytest
+
+from src.semantic_search import circuit_breaker as breakers
+from src.semantic_search.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+)
+from src.semantic_search.embedding_providers import is_openai_outage
+
+
+class Clock:
+    """Stand-in for time.monotonic that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(name="clock")
+def fixture_clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(breakers.time, "monotonic", clock)
+    return clock
+
+
+def fail():
+    raise ConnectionError("dependency down")
+
+
+def trip(breaker: CircuitBreaker):
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+
+
+def test_consecutive_failures_open_the_circuit(clock):
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=10)
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    assert breaker.call(lambda: "ok") == "ok"
+    trip(breaker)
+    assert breaker.state == OPEN
+
+    calls = []
+    with pytest.raises(CircuitOpenError) as rejected:
+        breaker.call(lambda: calls.append("called"))
+    assert calls == []
+    assert rejected.value.retry_in == pytest.approx(10)
+    assert breaker.snapshot()["last_error"] == "dependency down"
+
+
+def test_successful_probe_closes_the_circuit(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=10)
+    trip(breaker)
+    clock.now += 10
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == CLOSED
+    assert breaker.snapshot() == {"state": CLOSED, "consecutive_failures": 0}
+
+
+def test_failed_probe_restarts_the_open_period(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=10)
+    trip(breaker)
+    clock.now += 10
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    assert breaker.state == OPEN
+    clock.now += 5
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "ok")
+
+
+def test_only_one_probe_at_a_time(clock):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=10)
+    trip(breaker)
+    clock.now += 10
+
+    def probe():
+        assert breaker.state == HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.call(lambda: "second")
+        return "first"
+
+    assert breaker.call(probe) == "first"
+
+
+def test_errors_that_are_not_failures_leave_the_circuit_closed():
+    breaker = CircuitBreaker("test", failure_threshold=1)
+
+    def reject_input():
+        raise ValueError("bad input")
+
+    with pytest.raises(ValueError):
+        breaker.call(reject_input, lambda error: not isinstance(error, ValueError))
+    assert breaker.state == CLOSED
+
+
+def test_zero_threshold_disables_the_breaker():
+    breaker = CircuitBreaker("test", failure_threshold=0)
+    for _ in range(5):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+    assert breaker.state == CLOSED
+
+
+def test_openai_outages_exclude_caller_errors():
+    assert is_openai_outage(openai.error.APIConnectionError("down"))
+    assert not is_openai_outage(openai.error.InvalidRequestError("bad", "input"))
+    assert is_openai_outage(openai.error.Timeout("slow"))
+    assert not is_openai_outage(openai.error.Timeout("slow"), timeout=0.5)
@@ -0,0 +1,55 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from src.search_server import main
+from src.semantic_search.embedding_manager import EmbeddingManager
+
+
+@pytest.fixture(name="client")
+def fixture_client():
+    with TestClient(main.app) as client:
+        yield client
+
+
+def test_etag_follows_the_index_generation(client):
+    first = client.get("/database-contents", params={"limit": 5})
+    etag = first.headers["ETag"]
+    assert client.get("/database-contents", params={"limit": 5}).headers["ETag"] == etag
+    assert client.get("/database-contents", params={"limit": 6}).headers["ETag"] != etag
+
+    main.search_interface.process_and_index_text("A chunk written after the first read")
+    changed = client.get(
+        "/database-contents", params={"limit": 5}, headers={"If-None-Match": etag}
+    )
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_revalidation_does_not_read_the_index(client, monkeypatch):
+    etag = client.get("/database-contents").headers["ETag"]
+
+    def unreachable(*args, **kwargs):
+        raise AssertionError("the page should not be read")
+
+    monkeypatch.setattr(main.search_interface, "get_database_page", unreachable)
+    response = client.get("/database-contents", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+
+def test_invalid_cursor_is_a_client_error(client, monkeypatch):
+    def reject(after, limit, properties):
+        raise ValueError(f"Invalid cursor {after!r}: expected an object id")
+
+    monkeypatch.setattr(main.search_interface, "get_database_page", reject)
+    response = client.get("/database-contents", params={"after": "nope"})
+    assert response.status_code == 400
+    assert "Invalid cursor" in response.json()["detail"]
+
+
+def test_weaviate_cursor_must_be_an_object_id():
+    manager = EmbeddingManager()
+    manager.local_store = None
+    manager.client = object()
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        manager.get_objects_page(after="not-a-uuid")
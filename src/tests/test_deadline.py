@@ -0,0 +1,60 @@
+import time
+
+import pytest
+
+from src.semantic_search.deadline import (
+    Deadline,
+    DeadlineExceeded,
+    check_deadline,
+    current_deadline,
+    stage_timeout,
+)
+from src.semantic_search.embedding_manager import EmbeddingManager
+
+STAGES = ["embed_query", "vector_search", "generation"]
+
+
+def test_stages_get_their_share_of_the_remaining_budget(monkeypatch):
+    monkeypatch.setattr(time, "perf_counter", lambda: 100.0)
+    deadline = Deadline(10.0, STAGES, start=100.0)
+    assert deadline.stage_timeout("embed_query") == pytest.approx(1.5)
+    assert deadline.stage_timeout("vector_search") == pytest.approx(10 * 0.15 / 0.85)
+    assert deadline.stage_timeout("generation") == pytest.approx(10.0)
+    assert deadline.stage_timeout("unplanned") == pytest.approx(10.0)
+
+
+def test_deadline_is_current_only_inside_its_context():
+    assert current_deadline() is None
+    assert stage_timeout("generation") is None
+    check_deadline("generation")
+    with Deadline(5.0, STAGES) as deadline:
+        assert current_deadline() is deadline
+        assert 0 < stage_timeout("generation") <= 5.0
+    assert current_deadline() is None
+
+
+def test_expired_stages_are_recorded_once():
+    with Deadline(0.0, STAGES) as deadline:
+        assert deadline.expired()
+        for _ in range(2):
+            with pytest.raises(DeadlineExceeded) as exceeded:
+                check_deadline("embed_query")
+        assert exceeded.value.stage_name == "embed_query"
+    assert deadline.as_dict() == {
+        "degraded": True,
+        "degraded_stages": ["embed_query"],
+    }
+
+
+def test_fresh_deadline_is_not_degraded():
+    deadline = Deadline(5.0, STAGES)
+    assert not deadline.expired()
+    assert deadline.as_dict() == {"degraded": False, "degraded_stages": []}
+
+
+def test_search_returns_nothing_once_the_budget_is_spent():
+    manager = EmbeddingManager()
+    manager.build_search_index(["solar power"], manager.create_embeddings(["solar"]))
+    with Deadline(0.0, STAGES) as deadline:
+        assert manager.search("solar", num_results=1) == ([], [])
+    assert deadline.degraded_stages == ["embed_query"]
@@ -0,0 +1,130 @@
+import threading
+import time
+from typing import List, Optional
+
+import pytest
+
+from src.semantic_search.embedding_batcher import EmbeddingBatcher
+from src.semantic_search.embedding_providers import HashingEmbeddingProvider
+
+
+class RecordingProvider(HashingEmbeddingProvider):
+    """Hashing provider that records the batches it is asked to embed."""
+
+    def __init__(self, fail: bool = False, delay: float = 0.0):
+        super().__init__(dimension=16)
+        self.fail = fail
+        self.delay = delay
+        self.calls: List[List[str]] = []
+        self.timeouts: List[Optional[float]] = []
+
+    def embed(
+        self, texts: List[str], timeout: Optional[float] = None
+    ) -> List[List[float]]:
+        self.calls.append(list(texts))
+        self.timeouts.append(timeout)
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("model unavailable")
+        return super().embed(texts, timeout)
+
+
+def embed_concurrently(batcher: EmbeddingBatcher, texts: List[str]) -> dict:
+    results: dict = {}
+    start = threading.Barrier(len(texts))
+
+    def worker(text: str) -> None:
+        start.wait()
+        try:
+            results[text] = batcher.embed(text, timeout=5)
+        except Exception as e:  # pylint: disable=broad-except
+            results[text] = e
+
+    threads = [threading.Thread(target=worker, args=(text,)) for text in texts]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_disabled_batcher_embeds_each_text_alone():
+    provider = RecordingProvider()
+    batcher = EmbeddingBatcher(provider, window_ms=0)
+    assert not batcher.enabled
+    assert batcher.embed("alpha") == provider.embed(["alpha"])[0]
+    assert provider.calls[0] == ["alpha"]
+
+
+def test_concurrent_texts_share_one_call():
+    provider = RecordingProvider()
+    texts = ["alpha", "beta", "gamma", "delta"]
+    batcher = EmbeddingBatcher(provider, window_ms=2000, max_batch_size=len(texts))
+    results = embed_concurrently(batcher, texts)
+
+    assert len(provider.calls) == 1
+    assert sorted(provider.calls[0]) == sorted(texts)
+    expected = HashingEmbeddingProvider(dimension=16).embed(texts)
+    for text, embedding in zip(texts, expected):
+        assert results[text] == embedding
+
+
+def test_full_batch_flushes_and_next_text_opens_a_new_one():
+    provider = RecordingProvider()
+    batcher = EmbeddingBatcher(provider, window_ms=50, max_batch_size=2)
+    embed_concurrently(batcher, ["alpha", "beta"])
+    batcher.embed("gamma")
+    assert [len(call) for call in provider.calls] == [2, 1]
+
+
+def test_provider_error_reaches_every_caller():
+    provider = RecordingProvider(fail=True)
+    batcher = EmbeddingBatcher(provider, window_ms=2000, max_batch_size=3)
+    results = embed_concurrently(batcher, ["alpha", "beta", "gamma"])
+    assert len(provider.calls) == 1
+    for result in results.values():
+        assert isinstance(result, RuntimeError)
+
+
+def test_batch_size_is_capped_by_the_provider():
+    provider = RecordingProvider()
+    provider.batch_size = 4
+    batcher = EmbeddingBatcher(provider, window_ms=10, max_batch_size=64)
+    assert batcher.max_batch_size == 4
+
+
+def test_follower_times_out_while_leader_waits():
+    provider = RecordingProvider()
+    batcher = EmbeddingBatcher(provider, window_ms=1000, max_batch_size=8)
+    leader = threading.Thread(target=batcher.embed, args=("alpha",))
+    leader.start()
+    while batcher._open is None:  # pylint: disable=protected-access
+        pass
+    with pytest.raises(TimeoutError):
+        batcher.embed("beta", timeout=0.01)
+    leader.join()
+
+
+def test_call_gets_the_latest_deadline_of_the_batch():
+    provider = RecordingProvider(delay=0.2)
+    batcher = EmbeddingBatcher(provider, window_ms=1000, max_batch_size=2)
+    outcome: dict = {}
+
+    def lead() -> None:
+        try:
+            batcher.embed("alpha", timeout=0.05)
+        except TimeoutError as e:
+            outcome["leader"] = e
+
+    leader = threading.Thread(target=lead)
+    leader.start()
+    while batcher._open is None:  # pylint: disable=protected-access
+        pass
+    # Fills the batch, so the leader calls the provider at once
+    embedding = batcher.embed("beta")
+    leader.join()
+
+    assert isinstance(outcome["leader"], TimeoutError)
+    assert embedding == HashingEmbeddingProvider(dimension=16).embed(["beta"])[0]
+    assert provider.calls == [["alpha", "beta"]]
+    assert provider.timeouts == [None]
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from src.semantic_search import embedding_providers
+from src.semantic_search.embedding_manager import EmbeddingManager
+from src.semantic_search.embedding_providers import (
+    HashingEmbeddingProvider,
+    OpenAIEmbeddingProvider,
+)
+from src.semantic_search.local_vector_store import LocalVectorStore
+
+
+def openai_provider(model: str, dimension: int) -> OpenAIEmbeddingProvider:
+    return OpenAIEmbeddingProvider(
+        model=model, dimension=dimension, api_key="test", api_base=""
+    )
+
+
+def test_openai_requests_shortened_vectors_only_when_needed(monkeypatch):
+    requests = []
+
+    def create(**kwargs):
+        requests.append(kwargs)
+        size = kwargs.get("dimensions", 1536)
+        return {"data": [{"embedding": [0.0] * size} for _ in kwargs["input"]]}
+
+    monkeypatch.setattr(embedding_providers.openai.Embedding, "create", create)
+    assert len(openai_provider("text-embedding-3-small", 512).embed(["a"])[0]) == 512
+    openai_provider("text-embedding-3-small", 1536).embed(["a"])
+    assert requests[0]["dimensions"] == 512
+    assert "dimensions" not in requests[1]
+
+
+def test_openai_rejects_unsupported_dimensions():
+    with pytest.raises(ValueError, match="at most"):
+        openai_provider("text-embedding-3-small", 2048)
+    with pytest.raises(ValueError, match="shortened"):
+        openai_provider("text-embedding-ada-002", 512)
+    assert openai_provider("text-embedding-3-large", 256).dimension == 256
+
+
+def test_store_with_a_fixed_dimension_rejects_other_lengths():
+    store = LocalVectorStore(dimension=3)
+    assert store.dimension == 3
+    with pytest.raises(ValueError):
+        store.add([{"text": "short"}], [[1.0, 0.0]])
+    store.add([{"text": "fits"}], [[1.0, 0.0, 0.0]])
+    assert len(store) == 1
+
+
+def test_index_rejects_embeddings_of_the_wrong_length():
+    manager = EmbeddingManager(embedding_provider=HashingEmbeddingProvider(8))
+    with pytest.raises(ValueError, match="9 dimensions"):
+        manager.build_search_index(["text"], [list(np.ones(9))])
+    manager.build_search_index(["text"], manager.create_embeddings(["text"]))
+    assert manager.local_store is not None and len(manager.local_store) == 1
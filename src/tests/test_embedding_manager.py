@@ -0,0 +1,189 @@
+import threading
+import time
+
+import pytest
+
+from src.semantic_search.deadline import Deadline
+from src.semantic_search.embedding_manager import EmbeddingManager
+from src.semantic_search.embedding_providers import HashingEmbeddingProvider
+
+
+class RecordingWeaviate:
+    """Weaviate client stand-in that records the calls made on it."""
+
+    def __init__(self, classes=None):
+        self.calls = []
+        self.classes = classes if classes is not None else []
+        self.schema = self
+        self.batch = self
+        self.data_object = self
+        self.property = self
+
+    # client.schema
+    def get(self, class_name=None, with_vector=False, limit=None):
+        if limit is not None:
+            # client.data_object.get: a sample vector of the provider's length
+            return {"objects": [{"vector": [0.0] * 8}]}
+        return {"classes": self.classes}
+
+    def exists(self, class_name):
+        return any(c["class"] == class_name for c in self.classes)
+
+    def create_class(self, definition):
+        self.calls.append(("create_class", definition["class"]))
+        self.classes = [definition]
+
+    def delete_class(self, class_name):
+        self.calls.append(("delete_class", class_name))
+        self.classes = []
+
+    def create(self, class_name, prop):
+        # client.schema.property.create
+        self.calls.append(("create_property", prop["name"]))
+
+    # client.batch and client.data_object
+    def delete_objects(self, class_name, where):
+        self.calls.append(("delete_objects", class_name))
+        return {"results": {"successful": 1}}
+
+    def update(self, data_object, class_name, uuid):
+        self.calls.append(("update", uuid))
+
+
+class SlowQuery:
+    """client.query stand-in whose GraphQL queries take a while."""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def __getattr__(self, name):
+        # get, with_near_vector, with_limit, ... build the query
+        return lambda *args, **kwargs: self
+
+    def do(self):
+        time.sleep(self.delay)
+        return {"data": {"Get": {"Articles": [{"text": "found", "_additional": {}}]}}}
+
+
+@pytest.fixture(name="manager")
+def fixture_manager():
+    manager = EmbeddingManager(embedding_provider=HashingEmbeddingProvider(8))
+    manager.local_store = None
+    manager.client = RecordingWeaviate([EmbeddingManager.articles_class_definition()])
+    return manager
+
+
+@pytest.mark.parametrize(
+    "write",
+    [
+        lambda manager: manager.delete_objects(["id-1"]),
+        lambda manager: manager.delete_document("doc"),
+        lambda manager: manager.update_chunk_positions({"id-1": 2}),
+    ],
+)
+def test_writes_wait_while_the_class_is_recreated(manager, write):
+    done = threading.Event()
+    writer = threading.Thread(target=lambda: (write(manager), done.set()))
+    with manager._schema_lock:  # pylint: disable=protected-access
+        writer.start()
+        # Holding the lock stands in for clear_database between drop and create
+        assert not done.wait(0.1)
+        assert manager.client.calls == []
+    writer.join(5)
+    assert done.is_set()
+    assert manager.client.calls
+
+
+def test_clear_database_recreates_the_class(manager):
+    manager.clear_database()
+    assert manager.client.calls == [
+        ("delete_class", "Articles"),
+        ("create_class", "Articles"),
+    ]
+
+
+def test_missing_properties_of_an_old_class_are_added(manager):
+    manager.client.classes = [
+        {"class": "Articles", "properties": [{"name": "text", "dataType": ["text"]}]}
+    ]
+    assert manager.dependency_status()["ready"]
+    added = [name for call, name in manager.client.calls if call == "create_property"]
+    expected = [
+        prop["name"]
+        for prop in EmbeddingManager.articles_class_definition()["properties"]
+    ]
+    assert added == expected[1:]
+    assert {"doc_id", "chunk_index", "content_hash"} <= set(added)
+
+
+def test_class_is_not_ready_when_a_property_cannot_be_added(manager, monkeypatch):
+    manager.client.classes = [{"class": "Articles", "properties": []}]
+
+    def refuse(class_name, prop):
+        raise RuntimeError(f"cannot add {prop['name']}")
+
+    monkeypatch.setattr(manager.client, "create", refuse)
+    status = manager.dependency_status()
+    assert not status["ready"]
+    assert "cannot add text" in status["error"]
+
+
+def test_slow_vector_query_is_abandoned_when_the_budget_runs_out(manager):
+    manager.client.query = SlowQuery(0.5)
+    start = time.perf_counter()
+    with Deadline(0.1, ["embed_query", "vector_search"]) as deadline:
+        texts, _ = manager.search("query", certainty=0, autocut=0, rerank=False)
+    assert time.perf_counter() - start < 0.4
+    assert texts == []
+    assert deadline.degraded_stages == ["vector_search"]
+
+    # Without a deadline the query runs to the end
+    texts, _ = manager.search("query", certainty=0, autocut=0, rerank=False)
+    assert texts == ["found"]
+
+
+class RecordingQuery(SlowQuery):
+    """SlowQuery that records when each query finishes."""
+
+    def __init__(self, delay, calls):
+        super().__init__(delay)
+        self.calls = calls
+
+    def do(self):
+        result = super().do()
+        self.calls.append(("query", "Articles"))
+        return result
+
+
+def test_searches_wait_while_the_class_is_recreated(manager):
+    manager.client.query = RecordingQuery(0, manager.client.calls)
+    results = []
+    searcher = threading.Thread(
+        target=lambda: results.append(
+            manager.search("query", certainty=0, autocut=0, rerank=False)[0]
+        )
+    )
+    with manager._swapping_class():  # pylint: disable=protected-access
+        searcher.start()
+        # Stands in for clear_database between drop and create
+        searcher.join(0.1)
+        assert searcher.is_alive()
+        assert manager.client.calls == []
+    searcher.join(5)
+    assert results == [["found"]]
+
+
+def test_clear_database_waits_for_running_queries(manager):
+    manager.client.query = RecordingQuery(0.2, manager.client.calls)
+    searcher = threading.Thread(
+        target=lambda: manager.search("query", certainty=0, autocut=0, rerank=False)
+    )
+    searcher.start()
+    time.sleep(0.05)
+    manager.clear_database()
+    searcher.join(5)
+    assert manager.client.calls == [
+        ("query", "Articles"),
+        ("delete_class", "Articles"),
+        ("create_class", "Articles"),
+    ]
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from src.semantic_search.embedding_providers import (
+    EMBEDDING_PROVIDERS,
+    HashingEmbeddingProvider,
+    LocalModelEmbeddingProvider,
+    OpenAIEmbeddingProvider,
+    create_embedding_provider,
+    hash_embedding,
+    truncate_embedding,
+)
+
+
+def test_hash_embedding_is_deterministic_and_normalized():
+    vector = hash_embedding("Vector search with hashed features", 64)
+    assert vector.shape == (64,)
+    assert np.linalg.norm(vector) == pytest.approx(1.0)
+    assert np.array_equal(
+        vector, hash_embedding("vector SEARCH with hashed features", 64)
+    )
+    assert not hash_embedding("", 64).any()
+
+
+def test_texts_sharing_words_are_closer():
+    query = hash_embedding("solar energy storage", 256)
+    related = hash_embedding("storage of solar energy in batteries", 256)
+    unrelated = hash_embedding("the structure of DNA", 256)
+    assert query @ related > query @ unrelated
+
+
+def test_hashing_provider_embeds_a_batch():
+    provider = create_embedding_provider("hashing", dimension=32)
+    assert isinstance(provider, HashingEmbeddingProvider)
+    assert provider.dimension == 32
+    embeddings = provider.embed(["one", "two", "one"])
+    assert len(embeddings) == 3
+    assert embeddings[0] == embeddings[2] != embeddings[1]
+
+
+def test_registry_names_match_classes():
+    assert EMBEDDING_PROVIDERS["hashing"] is HashingEmbeddingProvider
+    assert EMBEDDING_PROVIDERS["local"] is LocalModelEmbeddingProvider
+    assert EMBEDDING_PROVIDERS["openai"] is OpenAIEmbeddingProvider
+    for name, provider_class in EMBEDDING_PROVIDERS.items():
+        assert provider_class.name == name
+
+
+def test_openai_provider_is_created_by_name():
+    provider = create_embedding_provider("openai", api_key="test", api_base="")
+    assert isinstance(provider, OpenAIEmbeddingProvider)
+    assert provider.dimension > 0
+
+
+def test_unknown_provider_is_rejected():
+    with pytest.raises(ValueError, match="not supported"):
+        create_embedding_provider("missing")
+
+
+def test_local_provider_needs_a_model_path():
+    with pytest.raises(ValueError):
+        LocalModelEmbeddingProvider(model_path="")
+
+
+def test_truncate_embedding_renormalizes_rows():
+    vectors = np.array([[3.0, 4.0, 12.0], [0.0, 0.0, 1.0]])
+    truncated = truncate_embedding(vectors, 2)
+    assert truncated.dtype == np.float32
+    assert truncated.tolist() == [[pytest.approx(0.6), pytest.approx(0.8)], [0.0, 0.0]]
@@ -0,0 +1,139 @@
+import numpy as np
+import pytest
+
+from src.semantic_search.local_vector_store import LocalVectorStore, autocut
+
+
+@pytest.fixture(name="store")
+def fixture_store():
+    store = LocalVectorStore(initial_capacity=2)
+    store.add(
+        [{"text": "x axis"}, {"text": "y axis"}, {"text": "diagonal"}],
+        [[1.0, 0.0], [0.0, 2.0], [1.0, 1.0]],
+    )
+    return store
+
+
+def texts(hits):
+    return [hit["properties"]["text"] for hit in hits]
+
+
+def test_query_ranks_by_cosine_distance(store):
+    hits = store.query([1.0, 0.1], limit=3)
+    assert texts(hits) == ["x axis", "diagonal", "y axis"]
+    assert hits[0]["distance"] == pytest.approx(1 - 1 / np.sqrt(1.01), abs=1e-6)
+    assert [hit["distance"] for hit in hits] == sorted(hit["distance"] for hit in hits)
+
+
+def test_query_limit_and_max_distance(store):
+    assert texts(store.query([1.0, 0.0], limit=1)) == ["x axis"]
+    assert texts(store.query([1.0, 0.0], limit=3, max_distance=0.5)) == [
+        "x axis",
+        "diagonal",
+    ]
+    assert store.query([1.0, 0.0], limit=0) == []
+
+
+def test_grows_beyond_initial_capacity(store):
+    assert len(store) == 3
+    assert store.dimension == 2
+    assert store.nbytes >= 3 * 2 * 4
+
+
+def test_rejects_vectors_of_another_dimension(store):
+    with pytest.raises(ValueError):
+        store.add([{"text": "3d"}], [[1.0, 0.0, 0.0]])
+    with pytest.raises(ValueError):
+        store.query([1.0, 0.0, 0.0], limit=1)
+
+
+def test_delete_keeps_remaining_objects_searchable(store):
+    ids = {hit["properties"]["text"]: hit["id"] for hit in store.query([1, 1], 3)}
+    assert store.delete([ids["x axis"], "missing"]) == 1
+    assert len(store) == 2
+    assert texts(store.query([1.0, 0.0], limit=3)) == ["diagonal", "y axis"]
+
+
+def test_update_and_clear(store):
+    object_id = store.query([0.0, 1.0], limit=1)[0]["id"]
+    store.update(object_id, {"title": "vertical"})
+    assert store.find({"title": "vertical"})[0]["properties"] == {
+        "text": "y axis",
+        "title": "vertical",
+    }
+    store.clear()
+    assert len(store) == 0
+    assert store.query([1.0, 0.0], limit=3) == []
+
+
+def test_autocut_stops_at_the_first_jump():
+    distances = [0.1, 0.11, 0.12, 0.5, 0.51]
+    assert autocut(distances, 1) == 3
+    assert autocut(distances, 2) == 5
+    assert autocut(distances, 0) == 5
+
+
+def test_autocut_keeps_evenly_spaced_or_short_lists():
+    assert autocut([0.1, 0.2, 0.3, 0.4], 1) == 4
+    assert autocut([0.2, 0.2, 0.2], 1) == 3
+    assert autocut([0.3], 1) == 1
+    assert autocut([], 1) == 0
+
+
+def test_query_applies_autocut():
+    store = LocalVectorStore()
+    store.add(
+        [{"text": "near"}, {"text": "close"}, {"text": "far"}, {"text": "farther"}],
+        [[1.0, 0.0], [1.0, 0.05], [0.0, 1.0], [-0.05, 1.0]],
+    )
+    assert texts(store.query([1.0, 0.0], limit=4)) == [
+        "near",
+        "close",
+        "far",
+        "farther",
+    ]
+    assert texts(store.query([1.0, 0.0], limit=4, autocut_jumps=1)) == [
+        "near",
+        "close",
+    ]
+
+
+@pytest.fixture(name="fields")
+def fixture_fields():
+    store = LocalVectorStore(indexed_properties=["field"])
+    store.add(
+        [
+            {"text": "vaccines", "field": "Health", "year": "2020"},
+            {"text": "qubits", "field": "Science", "year": "2021"},
+            {"text": "sleep", "field": "Health", "year": "2021"},
+            {"text": "stocks", "field": "Finance", "year": "2020"},
+        ],
+        [[1.0, 0.0], [0.9, 0.1], [0.5, 0.5], [0.0, 1.0]],
+    )
+    return store
+
+
+def test_query_prefilters_on_indexed_and_scanned_properties(fields):
+    assert texts(fields.query([1.0, 0.0], 4, filters={"field": "Health"})) == [
+        "vaccines",
+        "sleep",
+    ]
+    assert texts(
+        fields.query([1.0, 0.0], 4, filters={"field": "Health", "year": "2021"})
+    ) == ["sleep"]
+    assert fields.query([1.0, 0.0], 4, filters={"field": "Sports"}) == []
+
+
+def test_filter_lists_are_alternatives(fields):
+    hits = fields.query([0.0, 1.0], 4, filters={"field": ["Finance", "Science"]})
+    assert texts(hits) == ["stocks", "qubits"]
+    assert sorted(texts(fields.find({"year": ["2020"]}))) == ["stocks", "vaccines"]
+
+
+def test_index_follows_updates_and_deletes(fields):
+    qubits = fields.find({"text": "qubits"})[0]["id"]
+    fields.update(qubits, {"field": "Health"})
+    assert len(fields.find({"field": "Health"})) == 3
+    assert fields.find({"field": "Science"}) == []
+    fields.delete([qubits])
+    assert sorted(texts(fields.find({"field": "Health"}))) == ["sleep", "vaccines"]
@@ -0,0 +1,77 @@
+import pytest
+
+from src.semantic_search.metrics import (
+    TOKENS,
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    record_token_usage,
+)
+
+
+@pytest.fixture(name="registry")
+def fixture_registry():
+    return MetricsRegistry()
+
+
+def test_counter_renders_labelled_samples(registry):
+    counter = Counter("requests_total", "Requests", ["endpoint"], registry=registry)
+    counter.labels("/search").inc()
+    counter.labels("/search").inc(2)
+    counter.labels('/a"b').inc()
+    assert registry.render() == (
+        "# HELP requests_total Requests\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{endpoint="/a\\"b"} 1.0\n'
+        'requests_total{endpoint="/search"} 3.0\n'
+    )
+
+
+def test_counter_rejects_decrements_and_wrong_labels(registry):
+    counter = Counter("events_total", "Events", ["kind"], registry=registry)
+    with pytest.raises(ValueError):
+        counter.labels("a").inc(-1)
+    with pytest.raises(ValueError):
+        counter.labels("a", "b")
+
+
+def test_gauge_tracks_in_progress_blocks(registry):
+    gauge = Gauge("in_flight", "In flight", registry=registry)
+    with gauge.track_inprogress():
+        assert gauge.labels().get() == 1
+    gauge.set(5)
+    gauge.dec(2)
+    assert gauge.labels().get() == 3
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    histogram = Histogram(
+        "latency_seconds", "Latency", buckets=(0.1, 1.0), registry=registry
+    )
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value)
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1.0"} 3' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in lines
+    assert "latency_seconds_sum 4.05" in lines
+    assert "latency_seconds_count 4" in lines
+
+
+def test_metric_names_are_unique_per_registry(registry):
+    Counter("dup_total", "First", registry=registry)
+    with pytest.raises(ValueError):
+        Gauge("dup_total", "Second", registry=registry)
+    assert isinstance(registry.get("dup_total"), Counter)
+
+
+def test_record_token_usage_counts_prompt_and_completion_tokens():
+    prompt = TOKENS.labels("test-model", "prompt")
+    completion = TOKENS.labels("test-model", "completion")
+    before = prompt.get(), completion.get()
+    record_token_usage(
+        "test-model", {"usage": {"prompt_tokens": 7, "completion_tokens": 3}}
+    )
+    record_token_usage("test-model", {"data": []})
+    assert (prompt.get() - before[0], completion.get() - before[1]) == (7, 3)
@@ -0,0 +1,96 @@
+import threading
+import time
+
+import pytest
+
+from src.semantic_search.model_scheduler import ModelCallScheduler
+
+
+def occupy(scheduler: ModelCallScheduler, call_class: str, release: threading.Event):
+    """Start a call that holds a slot until released."""
+    started = threading.Event()
+
+    def call():
+        started.set()
+        release.wait(5)
+
+    thread = threading.Thread(target=scheduler.run, args=(call_class, call))
+    thread.start()
+    assert started.wait(5)
+    return thread
+
+
+def enqueue(scheduler: ModelCallScheduler, call_class: str, order: list):
+    thread = threading.Thread(
+        target=scheduler.run, args=(call_class, lambda: order.append(call_class))
+    )
+    thread.start()
+    return thread
+
+
+def wait_for_waiting(scheduler: ModelCallScheduler, count: int):
+    deadline = time.monotonic() + 5
+    while len(scheduler._waiting) < count:  # pylint: disable=protected-access
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_higher_priority_calls_overtake_queued_bulk_calls():
+    scheduler = ModelCallScheduler(max_concurrency=1, quotas={})
+    release = threading.Event()
+    holder = occupy(scheduler, "bulk", release)
+    order = []
+    waiting = [enqueue(scheduler, "bulk", order)]
+    wait_for_waiting(scheduler, 1)
+    waiting.append(enqueue(scheduler, "generation", order))
+    wait_for_waiting(scheduler, 2)
+    waiting.append(enqueue(scheduler, "query", order))
+    wait_for_waiting(scheduler, 3)
+
+    release.set()
+    for thread in [holder] + waiting:
+        thread.join(5)
+    assert order == ["query", "generation", "bulk"]
+
+
+def test_class_quota_lets_other_classes_through():
+    scheduler = ModelCallScheduler(max_concurrency=2, quotas={"bulk": 1})
+    release = threading.Event()
+    holder = occupy(scheduler, "bulk", release)
+    order = []
+    bulk = enqueue(scheduler, "bulk", order)
+    wait_for_waiting(scheduler, 1)
+    assert scheduler.run("query", lambda: "answered") == "answered"
+    assert order == []
+
+    release.set()
+    holder.join(5)
+    bulk.join(5)
+    assert order == ["bulk"]
+
+
+def test_waiting_for_a_slot_times_out():
+    scheduler = ModelCallScheduler(max_concurrency=1, quotas={})
+    release = threading.Event()
+    holder = occupy(scheduler, "generation", release)
+    with pytest.raises(TimeoutError):
+        scheduler.run("query", lambda: None, timeout=0.01)
+    assert scheduler._waiting == []  # pylint: disable=protected-access
+    release.set()
+    holder.join(5)
+
+
+def test_errors_free_the_slot():
+    scheduler = ModelCallScheduler(max_concurrency=1, quotas={})
+
+    def fail():
+        raise RuntimeError("model error")
+
+    with pytest.raises(RuntimeError):
+        scheduler.run("query", fail)
+    assert scheduler.run("query", lambda: "ok", timeout=0.1) == "ok"
+
+
+def test_zero_concurrency_disables_scheduling():
+    scheduler = ModelCallScheduler(max_concurrency=0)
+    assert scheduler.run("bulk", lambda: 42) == 42
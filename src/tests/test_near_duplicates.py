@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from src.semantic_search.near_duplicates import NearDuplicateDetector
+from src.semantic_search.text_processor import TextProcessor
+
+ARTICLE = (
+    "Cloud computing delivers computing services over the internet, including servers, "
+    "storage, databases, networking, software and analytics, to offer faster innovation, "
+    "flexible resources and economies of scale."
+)
+EDITED = ARTICLE.replace("faster innovation", "rapid innovation")
+UNRELATED = (
+    "The structure of DNA is a double helix formed by two strands of nucleotides held "
+    "together by hydrogen bonds between complementary base pairs."
+)
+
+
+@pytest.fixture(name="detector")
+def fixture_detector():
+    return NearDuplicateDetector(index_file=None)
+
+
+def test_signature_is_deterministic_and_similar_for_small_edits(detector):
+    assert np.array_equal(detector.signature(ARTICLE), detector.signature(ARTICLE))
+    assert (
+        np.mean(detector.signature(ARTICLE) == detector.signature(EDITED))
+        >= detector.threshold
+    )
+    assert (
+        np.mean(detector.signature(ARTICLE) == detector.signature(UNRELATED))
+        < detector.threshold
+    )
+
+
+def test_filter_chunks_skips_exact_and_near_duplicates(detector):
+    kept, skipped = detector.filter_chunks(
+        [ARTICLE, UNRELATED, ARTICLE, EDITED], doc_id="doc"
+    )
+    assert kept == [ARTICLE, UNRELATED]
+    assert skipped == [ARTICLE, EDITED]
+    assert detector.find_duplicate(EDITED) == TextProcessor.content_hash(ARTICLE)
+    assert [r["position"] for r in detector.skipped_chunks("doc")] == [2, 3]
+
+
+def test_chunks_of_other_documents_are_duplicates(detector):
+    detector.filter_chunks([ARTICLE], doc_id="a")
+    kept, skipped = detector.filter_chunks(
+        [EDITED], doc_id="b", positions=[4], metadata={"title": "B"}
+    )
+    assert kept == []
+    assert skipped == [EDITED]
+    assert detector.skipped_chunks("b") == [
+        {
+            "position": 4,
+            "text": EDITED,
+            "metadata": {"title": "B"},
+            "match": TextProcessor.content_hash(ARTICLE),
+        }
+    ]
+
+
+def test_release_of_last_holder_returns_dependent_chunks(detector):
+    article_hash = TextProcessor.content_hash(ARTICLE)
+    detector.filter_chunks([ARTICLE], doc_id="a")
+    detector.register([ARTICLE], ["c"])
+    detector.filter_chunks([EDITED], doc_id="b")
+    assert detector.holders(article_hash) == {"a", "c"}
+
+    # Another document still stores the chunk
+    assert detector.release("a", [article_hash]) == []
+    assert detector.find_duplicate(EDITED) == article_hash
+
+    orphans = detector.release("c", [article_hash])
+    assert orphans == [{"doc_id": "b", "position": 0, "text": EDITED, "metadata": {}}]
+    assert len(detector) == 0
+    assert detector.skipped_chunks("b") == []
+    assert detector.filter_chunks([EDITED], doc_id="b") == ([EDITED], [])
+
+
+def test_forgotten_skipped_chunks_are_not_returned(detector):
+    detector.filter_chunks([ARTICLE], doc_id="a")
+    detector.filter_chunks([EDITED], doc_id="b")
+    detector.forget_skipped("b")
+    assert detector.release("a", [TextProcessor.content_hash(ARTICLE)]) == []
+
+
+def test_index_is_persisted(tmp_path):
+    index_file = tmp_path / "index.npz"
+    detector = NearDuplicateDetector(index_file=index_file)
+    detector.filter_chunks([ARTICLE], doc_id="a")
+    detector.filter_chunks([EDITED], doc_id="b")
+
+    reloaded = NearDuplicateDetector(index_file=index_file)
+    assert len(reloaded) == 1
+    assert reloaded.find_duplicate(EDITED) is not None
+    assert reloaded.holders(TextProcessor.content_hash(ARTICLE)) == {"a"}
+    assert [
+        o["doc_id"]
+        for o in reloaded.release("a", [TextProcessor.content_hash(ARTICLE)])
+    ] == ["b"]
+    reloaded.clear()
+    assert not index_file.exists()
+
+
+def test_bands_must_divide_permutations():
+    with pytest.raises(ValueError):
+        NearDuplicateDetector(num_perm=128, bands=7, index_file=None)
@@ -0,0 +1,50 @@
+import threading
+
+import pytest
+
+from src.semantic_search.profiler import ProfilerBusyError, SamplingProfiler
+
+
+def spin(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+@pytest.fixture(name="busy_thread")
+def fixture_busy_thread():
+    stop = threading.Event()
+    thread = threading.Thread(target=spin, args=(stop,))
+    thread.start()
+    yield thread
+    stop.set()
+    thread.join()
+
+
+def test_profile_finds_the_busy_function(busy_thread):
+    profiler = SamplingProfiler(max_seconds=5, min_interval_ms=1)
+    result = profiler.profile(0.2, interval_ms=5)
+    assert busy_thread.is_alive()
+    assert result["samples"] > 1
+    assert any(spot["function"].startswith("spin ") for spot in result["hotspots"])
+    for line in result["collapsed"].splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert stack and int(count) > 0
+
+
+def test_duration_and_interval_are_capped():
+    profiler = SamplingProfiler(max_seconds=0.05, min_interval_ms=20)
+    result = profiler.profile(10, interval_ms=1)
+    assert result["interval_ms"] == 20
+    assert result["duration_s"] < 1
+
+
+def test_only_one_profile_runs_at_a_time():
+    profiler = SamplingProfiler(max_seconds=5, min_interval_ms=1)
+    started = threading.Thread(target=profiler.profile, args=(0.3,))
+    started.start()
+    while not profiler.running:
+        pass
+    with pytest.raises(ProfilerBusyError):
+        profiler.profile(0.1)
+    started.join()
+    assert not profiler.running
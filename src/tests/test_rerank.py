@@ -0,0 +1,36 @@
+import pytest
+
+from src.semantic_search.rerank import mmr_rerank
+
+QUERY = [1.0, 0.0]
+# Two near-identical candidates close to the query and one different one
+CANDIDATES = [[1.0, 0.1], [1.0, 0.11], [0.6, 0.8]]
+
+
+def test_pure_relevance_keeps_similarity_order():
+    selected, similarities = mmr_rerank(QUERY, CANDIDATES, 3, lambda_=1.0)
+    assert selected == [0, 1, 2]
+    assert similarities == sorted(similarities, reverse=True)
+    assert similarities[2] == pytest.approx(0.6)
+
+
+def test_diversity_skips_redundant_candidates():
+    selected, similarities = mmr_rerank(QUERY, CANDIDATES, 2, lambda_=0.3)
+    assert selected == [0, 2]
+    assert similarities[1] == pytest.approx(0.6)
+
+
+def test_k_is_capped_by_the_candidates():
+    selected, _ = mmr_rerank(QUERY, CANDIDATES, 10)
+    assert sorted(selected) == [0, 1, 2]
+
+
+def test_empty_input_or_k():
+    assert mmr_rerank(QUERY, [], 3) == ([], [])
+    assert mmr_rerank(QUERY, CANDIDATES, 0) == ([], [])
+
+
+def test_zero_vectors_do_not_break_scoring():
+    selected, similarities = mmr_rerank([0.0, 0.0], [[0.0, 0.0], [1.0, 0.0]], 2)
+    assert sorted(selected) == [0, 1]
+    assert similarities == [0.0, 0.0]
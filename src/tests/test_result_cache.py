@@ -0,0 +1,61 @@
+from unittest import mock
+
+from src.semantic_search.result_cache import ResultCache
+
+
+def test_entries_are_served_at_their_generation():
+    cache = ResultCache("test", max_entries=4, ttl_seconds=0)
+    cache.put("query", 1, {"results": ["a"]})
+    assert cache.get("query", 1) == {"results": ["a"]}
+    assert cache.get("missing", 1) is None
+
+
+def test_a_newer_generation_invalidates_entries():
+    cache = ResultCache("test", max_entries=4, ttl_seconds=0)
+    cache.put("query", 1, {"results": ["a"]})
+    assert cache.get("query", 2) is None
+    assert len(cache) == 0
+
+
+def test_callers_get_private_copies():
+    cache = ResultCache("test", max_entries=4, ttl_seconds=0)
+    result = {"results": ["a"]}
+    cache.put("query", 1, result)
+    result["results"].append("b")
+    served = cache.get("query", 1)
+    served["results"].append("c")
+    assert cache.get("query", 1) == {"results": ["a"]}
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResultCache("test", max_entries=2, ttl_seconds=0)
+    cache.put("first", 1, 1)
+    cache.put("second", 1, 2)
+    cache.get("first", 1)
+    cache.put("third", 1, 3)
+    assert cache.get("second", 1) is None
+    assert cache.get("first", 1) == 1
+    assert cache.get("third", 1) == 3
+
+
+def test_entries_expire_after_the_ttl():
+    cache = ResultCache("test", max_entries=2, ttl_seconds=10)
+    with mock.patch("time.monotonic", return_value=100.0):
+        cache.put("query", 1, "result")
+    with mock.patch("time.monotonic", return_value=105.0):
+        assert cache.get("query", 1) == "result"
+    with mock.patch("time.monotonic", return_value=111.0):
+        assert cache.get("query", 1) is None
+
+
+def test_zero_size_disables_the_cache():
+    cache = ResultCache("test", max_entries=0)
+    cache.put("query", 1, "result")
+    assert cache.get("query", 1) is None
+
+
+def test_clear_drops_everything():
+    cache = ResultCache("test", max_entries=2, ttl_seconds=0)
+    cache.put("query", 1, "result")
+    cache.clear()
+    assert len(cache) == 0
@@ -0,0 +1,165 @@
+import copy
+
+import pytest
+
+from src.semantic_search.config import VectorIndexConfig
+from src.semantic_search.embedding_manager import EmbeddingManager
+from src.semantic_search.schema_migration import (
+    apply_vector_index_config,
+    export_objects,
+    import_objects,
+    iter_objects,
+    vector_index_changes,
+)
+
+
+class FakeWeaviate:
+    """The parts of the Weaviate v3 client the migration uses, backed by dicts."""
+
+    def __init__(self):
+        self.classes = {}
+        self.objects = {}
+        self.schema = self
+        self.data_object = self
+        self.batch = self
+        self.query = self
+        self.batch_size = None
+        self._aggregated = None
+
+    # client.schema
+    def exists(self, class_name):
+        return class_name in self.classes
+
+    def create_class(self, definition):
+        self.classes[definition["class"]] = copy.deepcopy(definition)
+        self.objects[definition["class"]] = {}
+
+    def delete_class(self, class_name):
+        del self.classes[class_name]
+        del self.objects[class_name]
+
+    def get(self, class_name=None, with_vector=False, limit=None, after=None):
+        if limit is None:
+            return self.classes[class_name]
+        # client.data_object.get with the cursor API
+        ids = sorted(self.objects[class_name])
+        if after is not None:
+            ids = [object_id for object_id in ids if object_id > after]
+        return {"objects": [self.objects[class_name][i] for i in ids[:limit]]}
+
+    def update_config(self, class_name, config):
+        self.classes[class_name]["vectorIndexConfig"].update(
+            config["vectorIndexConfig"]
+        )
+
+    # client.batch
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def add_data_object(self, data_object, class_name, uuid, vector):
+        self.objects[class_name][uuid] = {
+            "id": uuid,
+            "properties": dict(data_object),
+            "vector": list(vector),
+        }
+
+    # client.query.aggregate(...).with_meta_count().do()
+    def aggregate(self, class_name):
+        self._aggregated = class_name
+        return self
+
+    def with_meta_count(self):
+        return self
+
+    def do(self):
+        count = len(self.objects[self._aggregated])
+        return {"data": {"Aggregate": {self._aggregated: [{"meta": {"count": count}}]}}}
+
+
+def definition(**settings):
+    return EmbeddingManager.articles_class_definition(VectorIndexConfig(**settings))
+
+
+@pytest.fixture(name="client")
+def fixture_client():
+    client = FakeWeaviate()
+    client.create_class(definition())
+    for i in range(7):
+        client.add_data_object(
+            {"text": f"chunk {i}"}, "Articles", f"id-{i}", [float(i), 1.0]
+        )
+    return client
+
+
+def test_class_definition_carries_the_index_settings():
+    class_definition = definition(distance="dot", ef=64, compression="pq")
+    assert class_definition["class"] == "Articles"
+    assert class_definition["vectorizer"] == "none"
+    index = class_definition["vectorIndexConfig"]
+    assert index["distance"] == "dot" and index["ef"] == 64
+    assert index["pq"]["enabled"]
+    names = [prop["name"] for prop in class_definition["properties"]]
+    assert names[:4] == ["text", "doc_id", "chunk_index", "content_hash"]
+
+
+def test_vector_index_config_rejects_unknown_settings():
+    with pytest.raises(ValueError):
+        VectorIndexConfig(distance="jaccard")
+    with pytest.raises(ValueError):
+        VectorIndexConfig(compression="zip")
+    assert "pq" not in VectorIndexConfig(compression="none").to_weaviate()
+    assert VectorIndexConfig(compression="bq").to_weaviate()["bq"] == {"enabled": True}
+
+
+def test_changes_split_into_in_place_and_rebuild():
+    current = VectorIndexConfig(ef=64).to_weaviate()
+    assert vector_index_changes(current, current) == ({}, [])
+
+    in_place, rebuild = vector_index_changes(
+        current, VectorIndexConfig(ef=128, compression="pq").to_weaviate()
+    )
+    assert set(in_place) == {"ef", "pq"} and rebuild == []
+
+    _, rebuild = vector_index_changes(
+        current,
+        VectorIndexConfig(max_connections=8, compression="bq").to_weaviate(),
+    )
+    assert rebuild == ["maxConnections", "bq"]
+
+
+def test_cursor_reads_every_object(client):
+    objects = list(iter_objects(client, batch_size=3))
+    assert [obj["id"] for obj in objects] == [f"id-{i}" for i in range(7)]
+
+
+def test_export_import_round_trip(client, tmp_path):
+    export_file = tmp_path / "articles.jsonl"
+    assert export_objects(client, export_file) == 7
+    original = copy.deepcopy(client.objects["Articles"])
+    client.delete_class("Articles")
+    client.create_class(definition())
+    assert import_objects(client, export_file) == 7
+    assert client.objects["Articles"] == original
+
+
+def test_in_place_change_updates_the_class(client, tmp_path):
+    report = apply_vector_index_config(client, definition(ef=256), tmp_path / "x")
+    assert report["action"] == "update"
+    assert client.classes["Articles"]["vectorIndexConfig"]["ef"] == 256
+    assert len(client.objects["Articles"]) == 7
+
+
+def test_immutable_change_rebuilds_and_keeps_objects(client, tmp_path):
+    original = copy.deepcopy(client.objects["Articles"])
+    target = definition(max_connections=8)
+    dry_run = apply_vector_index_config(client, target, tmp_path / "x", dry_run=True)
+    assert dry_run["action"] == "rebuild"
+    assert client.classes["Articles"]["vectorIndexConfig"]["maxConnections"] != 8
+
+    report = apply_vector_index_config(client, target, tmp_path / "export.jsonl")
+    assert report["exported"] == report["imported"] == 7
+    assert client.classes["Articles"]["vectorIndexConfig"]["maxConnections"] == 8
+    assert client.objects["Articles"] == original
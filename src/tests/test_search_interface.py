@@ -0,0 +1,170 @@
+import pytest
+
+from src.semantic_search.deadline import Deadline
+from src.semantic_search.near_duplicates import NearDuplicateDetector
+from src.semantic_search.search_interface import SemanticSearchInterface
+
+ARTICLE = (
+    "Cloud computing delivers computing services over the internet, including servers, "
+    "storage, databases, networking, software and analytics, to offer faster innovation, "
+    "flexible resources and economies of scale."
+)
+EDITED = ARTICLE.replace("faster innovation", "rapid innovation")
+SENTENCES = [
+    "Solar panels convert sunlight into electricity using photovoltaic cells made of silicon.",
+    "Wind turbines capture kinetic energy from moving air and drive a generator.",
+    "Hydroelectric dams store water and release it through turbines on demand.",
+    "Geothermal plants draw heat from deep underground to produce steam.",
+]
+
+
+@pytest.fixture(name="interface")
+def fixture_interface():
+    search_interface = SemanticSearchInterface()
+    search_interface.duplicate_detector = NearDuplicateDetector(index_file=None)
+    return search_interface
+
+
+@pytest.fixture(name="small_chunks")
+def fixture_small_chunks():
+    search_interface = SemanticSearchInterface(chunk_size=100, chunk_overlap=0)
+    search_interface.duplicate_detector = NearDuplicateDetector(index_file=None)
+    return search_interface
+
+
+def stored_documents(search_interface):
+    return sorted(
+        obj["doc_id"]
+        for obj in search_interface.get_database_page(properties=["doc_id"])
+    )
+
+
+def test_near_duplicates_of_other_documents_are_skipped(interface):
+    interface.process_and_index_text(ARTICLE, doc_id="a")
+    stats = interface.process_and_index_text(EDITED)
+    assert stats["indexed"] == 0
+    assert stats["near_duplicates_skipped"] == 1
+    assert stored_documents(interface) == ["a"]
+
+
+def test_deleting_the_stored_chunk_restores_its_near_duplicates(interface):
+    interface.process_and_index_text(ARTICLE, doc_id="a", metadata={"title": "A"})
+    interface.process_and_index_text(EDITED, doc_id="b", metadata={"title": "B"})
+    interface.process_and_index_text(ARTICLE, doc_id="c")
+
+    assert interface.delete_document("a") == 1
+    # The first dependent is stored, the exact copy now depends on it
+    assert stored_documents(interface) == ["b"]
+    assert interface.get_database_page(properties=["text", "title"])[0] == {
+        "id": interface.get_database_page()[0]["id"],
+        "text": EDITED,
+        "title": "B",
+    }
+    interface.delete_document("b")
+    assert stored_documents(interface) == ["c"]
+
+
+def test_update_document_keeps_the_stale_chunk_of_an_edited_chunk(interface):
+    interface.process_and_index_text(ARTICLE, doc_id="a")
+    stats = interface.update_document("a", EDITED)
+    assert stats["indexed"] == 0
+    assert stats["deleted"] == 0
+    assert stats["near_duplicates_skipped"] == 1
+    assert interface.get_database_contents() == [ARTICLE]
+
+
+def test_update_document_restores_near_duplicates_of_stale_chunks(interface):
+    interface.process_and_index_text(ARTICLE, doc_id="cloud")
+    interface.process_and_index_text(EDITED, doc_id="copy")
+
+    stats = interface.update_document("cloud", " ".join(SENTENCES))
+    assert stats["indexed"] == stats["deleted"] == 1
+    assert stored_documents(interface) == ["cloud", "copy"]
+    assert EDITED in interface.get_database_contents()
+
+
+def test_persisted_index_is_kept_while_the_database_has_chunks(interface, tmp_path):
+    interface.duplicate_detector = NearDuplicateDetector(
+        index_file=tmp_path / "index.npz"
+    )
+    interface.process_and_index_text(ARTICLE, doc_id="a")
+    reconcile = (
+        interface._reconcile_duplicate_detector  # pylint: disable=protected-access
+    )
+    reconcile()
+    assert len(interface.duplicate_detector) == 1
+
+    interface.embedding_manager.clear_database()
+    reconcile()
+    assert len(interface.duplicate_detector) == 0
+
+
+def test_update_document_embeds_only_changed_chunks(small_chunks):
+    created = small_chunks.process_and_index_text(" ".join(SENTENCES), doc_id="energy")
+    assert created == {
+        "doc_id": "energy",
+        "chunks": 4,
+        "indexed": 4,
+        "near_duplicates_skipped": 0,
+    }
+
+    edited = SENTENCES[:3] + ["Tidal power harnesses the rise and fall of ocean tides."]
+    stats = small_chunks.update_document("energy", " ".join(edited))
+    assert stats["unchanged"] == 2
+    assert stats["indexed"] == 2
+    assert stats["deleted"] == 2
+    assert stats["moved"] == 0
+
+    chunks = small_chunks.embedding_manager.get_document_chunks("energy")
+    assert sorted(chunk["chunk_index"] for chunk in chunks) == [0, 1, 2, 3]
+    assert "Tidal power" in " ".join(small_chunks.get_database_contents())
+
+
+def test_update_document_of_unknown_id_indexes_it(small_chunks):
+    stats = small_chunks.update_document("new", " ".join(SENTENCES))
+    assert stats["indexed"] == 4
+    assert stored_documents(small_chunks) == ["new"] * 4
+
+
+def test_delete_document_removes_all_chunks(small_chunks):
+    small_chunks.process_and_index_text(" ".join(SENTENCES), doc_id="energy")
+    small_chunks.process_and_index_text(ARTICLE, doc_id="cloud")
+    assert small_chunks.delete_document("energy") == 4
+    assert set(stored_documents(small_chunks)) == {"cloud"}
+    assert small_chunks.delete_document("energy") == 0
+
+
+def test_degraded_searches_are_not_cached(interface):
+    interface.process_and_index_text(SENTENCES[0], doc_id="solar")
+
+    with Deadline(0, ["embed_query", "vector_search"]) as deadline:
+        degraded = interface.search("solar panels", num_results=1)
+    assert deadline.degraded
+    assert degraded["degraded"] and degraded["results"] == []
+
+    complete = interface.search("solar panels", num_results=1)
+    assert "degraded" not in complete
+    assert complete["results"] == [SENTENCES[0]]
+    assert interface.search("solar panels", num_results=1) == complete
+
+
+def test_filters_are_validated_and_normalized():
+    normalize = (
+        SemanticSearchInterface._normalize_filters  # pylint: disable=protected-access
+    )
+    assert normalize(None) == {}
+    assert normalize({"field": ["Science", "Health", "Health"]}) == {
+        "field": ("Health", "Science")
+    }
+    assert normalize({"field": ["Health"]}) == {"field": "Health"}
+    with pytest.raises(ValueError):
+        normalize({"text": "anything"})
+    with pytest.raises(ValueError):
+        normalize({"field": []})
+
+
+def test_search_only_returns_matching_documents(interface):
+    interface.process_and_index_text(SENTENCES[0], doc_id="solar")
+    interface.process_and_index_text(SENTENCES[1], doc_id="wind")
+    found = interface.search("energy", num_results=2, filters={"doc_id": "wind"})
+    assert found["results"] == [SENTENCES[1]]
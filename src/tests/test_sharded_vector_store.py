@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from src.semantic_search.local_vector_store import LocalVectorStore
+from src.semantic_search.sharded_vector_store import (
+    ShardedVectorStore,
+    VectorShard,
+    parse_address,
+)
+
+FIELDS = ["Health", "Science", "Finance"]
+
+
+def corpus(count: int = 60, dimension: int = 8, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    objects = [{"text": f"chunk {i}", "field": FIELDS[i % 3]} for i in range(count)]
+    return objects, rng.normal(size=(count, dimension)).tolist()
+
+
+@pytest.fixture(name="stores")
+def fixture_stores():
+    """The same objects in a three-shard store and in a single store."""
+    objects, vectors = corpus()
+    shards = [VectorShard(indexed_properties=["field"]) for _ in range(3)]
+    sharded = ShardedVectorStore(shards)
+    ids = sharded.add(objects, vectors)
+    single = LocalVectorStore(indexed_properties=["field"])
+    single.add(objects, vectors, ids=ids)
+    yield sharded, single, shards
+    sharded.close()
+
+
+def ranked(hits):
+    return [(hit["id"], round(hit["distance"], 5)) for hit in hits]
+
+
+def test_objects_are_spread_round_robin(stores):
+    sharded, single, shards = stores
+    assert [len(shard) for shard in shards] == [20, 20, 20]
+    assert len(sharded) == len(single) == 60
+    assert sharded.dimension == 8
+    assert sharded.nbytes >= 60 * 8 * 4
+
+
+def test_merged_top_k_matches_the_unsharded_store(stores):
+    sharded, single, _ = stores
+    rng = np.random.default_rng(1)
+    for query in rng.normal(size=(5, 8)).tolist():
+        assert ranked(sharded.query(query, 10)) == ranked(single.query(query, 10))
+        assert ranked(sharded.query(query, 10, autocut_jumps=1)) == ranked(
+            single.query(query, 10, autocut_jumps=1)
+        )
+        filters = {"field": ["Health", "Finance"]}
+        assert ranked(sharded.query(query, 5, filters=filters)) == ranked(
+            single.query(query, 5, filters=filters)
+        )
+
+
+def test_find_and_page_span_all_shards(stores):
+    sharded, single, _ = stores
+    assert len(sharded.find({"field": "Science"})) == 20
+    assert len(sharded.find({}, limit=7)) == 7
+    first = sharded.page(None, 25)
+    assert [obj["id"] for obj in first] == [obj["id"] for obj in single.page(None, 25)]
+    rest = sharded.page(first[-1]["id"], 100)
+    assert len(first) + len(rest) == 60
+
+
+def test_updates_and_deletes_reach_the_owning_shard(stores):
+    sharded, _, _ = stores
+    object_id = sharded.find({"text": "chunk 4"})[0]["id"]
+    sharded.update(object_id, {"field": "Sports"})
+    assert sharded.find({"field": "Sports"})[0]["id"] == object_id
+    assert sharded.delete([object_id, "missing"]) == 1
+    assert len(sharded) == 59
+    sharded.clear()
+    assert len(sharded) == 0
+
+
+def test_parse_address():
+    assert parse_address("localhost:5000") == ("localhost", 5000)
+    with pytest.raises(ValueError):
+        parse_address("localhost")
+
+
+def test_spawned_shard_processes_serve_queries():
+    objects, vectors = corpus(count=10, dimension=4)
+    store = ShardedVectorStore.spawn(2, indexed_properties=["field"], dimension=4)
+    try:
+        ids = store.add(objects, vectors)
+        assert len(store) == 10
+        hits = store.query(vectors[3], 1)
+        assert hits[0]["id"] == ids[3]
+        assert hits[0]["properties"] == objects[3]
+    finally:
+        store.close()
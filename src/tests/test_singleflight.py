@@ -0,0 +1,134 @@
+import threading
+import time
+
+import pytest
+
+from src.semantic_search.metrics import CACHE_EVENTS
+from src.semantic_search.singleflight import SingleFlight
+
+
+def start_leader(flights: SingleFlight, key, result, release: threading.Event):
+    """Run a call for the key in a thread that blocks until released."""
+    started = threading.Event()
+    outcome = {}
+
+    def fn():
+        started.set()
+        release.wait(5)
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    def leader():
+        try:
+            outcome["result"] = flights.do(key, fn)
+        except BaseException as e:  # pylint: disable=broad-except
+            outcome["error"] = e
+
+    thread = threading.Thread(target=leader)
+    thread.start()
+    started.wait(5)
+    return thread, outcome
+
+
+def follow(flights: SingleFlight, key, **kwargs):
+    """Join the running call from another thread and return what it got."""
+    outcome = {}
+
+    def follower():
+        try:
+            outcome["result"] = flights.do(
+                key, lambda: "own", kwargs.get("timeout"), kwargs.get("shareable")
+            )
+        except BaseException as e:  # pylint: disable=broad-except
+            outcome["error"] = e
+
+    thread = threading.Thread(target=follower)
+    thread.start()
+    return thread, outcome
+
+
+def wait_for_follower(flights: SingleFlight, hits_before: float):
+    """Block until the follower has joined the running call."""
+    hits = CACHE_EVENTS.labels(flights.name, "hit")
+    deadline = time.monotonic() + 5
+    while hits.get() == hits_before and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def test_single_caller_runs_fn():
+    flights = SingleFlight("test")
+    assert flights.do("key", lambda: 42) == 42
+
+
+def test_waiting_callers_share_a_copy_of_the_result():
+    flights = SingleFlight("test")
+    release = threading.Event()
+    leader, led = start_leader(flights, "key", {"results": ["a"]}, release)
+    hits_before = CACHE_EVENTS.labels(flights.name, "hit").get()
+    follower, followed = follow(flights, "key")
+    wait_for_follower(flights, hits_before)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert followed["result"] == led["result"] == {"results": ["a"]}
+    assert followed["result"] is not led["result"]
+
+
+def test_different_keys_do_not_wait_for_each_other():
+    flights = SingleFlight("test")
+    release = threading.Event()
+    leader, _ = start_leader(flights, "key", "leader", release)
+    assert flights.do("other", lambda: "other") == "other"
+    release.set()
+    leader.join()
+
+
+def test_error_reaches_waiting_callers():
+    flights = SingleFlight("test")
+    release = threading.Event()
+    leader, led = start_leader(flights, "key", ValueError("boom"), release)
+    hits_before = CACHE_EVENTS.labels(flights.name, "hit").get()
+    follower, followed = follow(flights, "key")
+    wait_for_follower(flights, hits_before)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert isinstance(led["error"], ValueError)
+    assert followed["error"] is led["error"]
+
+
+def test_waiting_caller_times_out():
+    flights = SingleFlight("test")
+    release = threading.Event()
+    leader, _ = start_leader(flights, "key", "leader", release)
+    with pytest.raises(TimeoutError):
+        flights.do("key", lambda: "own", timeout=0.01)
+    release.set()
+    leader.join()
+
+
+def test_unshareable_result_makes_waiting_callers_run_their_own():
+    flights = SingleFlight("test")
+    release = threading.Event()
+    degraded = {"results": [], "degraded": True}
+    leader, led = start_leader(flights, "key", degraded, release)
+    hits_before = CACHE_EVENTS.labels(flights.name, "hit").get()
+    follower, followed = follow(
+        flights, "key", shareable=lambda result: not result.get("degraded")
+    )
+    wait_for_follower(flights, hits_before)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert led["result"] == degraded
+    assert followed["result"] == "own"
+
+
+def test_nothing_is_kept_after_the_call():
+    flights = SingleFlight("test")
+    flights.do("key", lambda: "first")
+    assert flights.do("key", lambda: "second") == "second"
@@ -0,0 +1,244 @@
+import gzip
+import json
+
+import numpy as np
+import pytest
+
+from src.semantic_search.embedding_manager import EmbeddingManager
+from src.semantic_search.near_duplicates import NearDuplicateDetector
+from src.semantic_search.search_interface import SemanticSearchInterface
+from src.semantic_search.snapshot import (
+    MANIFEST_FILE,
+    TABLE_FILE,
+    VECTORS_FILE,
+    SnapshotReader,
+    SnapshotWriter,
+)
+
+TEXTS = ["solar power", "wind turbines", "tidal energy"]
+OLD = "Cloud computing delivers computing services over the internet."
+
+
+class RejectingBatch:
+    """client.batch stand-in that reports every second object as rejected."""
+
+    def __init__(self):
+        self.callback = None
+        self.added = []
+
+    def configure(self, batch_size=50, callback=None, **kwargs):
+        self.callback = callback
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.callback(
+            [
+                (
+                    {"id": object_id, "result": {}}
+                    if i % 2 == 0
+                    else {
+                        "id": object_id,
+                        "result": {"errors": {"error": [{"message": "invalid"}]}},
+                    }
+                )
+                for i, object_id in enumerate(self.added)
+            ]
+        )
+        return False
+
+    def add_data_object(self, data_object, class_name, uuid, vector):
+        self.added.append(uuid)
+
+
+class RejectingWeaviate:
+    def __init__(self):
+        self.batch = RejectingBatch()
+
+
+def objects(count: int, dimension: int = 4, start: int = 0):
+    return [
+        {
+            "id": f"id-{i:03d}",
+            "properties": {
+                "text": f"chunk {i}",
+                **({"title": "odd"} if i % 2 else {}),
+            },
+            "vector": [float(i + d) for d in range(dimension)],
+        }
+        for i in range(start, start + count)
+    ]
+
+
+def read_all(path):
+    reader = SnapshotReader(path)
+    ids, properties, vectors = [], [], []
+    for block_ids, block_properties, block_vectors in reader.batches():
+        ids += block_ids
+        properties += block_properties
+        vectors.append(block_vectors)
+    return reader, ids, properties, np.concatenate(vectors)
+
+
+def test_blocks_round_trip(tmp_path):
+    path = tmp_path / "snapshot"
+    written = objects(5) + objects(3, start=5)
+    with SnapshotWriter(path, 4, {"embedding_provider": "hashing"}) as writer:
+        writer.write(written[:5])
+        writer.write([])
+        writer.write(written[5:])
+
+    reader, ids, properties, vectors = read_all(path)
+    assert reader.manifest["count"] == 8 and reader.manifest["blocks"] == 2
+    assert reader.manifest["embedding_provider"] == "hashing"
+    assert ids == [obj["id"] for obj in written]
+    # Properties missing from an object stay missing
+    assert properties == [obj["properties"] for obj in written]
+    assert vectors.dtype == np.float32
+    assert vectors.tolist() == [obj["vector"] for obj in written]
+    assert np.load(path / VECTORS_FILE).shape == (8, 4)
+
+
+def test_failed_snapshot_leaves_the_previous_one(tmp_path):
+    path = tmp_path / "snapshot"
+    with SnapshotWriter(path, 4) as writer:
+        writer.write(objects(2))
+    with pytest.raises(ValueError):
+        with SnapshotWriter(path, 4) as writer:
+            writer.write(objects(3))
+            writer.write(objects(1, dimension=5))
+    assert read_all(path)[0].count == 2
+    assert not (tmp_path / "snapshot.tmp").exists()
+
+
+def test_reader_rejects_invalid_snapshots(tmp_path):
+    with pytest.raises(ValueError, match="not a snapshot"):
+        SnapshotReader(tmp_path)
+
+    path = tmp_path / "snapshot"
+    with SnapshotWriter(path, 4) as writer:
+        writer.write(objects(2))
+    manifest = json.loads((path / MANIFEST_FILE).read_text())
+    (path / MANIFEST_FILE).write_text(json.dumps(dict(manifest, count=3)))
+    with pytest.raises(ValueError, match="shape"):
+        SnapshotReader(path)
+    (path / MANIFEST_FILE).write_text(json.dumps(dict(manifest, version=99)))
+    with pytest.raises(ValueError, match="Unsupported"):
+        SnapshotReader(path)
+
+
+def test_index_export_and_import_round_trip(tmp_path):
+    source = EmbeddingManager()
+    texts = ["solar power", "wind turbines", "tidal energy"]
+    source.build_search_index(
+        texts, source.create_embeddings(texts), doc_id="energy", metadata={"title": "E"}
+    )
+    path = tmp_path / "snapshot"
+    manifest = source.export_snapshot(path, batch_size=2)
+    assert manifest["count"] == 3 and manifest["blocks"] == 2
+
+    target = EmbeddingManager()
+    target.build_search_index(["stale"], target.create_embeddings(["stale"]))
+    assert target.import_snapshot(path) == 3
+    assert target.local_store is not None and source.local_store is not None
+    assert target.local_store.page(None, 10) == source.local_store.page(None, 10)
+    assert target.search("wind turbines", num_results=1)[0] == ["wind turbines"]
+
+
+def export_energy(tmp_path):
+    source = EmbeddingManager()
+    source.build_search_index(TEXTS, source.create_embeddings(TEXTS), doc_id="energy")
+    path = tmp_path / "snapshot"
+    source.export_snapshot(path, batch_size=2)
+    return path
+
+
+@pytest.mark.parametrize(
+    "damage, error",
+    [
+        # Cut off in the middle of the gzip stream
+        (
+            lambda path: (path / TABLE_FILE).write_bytes(
+                (path / TABLE_FILE).read_bytes()[:-20]
+            ),
+            "cannot be read",
+        ),
+        (
+            lambda path: (path / TABLE_FILE).write_bytes(
+                gzip.compress(
+                    gzip.decompress((path / TABLE_FILE).read_bytes()).replace(
+                        b"wind", b"fire"
+                    )
+                )
+            ),
+            "table checksum",
+        ),
+        (
+            lambda path: (path / VECTORS_FILE).write_bytes(
+                (path / VECTORS_FILE).read_bytes()[:-4] + b"\x00\x00\x80\x3f"
+            ),
+            "vectors checksum",
+        ),
+    ],
+)
+def test_damaged_snapshot_leaves_the_index_in_place(tmp_path, damage, error):
+    path = export_energy(tmp_path)
+    damage(path)
+
+    target = EmbeddingManager()
+    target.build_search_index(["stale"], target.create_embeddings(["stale"]))
+    with pytest.raises(ValueError, match=error):
+        target.import_snapshot(path)
+    assert target.get_all_texts() == ["stale"]
+
+
+def test_objects_rejected_by_weaviate_fail_the_import(tmp_path, monkeypatch):
+    path = export_energy(tmp_path)
+    target = EmbeddingManager()
+    target.local_store = None
+    target.client = RejectingWeaviate()
+    monkeypatch.setattr(target, "_ensure_schema_exists", lambda: None)
+
+    with pytest.raises(RuntimeError, match="rejected 1 of 3") as raised:
+        target.import_snapshot(path, replace=False)
+    assert "invalid" in str(raised.value)
+    # The client's default callback is restored for later writes
+    assert target.client.batch.callback is None
+
+
+@pytest.fixture(name="interface")
+def fixture_interface():
+    search_interface = SemanticSearchInterface()
+    search_interface.duplicate_detector = NearDuplicateDetector(index_file=None)
+    search_interface.process_and_index_text(OLD, doc_id="old")
+    return search_interface
+
+
+def test_interface_import_registers_chunks_in_the_same_pass(
+    interface, tmp_path, monkeypatch
+):
+    path = export_energy(tmp_path)
+    opened = []
+    original_init = SnapshotReader.__init__
+
+    def counting_init(self, *args, **kwargs):
+        opened.append(args)
+        original_init(self, *args, **kwargs)
+
+    monkeypatch.setattr(SnapshotReader, "__init__", counting_init)
+    assert interface.import_snapshot(str(path)) == 3
+    assert len(opened) == 1
+    detector = interface.duplicate_detector
+    assert len(detector) == 3
+    assert detector.holders(detector.find_duplicate("wind turbines")) == {"energy"}
+    assert detector.find_duplicate(OLD) is None
+
+
+def test_interface_import_of_a_damaged_snapshot_keeps_the_detector(interface, tmp_path):
+    path = export_energy(tmp_path)
+    (path / TABLE_FILE).write_bytes(b"")
+    with pytest.raises(ValueError):
+        interface.import_snapshot(str(path))
+    assert interface.duplicate_detector.find_duplicate(OLD) is not None
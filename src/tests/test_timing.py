@@ -0,0 +1,50 @@
+import threading
+
+from src.semantic_search.timing import RequestTimings, current_timings, stage
+
+
+def test_stages_are_recorded_into_the_current_request():
+    with RequestTimings() as timings:
+        assert current_timings() is timings
+        with stage("embedding"):
+            pass
+        with stage("generation"):
+            pass
+        with stage("generation"):
+            pass
+    assert current_timings() is None
+
+    durations = timings.as_dict()
+    assert list(durations) == ["embedding", "generation", "total"]
+    assert durations["total"] >= durations["generation"] >= 0
+
+
+def test_stages_outside_a_request_are_only_observed():
+    with stage("vector_search"):
+        pass
+    assert current_timings() is None
+
+
+def test_server_timing_header_lists_every_stage():
+    timings = RequestTimings()
+    timings.add("embedding", 0.0015)
+    timings.add("embedding", 0.0005)
+    header = timings.server_timing_header()
+    assert header.startswith("embedding;dur=2.0, total;dur=")
+
+
+def test_requests_in_other_threads_are_isolated():
+    seen = []
+
+    def serve():
+        with RequestTimings() as timings:
+            with stage("search"):
+                pass
+            seen.append(timings.as_dict())
+
+    with RequestTimings() as outer:
+        thread = threading.Thread(target=serve)
+        thread.start()
+        thread.join()
+    assert "search" in seen[0]
+    assert "search" not in outer.as_dict()